@@ -1,22 +1,30 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
+from core.context_store import DEFAULT_NAMESPACE
 from core.shared_memory import SharedMemoryService
+from models.embedding import EmbeddingService
 from models.ollama_request import OllamaApiClient
 
 class BaseAgent(ABC):
-    def __init__(self, shared_memory: SharedMemoryService, api_client: OllamaApiClient):
+    def __init__(self, shared_memory: SharedMemoryService, api_client: OllamaApiClient,
+                 embedding_service: Optional[EmbeddingService] = None):
         self.shared_memory = shared_memory
         self.api_client = api_client
+        self.embedding_service = embedding_service or EmbeddingService(vector_size=shared_memory.vector_size)
     
     @abstractmethod
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError()
     
-    def store_context(self, key: str, context: Dict[str, Any]) -> None:
-        self.shared_memory.store_context(key, context)
+    def store_context(self, key: str, context: Dict[str, Any], namespace: str = DEFAULT_NAMESPACE) -> None:
+        self.shared_memory.store_context(key, context, namespace)
     
-    def get_context(self, key: str) -> Optional[Dict[str, Any]]:
-        return self.shared_memory.get_context(key)
+    def get_context(self, key: str, namespace: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        return self.shared_memory.get_context(key, namespace)
+
+    @staticmethod
+    def session_of(input_data: Dict[str, Any]) -> str:
+        return input_data.get('session_id') or DEFAULT_NAMESPACE
     
     def add_vectors(self, vectors: List[List[float]], metadata: List[Dict[str, Any]]) -> None:
         self.shared_memory.add_vectors(vectors, metadata)
@@ -0,0 +1,69 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+from agents.base_agent import BaseAgent
+from core.database import DatabaseService
+from core.shared_memory import SharedMemoryService
+from models.embedding import EmbeddingService
+from models.lead_scoring import LeadFeatures, LeadScorer
+from models.ollama_request import OllamaApiClient
+
+class LeadScoringAgent(BaseAgent):
+    def __init__(self, shared_memory: SharedMemoryService, api_client: OllamaApiClient,
+                 db_service: DatabaseService, embedding_service: Optional[EmbeddingService] = None,
+                 scorer: Optional[LeadScorer] = None, batch_size: int = 5000, won_status: str = 'won'):
+        super().__init__(shared_memory, api_client, embedding_service)
+        self.db_service = db_service
+        self.scorer = scorer or LeadScorer()
+        self.batch_size = batch_size
+        self.won_status = won_status
+
+    def score_leads(self, incremental: bool = False, scorer: Optional[LeadScorer] = None) -> Dict[str, Any]:
+        scorer = scorer or self.scorer
+        started = time.perf_counter()
+        won_ids = self.db_service.get_lead_ids_by_status(self.won_status)
+        centroids = scorer.won_centroids(self.shared_memory.vectors_for_db_ids(won_ids))
+        now = time.time()
+        # Naive UTC, like the updated_at it is compared against
+        scored_at = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)
+
+        scored, batches = 0, 0
+        for rows in self.db_service.iter_lead_batches(self.batch_size, changed_only=incremental):
+            features = LeadFeatures.from_rows(rows, self.shared_memory.vector_size)
+            scores = scorer.score(features, centroids, now)
+            scored += self.db_service.update_lead_scores(features.ids, scores, scored_at)
+            batches += 1
+
+        seconds = time.perf_counter() - started
+        return {
+            "mode": "incremental" if incremental else "full",
+            "scored": scored,
+            "batches": batches,
+            "won_leads": len(won_ids),
+            "centroids": 0 if centroids is None else len(centroids),
+            "seconds": round(seconds, 3),
+            "leads_per_second": round(scored / seconds, 1) if seconds else None
+        }
+
+    def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            scorer = self.scorer
+            if input_data.get('weights') or input_data.get('half_life_days'):
+                scorer = LeadScorer(
+                    weights=input_data.get('weights') or self.scorer.weights,
+                    half_life_days=input_data.get('half_life_days') or self.scorer.half_life_days,
+                    n_centroids=self.scorer.n_centroids
+                )
+            stats = self.score_leads(input_data.get('incremental', False), scorer)
+            return {
+                "status": "success",
+                "stats": stats,
+                "top_leads": self.db_service.get_top_scored_leads(input_data.get('top_k', 10))
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": str(e)
+            }
@@ -1,96 +1,306 @@
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import numpy as np
-import hashlib
 
 from agents.base_agent import BaseAgent
 from core.shared_memory import SharedMemoryService
+from models.embedding import EmbeddingService
+from models.lead_extraction import LEADS_FORMAT, LeadRecord, LeadStreamParser, format_leads, parse_leads
 from models.ollama_request import OllamaApiClient
-from core.database import DatabaseService
+from models.summarizer import estimate_tokens
+from core.database import DatabaseService, LeadWriteBuffer
+from core.retrieval import MeetingRetriever
 
 class LeadSuggestionsAgent(BaseAgent):
-    def __init__(self, shared_memory: SharedMemoryService, api_client: OllamaApiClient):
-        super().__init__(shared_memory, api_client)
-        self.db_service = DatabaseService()
-
-    def _generate_suggestions_vector(self, suggestions: str) -> np.ndarray:
-        # Use a more reliable method to generate vector
-        # Convert suggestions to a fixed-length vector using hash
-        hash_bytes = hashlib.sha256(suggestions.encode('utf-8')).digest()
-        vector = np.frombuffer(hash_bytes, dtype=np.float32)
-        
-        # Ensure consistent vector size (e.g., 768 dimensions)
-        if len(vector) > 768:
-            vector = vector[:768]
-        elif len(vector) < 768:
-            vector = np.pad(vector, (0, 768 - len(vector)), mode='constant')
-        
-        return vector
+    def __init__(self, shared_memory: SharedMemoryService, api_client: OllamaApiClient,
+                 embedding_service: Optional[EmbeddingService] = None,
+                 db_service: Optional[DatabaseService] = None, write_buffer: Optional[LeadWriteBuffer] = None,
+                 duplicate_threshold: float = 0.92, retriever: Optional[MeetingRetriever] = None,
+                 snippet_k: int = 5, dedup_k: int = 50):
+        super().__init__(shared_memory, api_client, embedding_service)
+        self.db_service = db_service or (write_buffer.db_service if write_buffer else DatabaseService())
+        self.write_buffer = write_buffer
+        self.duplicate_threshold = duplicate_threshold
+        self.retriever = retriever
+        self.snippet_k = snippet_k
+        self.dedup_k = dedup_k
+        # Leads accepted but not yet in the vector store (buffered, committing or being indexed)
+        self._unindexed: Dict[int, Tuple[str, np.ndarray, str]] = {}
+        self._tokens = itertools.count()
+        self._dedup_lock = threading.Lock()
 
-    def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            context = self.shared_memory.get_context('latest_meeting_summary') or {}
-            meeting_summary = context.get('summary', '')
-            meeting_transcript = context.get('transcript', '')
-            requirements = input_data.get('requirements', '')
+    def recommend_similar_leads(self, query_vector: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        matches = self.shared_memory.search_vectors(query_vector, k=top_k * 4)
+        recommendations = [
+            {"id": match['id'], "similarity": match['similarity'], **match['metadata']}
+            for match in matches
+            if match['metadata'].get('type') == 'lead_suggestions'
+        ]
+        return recommendations[:top_k]
+
+    def relevant_snippets(self, input_data: Dict[str, Any], meeting_summary: str) -> List[Dict[str, Any]]:
+        query = input_data.get('requirements') or meeting_summary
+        k = input_data.get('snippet_k', self.snippet_k)
+        if self.retriever is None or not query or not k:
+            return []
+        since = input_data.get('meetings_since')
+        return self.retriever.search(
+            query, k=k, source=input_data.get('meeting_source'),
+            created_after=datetime.fromisoformat(since) if isinstance(since, str) else since
+        )
 
-            lead_prompt = f"""
+    def build_prompt(self, meeting_summary: str, requirements: str,
+                     snippets: Optional[List[Dict[str, Any]]] = None) -> str:
+        history = ''
+        if snippets:
+            history = "Relevant excerpts from past meetings:\n" + '\n'.join(
+                f"            - [{snippet['source']}, {snippet['created_at']:%Y-%m-%d}] {snippet['text']}"
+                for snippet in snippets
+            ) + '\n'
+        return f"""
             Generate lead suggestions based on:
             Meeting Summary: {meeting_summary}
-            Meeting Transcript: {meeting_transcript}
             Requirements: {requirements}
-            
+            {history}
+
             Specific Criteria:
             - Technology companies with 100+ employees
             - Companies currently using legacy CRM systems
             - Focus on companies in the same region
-            
-            Provide a structured list of potential leads including:
-            1. Company Name
-            2. Industry
-            3. Company Size
-            4. Potential Pain Points
-            5. Relevance Score
+
+            Respond with JSON only, in this shape:
+            {{"leads": [{{"company_name": "...", "industry": "...", "company_size": "...",
+                         "pain_points": ["..."], "relevance_score": 0.0}}]}}
+            relevance_score is between 0 and 1.
             """
 
-            suggestions = self.api_client.query_model(lead_prompt)
-            
-            if not suggestions:
-                return {"status": "error", "message": "Failed to generate leads"}
-            
-            suggestions_vector = self._generate_suggestions_vector(suggestions)
-            
-            suggestions_context = {
-                "input_requirements": requirements,
-                "suggestions": suggestions,
-                "source": input_data.get('source', 'TechCorp Meeting'),
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self.shared_memory.store_context("latest_lead_suggestions", suggestions_context)
-            
-            lead_data = {
-                "company_name": "Potential Leads - Technology",
-                "industry": "Technology",
-                "source": input_data.get('source', 'TechCorp Meeting'),
-                "details": suggestions_context
+    def generate_stream(self, meeting_summary: str, requirements: str, use_cache: bool = True,
+                        snippets: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        lead_prompt = self.build_prompt(meeting_summary, requirements, snippets)
+        started = time.perf_counter()
+        parser = LeadStreamParser()
+        chunks: List[str] = []
+        leads: List[LeadRecord] = []
+
+        for chunk in self.api_client.stream_model(lead_prompt, use_cache=use_cache, format=LEADS_FORMAT, task="lead_suggestions"):
+            chunks.append(chunk)
+            yield {"type": "token", "text": chunk}
+            for lead in parser.feed(chunk):
+                leads.append(lead)
+                yield {"type": "lead", "lead": lead}
+        answer = ''.join(chunks)
+        if not leads:
+            leads = parse_leads(answer)
+            for lead in leads:
+                yield {"type": "lead", "lead": lead}
+        if not leads:
+            raise ValueError("Failed to generate leads")
+
+        yield {"type": "leads", "leads": leads, "stats": {
+            "prompt_tokens": estimate_tokens(lead_prompt),
+            "output_tokens": estimate_tokens(answer),
+            "leads": len(leads),
+            "snippets": len(snippets or []),
+            "rejected": parser.rejected,
+            "seconds": round(time.perf_counter() - started, 3)
+        }}
+
+    def generate(self, meeting_summary: str, requirements: str, use_cache: bool = True,
+                 snippets: Optional[List[Dict[str, Any]]] = None) -> Tuple[List[LeadRecord], Dict[str, Any]]:
+        for item in self.generate_stream(meeting_summary, requirements, use_cache, snippets):
+            if item['type'] == 'leads':
+                return item['leads'], item['stats']
+        raise ValueError("Failed to generate leads")
+
+    @staticmethod
+    def _company_key(name: str) -> str:
+        name = re.sub(r'[^a-z0-9 ]', '', name.lower())
+        return re.sub(r'\b(inc|llc|ltd|corp|corporation|co|gmbh|plc)\b', '', name).strip()
+
+    def deduplicate(self, leads: List[LeadRecord],
+                    vectors: np.ndarray) -> Tuple[List[int], List[Dict[str, Any]]]:
+        if not leads:
+            return [], []
+        normalized = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        # The store also holds meeting summaries, so look past the nearest few before filtering to leads
+        matches = self.shared_memory.search_vectors_batch(normalized, k=self.dedup_k)
+        unindexed = list(self._unindexed.values())
+        keep: List[int] = []
+        duplicates: List[Dict[str, Any]] = []
+        for i, lead in enumerate(leads):
+            key = self._company_key(lead.company_name)
+            existing = next((
+                match for match in matches[i]
+                if match['metadata'].get('type') == 'lead_suggestions'
+                and (match['similarity'] >= self.duplicate_threshold
+                     or (key and self._company_key(match['metadata'].get('company_name', '')) == key))
+            ), None)
+            if existing is not None:
+                duplicates.append({"company_name": lead.company_name, "db_id": existing['metadata'].get('db_id')})
+                continue
+            pending = next((
+                name for pending_key, vector, name in unindexed
+                if (key and pending_key == key) or float(normalized[i] @ vector) >= self.duplicate_threshold
+            ), None)
+            if pending is not None:
+                duplicates.append({"company_name": lead.company_name, "duplicate_of": pending})
+                continue
+            kept = next((
+                j for j in keep
+                if (key and self._company_key(leads[j].company_name) == key)
+                or float(normalized[i] @ normalized[j]) >= self.duplicate_threshold
+            ), None)
+            if kept is not None:
+                duplicates.append({"company_name": lead.company_name, "duplicate_of": leads[kept].company_name})
+                continue
+            keep.append(i)
+        return keep, duplicates
+
+    def _store_leads(self, rows: List[Dict[str, Any]], vectors: np.ndarray) -> List[Future]:
+        if self.write_buffer is not None:
+            return self.write_buffer.submit_many(rows, list(vectors))
+        futures = [Future() for _ in rows]
+        try:
+            lead_ids = self.db_service.store_leads_bulk(rows, list(vectors))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return futures
+        for future, lead_id in zip(futures, lead_ids):
+            future.set_result(lead_id)
+        return futures
+
+    def _index_lead(self, future: Future, vector: np.ndarray, lead: LeadRecord, source: str, token: int) -> None:
+        try:
+            # A readonly follower leaves indexing to the segment owner, which restores new lead rows when it reconciles
+            if future.exception() is None and not self.shared_memory.readonly:
+                self.shared_memory.add_vectors(
+                    vector.reshape(1, -1),
+                    [{"type": "lead_suggestions", "source": source, "company_name": lead.company_name,
+                      "industry": lead.industry, "db_id": future.result()}]
+                )
+        finally:
+            self._unindexed.pop(token, None)
+
+    def persist(self, leads: List[LeadRecord], requirements: str,
+                source: str) -> Tuple[List[int], List[Dict[str, Any]], Dict[str, Any]]:
+        vectors = self.embedding_service.embed_batch([lead.embedding_text() for lead in leads])
+        # Deduplicate and claim under one lock so concurrent requests can't both keep the same company
+        with self._dedup_lock:
+            keep, duplicates = self.deduplicate(leads, vectors)
+            tokens = []
+            for i in keep:
+                token = next(self._tokens)
+                vector = vectors[i] / max(float(np.linalg.norm(vectors[i])), 1e-12)
+                self._unindexed[token] = (self._company_key(leads[i].company_name), vector, leads[i].company_name)
+                tokens.append(token)
+        timestamp = datetime.now().isoformat()
+
+        rows = [
+            {
+                "company_name": leads[i].company_name,
+                "industry": leads[i].industry,
+                "source": source,
+                "details": {
+                    **leads[i].model_dump(),
+                    "input_requirements": requirements,
+                    "source": source,
+                    "timestamp": timestamp
+                }
             }
-            lead_id = self.db_service.store_lead(lead_data, suggestions_vector)
-            
-            self.shared_memory.add_vectors(
-                suggestions_vector.reshape(1, -1),
-                [{"type": "lead_suggestions", "source": input_data.get('source', 'TechCorp Meeting'), "db_id": lead_id}]
+            for i in keep
+        ]
+        try:
+            futures = self._store_leads(rows, vectors[keep])
+        except Exception:
+            for token in tokens:
+                self._unindexed.pop(token, None)
+            raise
+        for i, token, future in zip(keep, tokens, futures):
+            # Each vector is indexed once its row commits so its db_id is always real
+            future.add_done_callback(
+                lambda done, vector=vectors[i], lead=leads[i], token=token: self._index_lead(done, vector, lead, source, token)
+            )
+        # Buffered writes still group-commit across concurrent requests; waiting here returns real ids and surfaces failures
+        lead_ids = [future.result() for future in futures]
+
+        suggestions_context = {
+            "input_requirements": requirements,
+            "suggestions": [lead.model_dump() for lead in leads],
+            "duplicates": duplicates,
+            "source": source,
+            "timestamp": timestamp
+        }
+        return lead_ids, duplicates, suggestions_context
+
+    def _summary_for(self, input_data: Dict[str, Any]) -> str:
+        meeting_summary = input_data.get('summary')
+        if meeting_summary is None:
+            context = self.get_context('latest_meeting_summary', self.session_of(input_data)) or {}
+            meeting_summary = context.get('summary', '')
+        return meeting_summary
+
+    def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            meeting_summary = self._summary_for(input_data)
+            requirements = input_data.get('requirements', '')
+            source = input_data.get('source', 'TechCorp Meeting')
+
+            leads, stats = self.generate(
+                meeting_summary, requirements, use_cache=input_data.get('use_cache', True),
+                snippets=self.relevant_snippets(input_data, meeting_summary)
             )
-            
+            lead_ids, duplicates, suggestions_context = self.persist(leads, requirements, source)
+            self.store_context("latest_lead_suggestions", suggestions_context, self.session_of(input_data))
+
             return {
                 "status": "success",
-                "suggestions": suggestions,
-                "lead_id": lead_id
+                "suggestions": format_leads(leads),
+                "leads": [lead.model_dump() for lead in leads],
+                "lead_ids": lead_ids,
+                "duplicates": duplicates,
+                "stats": stats
             }
-        
+
         except Exception as e:
             return {
                 "status": "error",
                 "message": str(e)
             }
 
+    def execute_stream(self, input_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        try:
+            requirements = input_data.get('requirements', '')
+            source = input_data.get('source', 'TechCorp Meeting')
+            meeting_summary = self._summary_for(input_data)
+            leads, stats = [], {}
+            for item in self.generate_stream(meeting_summary, requirements,
+                                             use_cache=input_data.get('use_cache', True),
+                                             snippets=self.relevant_snippets(input_data, meeting_summary)):
+                if item['type'] == 'token':
+                    yield {"event": "lead_token", "text": item['text']}
+                elif item['type'] == 'lead':
+                    yield {"event": "lead", "lead": item['lead'].model_dump()}
+                else:
+                    leads, stats = item['leads'], item['stats']
+
+            lead_ids, duplicates, suggestions_context = self.persist(leads, requirements, source)
+            self.store_context("latest_lead_suggestions", suggestions_context, self.session_of(input_data))
+            yield {"event": "stored", "lead_ids": lead_ids, "duplicates": duplicates}
+
+            yield {"event": "done", "result": {
+                "status": "success",
+                "suggestions": format_leads(leads),
+                "leads": [lead.model_dump() for lead in leads],
+                "lead_ids": lead_ids,
+                "duplicates": duplicates,
+                "stats": stats
+            }}
+
+        except Exception as e:
+            yield {"event": "error", "status": "error", "message": str(e)}
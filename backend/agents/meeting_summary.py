@@ -1,61 +1,146 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 import os
-import hashlib
 import numpy as np
 
 from .base_agent import BaseAgent
-from models.transcription import TranscriptionService
+from models.embedding import EmbeddingService
+from models.summarizer import MapReduceSummarizer
+from models.transcription import AudioSource, TranscriptionService
+from core.retrieval import MeetingRetriever
 from core.shared_memory import SharedMemoryService
 from models.ollama_request import OllamaApiClient
 
 class MeetingSummaryAgent(BaseAgent):
     def __init__(self, shared_memory: SharedMemoryService, 
                  api_client: OllamaApiClient, 
-                 transcription_service: TranscriptionService):
-        super().__init__(shared_memory, api_client)
+                 transcription_service: TranscriptionService,
+                 embedding_service: Optional[EmbeddingService] = None,
+                 summarizer: Optional[MapReduceSummarizer] = None,
+                 retriever: Optional[MeetingRetriever] = None):
+        super().__init__(shared_memory, api_client, embedding_service)
         self.transcription_service = transcription_service
+        self.summarizer = summarizer or MapReduceSummarizer(api_client)
+        self.retriever = retriever
     
     def _generate_summary_vector(self, summary: str) -> np.ndarray:
-        hash_bytes = hashlib.md5(summary.encode()).digest()
-        return np.frombuffer(hash_bytes, dtype=np.float32)[:10] / 255.0
+        return self.embedding_service.embed(summary)
+
+    def _audio(self, input_data: Dict[str, Any]) -> AudioSource:
+        # 'audio_stream' is a readable WAV file object (e.g. an upload), decoded without a temp copy
+        if input_data.get('audio_stream') is not None:
+            return input_data['audio_stream']
+        audio_path = input_data.get('audio_path', '')
+        if not audio_path or not os.path.exists(audio_path):
+            raise ValueError("Invalid audio path")
+        return audio_path
+
+    def transcribe(self, audio: AudioSource) -> str:
+        if isinstance(audio, str) and (not audio or not os.path.exists(audio)):
+            raise ValueError("Invalid audio path")
+        return self.transcription_service.transcribe(audio)
+
+    def summarize(self, transcript: str, use_cache: bool = True) -> Tuple[str, Dict[str, Any]]:
+        if not transcript:
+            raise ValueError("No transcript generated")
+        return self.summarizer.summarize(transcript, use_cache=use_cache)
+
+    def index_summary(self, summary: str, source: str, meeting_id: Optional[int] = None) -> Optional[int]:
+        # A readonly follower leaves it to the segment owner, which indexes archived meetings when it reconciles
+        if self.shared_memory.readonly:
+            return None
+        summary_vector = self._generate_summary_vector(summary)
+        return self.shared_memory.add_vectors(
+            summary_vector.reshape(1, -1),
+            [{"type": "meeting_summary", "source": source, "meeting_id": meeting_id}]
+        )[0]
+
+    def archive(self, transcript: str, summary: str, source: str) -> Optional[int]:
+        # Keeps every meeting searchable instead of only the latest one held in the context store
+        if self.retriever is None:
+            return None
+        summary_vector = self._generate_summary_vector(summary)
+        return self.retriever.store_meetings(
+            [{"source": source, "transcript": transcript, "summary": summary}], [summary_vector]
+        )[0]
 
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            audio_path = input_data.get('audio_path', '')
-            if not audio_path or not os.path.exists(audio_path):
-                return {"status": "error", "message": "Invalid audio path"}
-            
-            transcript = self.transcription_service.transcribe(audio_path)
-            
-            if not transcript:
-                return {"status": "error", "message": "No transcript generated"}
-            
-            summary_prompt = f"Summarize this meeting transcript: {transcript}"
-            summary = self.api_client.query_model(summary_prompt)
-            
-            summary_vector = self._generate_summary_vector(summary)
-            
+            source = input_data.get('source', 'unknown')
+            transcript = input_data.get('transcript')
+            if transcript is None:
+                transcript = self.transcribe(self._audio(input_data))
+
+            summary, summary_stats = self.summarize(transcript, use_cache=input_data.get('use_cache', True))
+
             summary_context = {
                 "transcript": transcript,
                 "summary": summary,
-                "source": input_data.get('source', 'unknown')
+                "source": source
             }
             
-            self.shared_memory.store_context("latest_meeting_summary", summary_context)
-            
-            self.shared_memory.add_vectors(
-                summary_vector.reshape(1, -1),
-                [{"type": "meeting_summary", "source": input_data.get('source', 'unknown')}]
-            )
+            self.store_context("latest_meeting_summary", summary_context, self.session_of(input_data))
+            meeting_id = self.archive(transcript, summary, source)
+            self.index_summary(summary, source, meeting_id)
             
             return {
                 "status": "success",
                 "transcript": transcript,
-                "summary": summary
+                "summary": summary,
+                "meeting_id": meeting_id,
+                "stats": summary_stats
             }
         
         except Exception as e:
             return {
                 "status": "error", 
                 "message": str(e)
-            }
\ No newline at end of file
+            }
+
+    def execute_stream(self, input_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        try:
+            source = input_data.get('source', 'unknown')
+            transcript = input_data.get('transcript')
+            if transcript is None:
+                finals = []
+                for segment in self.transcription_service.iter_transcription(self._audio(input_data)):
+                    if segment['type'] == 'progress':
+                        yield {"event": "transcribing", "percent": segment['percent']}
+                    elif segment['type'] == 'partial':
+                        yield {"event": "partial_transcript", "text": segment['text']}
+                    else:
+                        finals.append(segment['text'])
+                        yield {"event": "transcript_segment", "text": segment['text'],
+                               "start": segment['start'], "end": segment['end']}
+                transcript = ' '.join(finals).strip()
+                yield {"event": "transcript", "text": transcript}
+            if not transcript:
+                raise ValueError("No transcript generated")
+
+            summary, summary_stats = '', {}
+            for item in self.summarizer.summarize_stream(transcript, use_cache=input_data.get('use_cache', True)):
+                if item['type'] == 'token':
+                    yield {"event": "summary_token", "text": item['text']}
+                elif item['type'] == 'stage':
+                    yield {"event": "summary_stage", **{k: v for k, v in item.items() if k != 'type'}}
+                else:
+                    summary, summary_stats = item['summary'], item['stats']
+
+            self.store_context("latest_meeting_summary", {
+                "transcript": transcript,
+                "summary": summary,
+                "source": source
+            }, self.session_of(input_data))
+            meeting_id = self.archive(transcript, summary, source)
+            vector_id = self.index_summary(summary, source, meeting_id)
+            yield {"event": "stored", "vector_id": vector_id, "meeting_id": meeting_id}
+
+            yield {"event": "done", "result": {
+                "status": "success",
+                "transcript": transcript,
+                "summary": summary,
+                "meeting_id": meeting_id,
+                "stats": summary_stats
+            }}
+
+        except Exception as e:
+            yield {"event": "error", "status": "error", "message": str(e)}
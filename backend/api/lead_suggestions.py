@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
 import numpy as np
@@ -10,15 +11,23 @@ class LeadSuggestionsRequest(BaseModel):
     top_k: int = 5
 
 @router.post("/lead_suggestions")
-async def suggest_similar_leads(request: LeadSuggestionsRequest):
+async def suggest_similar_leads(request: LeadSuggestionsRequest, http_request: Request):
     if not request.query_vector:
         raise HTTPException(status_code=400, detail="No query vector provided")
-    
+
+    lead_agent = await run_in_threadpool(http_request.app.state.registry.get, 'lead_agent')
+    if len(request.query_vector) != lead_agent.shared_memory.vector_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Query vector must have {lead_agent.shared_memory.vector_size} dimensions"
+        )
+
     try:
-        query_vector = np.array(request.query_vector[:128], dtype=np.float32).reshape(1, -1)
+        query_vector = np.array(request.query_vector, dtype=np.float32).reshape(1, -1)
         
-        recommendations = LeadSuggestionsAgent.recommend_similar_leads(
-            query_vector=query_vector, 
+        recommendations = await run_in_threadpool(
+            lead_agent.recommend_similar_leads,
+            query_vector=query_vector,
             top_k=request.top_k
         )
         
@@ -27,4 +36,4 @@ async def suggest_similar_leads(request: LeadSuggestionsRequest):
             "top_k": request.top_k
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,25 @@
+import time
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+
+router = APIRouter()
+
+@router.get("/meetings/search")
+async def search_meetings(request: Request, q: str, k: int = Query(5, ge=1, le=100),
+                          source: Optional[str] = None, created_after: Optional[datetime] = None,
+                          created_before: Optional[datetime] = None, kind: Optional[List[str]] = Query(None)):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty query")
+
+    retriever = await run_in_threadpool(request.app.state.registry.get, 'retriever')
+    started = time.perf_counter()
+    try:
+        results = await run_in_threadpool(
+            retriever.search, q, k, source=source, created_after=created_after,
+            created_before=created_before, kinds=kind
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"results": results, "took_ms": round((time.perf_counter() - started) * 1000, 2)}
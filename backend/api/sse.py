@@ -0,0 +1,51 @@
+import asyncio
+import contextvars
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+def format_event(event: Dict[str, Any]) -> str:
+    data = {key: value for key, value in event.items() if key != 'event'}
+    return f"event: {event.get('event', 'message')}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def event_stream(first: Iterable[Dict[str, Any]], events: Iterator[Dict[str, Any]],
+                       heartbeat: float = 15.0, context: Optional[contextvars.Context] = None) -> AsyncIterator[str]:
+    # The blocking agent generator runs to completion on a worker thread even if the client leaves;
+    # comments keep proxies from timing out during long silent stages
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def produce() -> None:
+        try:
+            for event in events:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, {"event": "error", "status": "error", "message": str(e)})
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    producer = loop.run_in_executor(None, (context or contextvars.copy_context()).run, produce)
+    for event in first:
+        yield format_event(event)
+    while True:
+        try:
+            event = await asyncio.wait_for(queue.get(), heartbeat)
+        except asyncio.TimeoutError:
+            yield ": keep-alive\n\n"
+            continue
+        if event is None:
+            break
+        yield format_event(event)
+    await producer
+
+def sse_response(first: Iterable[Dict[str, Any]], events: Iterator[Dict[str, Any]]) -> StreamingResponse:
+    # Captured now, while the request's trace is still bound; the body streams after the middleware returns
+    context = contextvars.copy_context()
+    return StreamingResponse(event_stream(first, events, context=context), media_type="text/event-stream", headers=SSE_HEADERS)
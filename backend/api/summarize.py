@@ -1,37 +1,24 @@
-import os
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from agents.meeting_summary import MeetingSummaryAgent
-from models.transcription import TranscriptionService
-from models.ollama_request import OllamaApiClient
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from models.transcription import TranscriptionError
 
 router = APIRouter()
-model_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "vosk_model")
-
-transcription_service = TranscriptionService(model_path=model_path)
-ollama_api_client = OllamaApiClient()
-summary_agent = MeetingSummaryAgent(transcription_service, ollama_api_client)
 
 @router.post("/summarize")
-async def summarize_meeting(file: UploadFile = File(...)):
-    if not file or not file.filename.lower().endswith('.wav'):
+async def summarize_meeting(request: Request, file: UploadFile = File(...)):
+    if not file or not file.filename or not file.filename.lower().endswith('.wav'):
         raise HTTPException(status_code=400, detail="Invalid WAV file")
-    
+    if file.size == 0:
+        raise HTTPException(status_code=400, detail="Empty file")
+
+    summary_agent = await run_in_threadpool(request.app.state.registry.get, 'meeting_agent')
     try:
-        content = await file.read()
-        if len(content) == 0:
-            raise HTTPException(status_code=400, detail="Empty file")
-        
-        file_path = f"temp/{file.filename}"
-        os.makedirs("temp", exist_ok=True)
-        
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        try:
-            summary = summary_agent.summarize_meeting(file_path)
-            return {"summary": summary}
-        finally:
-            os.remove(file_path)
-                
+        transcript = await run_in_threadpool(summary_agent.transcribe, file.file)
+        summary, stats = await run_in_threadpool(summary_agent.summarize, transcript)
+        return {"summary": summary, "stats": stats}
+    except TranscriptionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,258 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_transcription import write_synthetic_wav
+from fakes import FakeOllama, FakeRecognizer, install_fake_vosk
+
+HIGHER_IS_BETTER = {"throughput_rps", "qps"}
+IGNORED = {"requests", "size"}
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def load(send: Callable[[int], requests.Response], total: int, concurrency: int) -> Dict[str, Any]:
+    def timed(i: int) -> Tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            response = send(i)
+            ok = response.status_code == 200 and response.json().get('status') != 'error'
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": total,
+        "errors": sum(1 for _, ok in results if not ok),
+        "throughput_rps": round(total / elapsed, 3),
+        **percentiles([seconds for seconds, _ in results])
+    }
+
+class AppServer:
+    # The API in-process on a real socket; fakes stand in for Ollama and Vosk, state lives in a temp dir
+    def __init__(self, workdir: str, ollama_url: str):
+        os.environ['SALES_AGENT_DATA_DIR'] = os.path.join(workdir, 'data')
+        os.environ['SALES_AGENT_OLLAMA_URL'] = ollama_url
+        os.chdir(workdir)
+        import uvicorn
+        import main
+
+        self.url = f"http://127.0.0.1:{free_port()}"
+        port = int(self.url.rsplit(':', 1)[1])
+        self.server = uvicorn.Server(uvicorn.Config(main.app, host='127.0.0.1', port=port, log_level='warning'))
+        self.thread = threading.Thread(target=self.server.run, name="bench-app", daemon=True)
+
+    def start(self, timeout: float = 120.0) -> 'AppServer':
+        self.thread.start()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                if requests.get(f"{self.url}/health/ready", timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError("API did not become ready")
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(30)
+
+def bench_api(args: argparse.Namespace, workdir: str) -> List[Dict[str, Any]]:
+    FakeRecognizer.realtime_factor = args.recognizer_rtf
+    install_fake_vosk()
+    ollama = FakeOllama(latency=args.ollama_latency, tokens_per_second=args.token_rate,
+                        response_tokens=args.response_tokens).start()
+    app = AppServer(workdir, ollama.url).start()
+    audio_path = os.path.join(workdir, 'meeting.wav')
+    write_synthetic_wav(audio_path, args.audio_seconds)
+    with open(audio_path, 'rb') as f:
+        audio = f.read()
+    # A per-run nonce keeps prompts unique, so the LLM and embedding caches never short-circuit the load
+    nonce = uuid.uuid4().hex[:8]
+    sequence = itertools.count()
+    session = requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=max(args.concurrency)))
+
+    endpoints = {
+        "process_meeting": lambda i: session.post(
+            f"{app.url}/process-meeting", files={"audio_file": (f"meeting-{i}.wav", audio, "audio/wav")}, timeout=600
+        ),
+        "lead_suggestions": lambda i: session.post(
+            f"{app.url}/get-lead-suggestions",
+            params={"requirements": f"CRM for a {next(sequence)}-seat sales team, run {nonce}"}, timeout=600
+        )
+    }
+    rows = []
+    try:
+        for name, send in endpoints.items():
+            for concurrency in args.concurrency:
+                result = load(send, args.requests, concurrency)
+                rows.append({"bench": name, "params": {"concurrency": concurrency}, "metrics": result})
+                print(f"{name:>18} c={concurrency:<3} {result['throughput_rps']:>8.2f} req/s "
+                      f"p50 {result['p50_ms']:>9.1f} ms  p95 {result['p95_ms']:>9.1f} ms  errors {result['errors']}")
+    finally:
+        app.stop()
+        ollama.stop()
+    return rows
+
+def bench_search(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from core.shared_memory import SharedMemoryService
+    from core.vector_index import IVFIndex
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for index_name in args.indexes:
+        for size in args.sizes:
+            # Same index settings as the API's shared memory
+            memory = SharedMemoryService(args.dim, index=IVFIndex(nlist=256, nprobe=16) if index_name == 'ivf' else None)
+            for start in range(0, size, 10_000):
+                batch = rng.normal(size=(min(10_000, size - start), args.dim)).astype(np.float32)
+                memory.add_vectors(batch, [{"type": "bench"} for _ in range(len(batch))])
+            queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+            memory.search_vectors(queries[0], args.k)
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                memory.search_vectors(query, args.k)
+                latencies.append(time.perf_counter() - start)
+            result = {"size": size, "qps": round(len(latencies) / sum(latencies), 1), **percentiles(latencies)}
+            rows.append({"bench": "search_vectors", "params": {"index": index_name, "size": size}, "metrics": result})
+            print(f"{'search_vectors':>18} {index_name:>5} {size:>9} {result['qps']:>9.1f} q/s "
+                  f"p50 {result['p50_ms']:>8.3f} ms  p95 {result['p95_ms']:>8.3f} ms")
+    return rows
+
+def run(args: argparse.Namespace) -> int:
+    args.out = os.path.abspath(args.out)
+    if args.quick:
+        args.requests, args.concurrency, args.audio_seconds = 8, [1, 4], 10.0
+        args.sizes, args.queries = [10_000, 50_000], 100
+    rows = []
+    workdir = tempfile.mkdtemp(prefix='sales-agent-bench-')
+    try:
+        if 'search' in args.only:
+            rows.extend(bench_search(args))
+        if 'api' in args.only:
+            rows.extend(bench_api(args, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ('func', 'out')}
+        },
+        "results": rows
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.out}")
+    return 0
+
+def key(row: Dict[str, Any]) -> str:
+    return row["bench"] + ''.join(f" {name}={value}" for name, value in sorted(row["params"].items()))
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    previous = {key(row): row["metrics"] for row in baseline["results"]}
+    changes = []
+    for row in current["results"]:
+        before = previous.get(key(row))
+        if before is None:
+            continue
+        for metric, value in row["metrics"].items():
+            if metric in IGNORED or metric not in before:
+                continue
+            old = before[metric]
+            if metric == "errors":
+                regressed = value > old
+                change = float(value - old)
+            else:
+                change = (value - old) / old if old else 0.0
+                worse = -change if metric in HIGHER_IS_BETTER else change
+                regressed = worse > threshold
+            changes.append({"key": key(row), "metric": metric, "baseline": old, "current": value,
+                            "change": change, "regression": regressed})
+    return changes
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    changes = compare_results(baseline, current, args.threshold)
+    print(f"{'benchmark':<40} {'metric':>15} {'baseline':>11} {'current':>11} {'change':>8}")
+    for change in changes:
+        shown = f"{change['change']:+.0f}" if change['metric'] == 'errors' else f"{change['change']:+.1%}"
+        flag = "  REGRESSION" if change['regression'] else ""
+        print(f"{change['key']:<40} {change['metric']:>15} {change['baseline']:>11} {change['current']:>11} {shown:>8}{flag}")
+    regressions = sum(1 for change in changes if change['regression'])
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmarks against fake Ollama and Vosk")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and write results as JSON")
+    run_parser.add_argument("--out", default="bench_results.json")
+    run_parser.add_argument("--only", nargs="+", choices=["api", "search"], default=["api", "search"])
+    run_parser.add_argument("--quick", action="store_true", help="Small sizes and request counts, for a smoke run")
+    run_parser.add_argument("--requests", type=int, default=32, help="Requests per endpoint and concurrency level")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    run_parser.add_argument("--audio-seconds", type=float, default=30.0)
+    run_parser.add_argument("--recognizer-rtf", type=float, default=0.05, help="Fake decoding time per second of audio")
+    run_parser.add_argument("--ollama-latency", type=float, default=0.2, help="Fake time to first token, seconds")
+    run_parser.add_argument("--token-rate", type=float, default=200.0, help="Fake generated tokens per second")
+    run_parser.add_argument("--response-tokens", type=int, default=80)
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    run_parser.add_argument("--indexes", nargs="+", choices=["flat", "ivf"], default=["flat", "ivf"])
+    run_parser.add_argument("--dim", type=int, default=768)
+    run_parser.add_argument("--queries", type=int, default=200)
+    run_parser.add_argument("--k", type=int, default=5)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions against a saved baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()
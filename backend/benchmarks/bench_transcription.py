@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.parallel_transcription import ParallelTranscriber
+from models.transcription import TranscriptionService
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'vosk_model')
+
+def write_synthetic_wav(path: str, seconds: float, sample_rate: int = 16000, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        written = 0.0
+        while written < seconds:
+            # Speech-like bursts of harmonics separated by short pauses
+            burst = rng.uniform(1.0, 6.0)
+            t = np.arange(int(burst * sample_rate)) / sample_rate
+            pitch = rng.uniform(90, 220)
+            envelope = np.abs(np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+            signal = sum(np.sin(2 * np.pi * pitch * h * t) / h for h in range(1, 6)) * envelope
+            signal += 0.05 * rng.normal(size=len(t))
+            pause = np.zeros(int(rng.uniform(0.2, 1.5) * sample_rate))
+            samples = np.concatenate([signal / 3.0, pause])
+            wf.writeframes((np.clip(samples, -1, 1) * 12000).astype(np.int16).tobytes())
+            written += len(samples) / sample_rate
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs parallel transcription wall-clock time")
+    parser.add_argument("--model-path", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--audio", help="Existing mono 16-bit WAV; a synthetic one is generated otherwise")
+    parser.add_argument("--minutes", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--segment-seconds", type=float, default=60.0)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    audio = args.audio
+    if not audio:
+        audio = os.path.join(tempfile.mkdtemp(), "synthetic.wav")
+        write_synthetic_wav(audio, args.minutes * 60)
+    with wave.open(audio, "rb") as wf:
+        duration = wf.getnframes() / wf.getframerate()
+
+    rows = []
+    service = TranscriptionService(args.model_path).load()
+    start = time.perf_counter()
+    serial_text = service.transcribe(audio)
+    serial = time.perf_counter() - start
+    rows.append({"mode": "serial", "workers": 1, "seconds": serial, "rtf": serial / duration,
+                 "speedup": 1.0, "words": len(serial_text.split())})
+
+    for workers in sorted(set(args.workers)):
+        transcriber = ParallelTranscriber(args.model_path, workers=workers, segment_seconds=args.segment_seconds)
+        transcriber.warm_up()
+        start = time.perf_counter()
+        text = transcriber.transcribe(audio)
+        elapsed = time.perf_counter() - start
+        transcriber.close()
+        rows.append({"mode": "parallel", "workers": workers, "seconds": elapsed, "rtf": elapsed / duration,
+                     "speedup": serial / elapsed, "words": len(text.split())})
+
+    print(f"audio: {duration / 60:.1f} min")
+    print(f"{'mode':>9} {'workers':>8} {'seconds':>9} {'RTF':>7} {'speedup':>8} {'words':>7}")
+    for row in rows:
+        print(f"{row['mode']:>9} {row['workers']:>8} {row['seconds']:>9.2f} {row['rtf']:>7.3f} "
+              f"{row['speedup']:>8.2f} {row['words']:>7}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"duration_s": duration, "results": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
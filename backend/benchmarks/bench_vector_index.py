@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.vector_index import FlatIndex, IVFIndex, HNSWIndex
+from core.vector_store import VectorStore
+
+def make_dataset(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    return centers[labels] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+
+def recall(found: List[List[int]], truth: List[List[int]]) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / max(sum(len(t) for t in truth), 1)
+
+def run_queries(store: VectorStore, queries: np.ndarray, k: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    results = [store.search(query, k) for query in queries]
+    elapsed = time.perf_counter() - start
+    return {
+        "ids": [[item['id'] for item in result] for result in results],
+        "latency_ms": 1000 * elapsed / len(queries)
+    }
+
+def bench_size(n: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    data = make_dataset(n + args.queries, args.dim, clusters=max(n // 1000, 16))
+    data, queries = data[:n], data[n:]
+    rows = []
+
+    exact = VectorStore(args.dim, initial_capacity=n, index=FlatIndex())
+    exact.add(data, [{} for _ in range(n)])
+    baseline = run_queries(exact, queries, args.k)
+    rows.append({"size": n, "index": "flat", "param": "-", "recall": 1.0,
+                 "latency_ms": baseline["latency_ms"], "build_s": 0.0})
+
+    nlist = int(4 * np.sqrt(n))
+    ivf = IVFIndex(nlist=nlist)
+    store = VectorStore(args.dim, initial_capacity=n, index=ivf)
+    store.add(data, [{} for _ in range(n)])
+    start = time.perf_counter()
+    ivf.train(store.vectors)
+    build = time.perf_counter() - start
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        result = run_queries(store, queries, args.k)
+        rows.append({"size": n, "index": f"ivf{nlist}", "param": f"nprobe={nprobe}",
+                     "recall": recall(result["ids"], baseline["ids"]),
+                     "latency_ms": result["latency_ms"], "build_s": build})
+
+    try:
+        hnsw = HNSWIndex(args.dim)
+    except ImportError:
+        return rows
+    store = VectorStore(args.dim, initial_capacity=n, index=hnsw)
+    start = time.perf_counter()
+    store.add(data, [{} for _ in range(n)])
+    build = time.perf_counter() - start
+    for ef in args.ef_search:
+        hnsw.ef_search = ef
+        result = run_queries(store, queries, args.k)
+        rows.append({"size": n, "index": "hnsw", "param": f"efSearch={ef}",
+                     "recall": recall(result["ids"], baseline["ids"]),
+                     "latency_ms": result["latency_ms"], "build_s": build})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency of ANN indexes against exact search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'size':>9} {'index':>9} {'param':>14} {'recall':>7} {'ms/query':>9} {'build s':>8}")
+    for n in args.sizes:
+        for row in bench_size(n, args):
+            rows.append(row)
+            print(f"{row['size']:>9} {row['index']:>9} {row['param']:>14} "
+                  f"{row['recall']:>7.3f} {row['latency_ms']:>9.3f} {row['build_s']:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import hashlib
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+
+VOCABULARY = (
+    "we need a crm that integrates with our billing system pricing is a concern for the finance team "
+    "the pilot should start next quarter with two hundred seats and support for salesforce migration "
+    "legacy tools slow down onboarding our region is europe and the budget is approved"
+).split()
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients drop idle keep-alive connections; that is not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class FakeOllama:
+    # Stand-in for the Ollama HTTP API: fixed time to first token, then tokens at a steady rate
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.2, tokens_per_second: float = 200.0,
+                 response_tokens: int = 80, embed_latency: float = 0.01, dim: int = 768, leads: int = 3,
+                 model_latency: Optional[Dict[str, float]] = None):
+        self.latency = latency
+        self.model_latency = dict(model_latency or {})
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.embed_latency = embed_latency
+        self.dim = dim
+        self.leads = leads
+        self.requests = 0
+        self.models: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = _QuietServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeOllama':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def embed(self, text: str) -> List[float]:
+        # Deterministic per text, so repeated runs produce identical stores
+        seed = int.from_bytes(hashlib.sha1(text.encode()).digest()[:8], 'little')
+        vector = np.random.default_rng(seed).normal(size=self.dim)
+        return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+    def completion(self, prompt: str, structured: bool) -> List[str]:
+        seed = hashlib.sha1(prompt.encode()).hexdigest()[:8]
+        if structured:
+            leads = [
+                {"company_name": f"Company {seed}-{i}", "industry": "Software", "company_size": "100-500",
+                 "pain_points": ["legacy crm"], "relevance_score": round(0.9 - 0.1 * i, 2)}
+                for i in range(self.leads)
+            ]
+            text = json.dumps({"leads": leads})
+            return [text[i:i + 4] for i in range(0, len(text), 4)]
+        words = itertools.islice(itertools.cycle(VOCABULARY), int(seed, 16) % len(VOCABULARY), None)
+        return [word + ' ' for word in itertools.islice(words, self.response_tokens)]
+
+    def _handler(self) -> Type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, body: bytes, content_type: str = 'application/json') -> None:
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                self._send(json.dumps({"models": [{"name": "llama3.2:latest"}]}).encode())
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with fake._lock:
+                    fake.requests += 1
+                    fake.models[body.get('model')] = fake.models.get(body.get('model'), 0) + 1
+                if self.path == '/api/embed':
+                    texts = body.get('input') or []
+                    texts = [texts] if isinstance(texts, str) else texts
+                    time.sleep(fake.embed_latency)
+                    self._send(json.dumps({"model": body.get('model'), "embeddings": [fake.embed(t) for t in texts]}).encode())
+                elif self.path == '/api/generate':
+                    self._generate(body)
+                else:
+                    self.send_error(404)
+
+            def _generate(self, body: Dict[str, Any]) -> None:
+                prompt = body.get('prompt', '')
+                tokens = fake.completion(prompt, bool(body.get('format')))
+                counts = {"prompt_eval_count": len(prompt.split()), "eval_count": len(tokens)}
+                time.sleep(fake.model_latency.get(body.get('model'), fake.latency))
+                if not body.get('stream', True):
+                    time.sleep(len(tokens) / fake.tokens_per_second)
+                    self._send(json.dumps({"model": body.get('model'), "response": ''.join(tokens), "done": True, **counts}).encode())
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                # Sleep per batch of tokens; per-token sleeps would be dominated by timer granularity
+                batch = max(int(fake.tokens_per_second / 50), 1)
+                for start in range(0, len(tokens), batch):
+                    time.sleep(len(tokens[start:start + batch]) / fake.tokens_per_second)
+                    lines = ''.join(json.dumps({"response": token, "done": False}) + '\n' for token in tokens[start:start + batch])
+                    self._chunk(lines.encode())
+                self._chunk((json.dumps({"response": "", "done": True, **counts}) + '\n').encode())
+                self._chunk(b'')
+
+            def _chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+class FakeModel:
+    load_seconds = 0.0
+
+    def __init__(self, path: str):
+        self.path = path
+        time.sleep(self.load_seconds)
+
+class FakeRecognizer:
+    # Emits a final result per utterance of audio, sleeping realtime_factor x audio duration to mimic decoding cost
+    realtime_factor = 0.05
+    utterance_seconds = 4.0
+    words_per_second = 2.5
+    _instances = itertools.count()
+
+    def __init__(self, model: FakeModel, sample_rate: float):
+        self.sample_rate = sample_rate
+        self.position = 0.0
+        self.utterance_start = 0.0
+        self.words: List[Dict[str, Any]] = []
+        # A different word stream per recognizer keeps transcripts (and so LLM cache keys) distinct across requests
+        self._rng = random.Random(next(self._instances))
+
+    def SetWords(self, enabled: bool) -> None:
+        pass
+
+    def _advance(self, seconds: float) -> None:
+        time.sleep(seconds * self.realtime_factor)
+        end = self.position + seconds
+        step = 1.0 / self.words_per_second
+        next_word = self.utterance_start + step * (len(self.words) + 1)
+        while next_word <= end:
+            self.words.append({"word": self._rng.choice(VOCABULARY), "start": next_word - step * 0.8, "end": next_word, "conf": 1.0})
+            next_word += step
+        self.position = end
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        self._advance(len(data) / (2 * self.sample_rate))
+        return self.position - self.utterance_start >= self.utterance_seconds
+
+    def _take(self) -> str:
+        words, self.words = self.words, []
+        self.utterance_start = self.position
+        return json.dumps({"text": ' '.join(word['word'] for word in words), "result": words})
+
+    def Result(self) -> str:
+        return self._take()
+
+    def FinalResult(self) -> str:
+        return self._take()
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": ' '.join(word['word'] for word in self.words)})
+
+def install_fake_vosk(recognizer: Type[FakeRecognizer] = FakeRecognizer, model: Type[FakeModel] = FakeModel) -> types.ModuleType:
+    # Must run before the first transcription (vosk is imported lazily); pass subclasses to change timing or output
+    module = types.ModuleType('vosk')
+    module.Model = model
+    module.KaldiRecognizer = recognizer
+    module.SetLogLevel = lambda level: None
+    sys.modules['vosk'] = module
+    return module
@@ -0,0 +1,187 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_NAMESPACE = "default"
+
+class ContextBackend(ABC):
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Dict[str, Any], ttl: Optional[float]) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def delete(self, namespace: str, key: Optional[str] = None) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def keys(self, namespace: str) -> List[str]:
+        raise NotImplementedError()
+
+class MemoryContextBackend(ContextBackend):
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Optional[float], Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, entry_key: Tuple[str, str]) -> None:
+        _, _, size = self._entries.pop(entry_key)
+        self._bytes -= size
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        entry_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._drop(entry_key)
+                return None
+            self._entries.move_to_end(entry_key)
+            return value
+
+    def set(self, namespace: str, key: str, value: Dict[str, Any], ttl: Optional[float]) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            raise ValueError(f"Context {namespace}/{key} is larger than the {self.max_bytes} byte cap")
+        entry_key = (namespace, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self._drop(entry_key)
+            self._entries[entry_key] = (time.time() + ttl if ttl else None, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def delete(self, namespace: str, key: Optional[str] = None) -> None:
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == namespace and (key is None or k[1] == key)]:
+                self._drop(entry_key)
+
+    def keys(self, namespace: str) -> List[str]:
+        now = time.time()
+        with self._lock:
+            return [
+                k[1] for k, (expires_at, _, _) in self._entries.items()
+                if k[0] == namespace and (expires_at is None or expires_at > now)
+            ]
+
+class SQLiteContextBackend(ContextBackend):
+    def __init__(self, db_path: str, max_entries: int = 100_000, max_bytes: int = 256 * 1024 * 1024,
+                 touch_batch: int = 256):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.touch_batch = touch_batch
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        # Reads only note their access time; touches reach the table in one UPDATE batch
+        self._touched: Dict[Tuple[str, str], float] = {}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS context ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_context_accessed ON context (accessed_at)")
+            self._conn.commit()
+            self._count()
+
+    def _count(self) -> None:
+        # Caller holds self._lock; resyncs the running totals, which other processes' writes can skew
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM context"
+        ).fetchone()
+
+    def _flush_touches(self) -> None:
+        # Caller holds self._lock and commits
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE context SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                [(accessed_at, namespace, key) for (namespace, key), accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self, now: float) -> None:
+        # Caller holds self._lock; expired rows go first, then the least recently used down to 90% of the caps
+        self._conn.execute("DELETE FROM context WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        self._count()
+        if self._entries > self.max_entries or self._bytes > self.max_bytes:
+            self._conn.execute(
+                "DELETE FROM context WHERE rowid IN ("
+                "SELECT rowid FROM (SELECT rowid, "
+                "ROW_NUMBER() OVER (ORDER BY accessed_at DESC) AS position, "
+                "SUM(size) OVER (ORDER BY accessed_at DESC) AS running FROM context) "
+                "WHERE position > ? OR running > ?)",
+                (int(self.max_entries * 0.9), int(self.max_bytes * 0.9))
+            )
+            self._count()
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM context WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[(namespace, key)] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touches()
+                self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Dict[str, Any], ttl: Optional[float]) -> None:
+        payload = json.dumps(value, default=str)
+        if len(payload) > self.max_bytes:
+            raise ValueError(f"Context {namespace}/{key} is larger than the {self.max_bytes} byte cap")
+        now = time.time()
+        with self._lock:
+            self._touched.pop((namespace, key), None)
+            self._flush_touches()
+            replaced = self._conn.execute(
+                "SELECT size FROM context WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO context (namespace, key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, payload, len(payload), now + ttl if ttl else None, now)
+            )
+            if replaced is None:
+                self._entries += 1
+            self._bytes += len(payload) - (replaced[0] if replaced else 0)
+            if self._entries > self.max_entries or self._bytes > self.max_bytes:
+                self._evict(now)
+            self._conn.commit()
+
+    def delete(self, namespace: str, key: Optional[str] = None) -> None:
+        with self._lock:
+            self._flush_touches()
+            if key is None:
+                self._conn.execute("DELETE FROM context WHERE namespace = ?", (namespace,))
+            else:
+                self._conn.execute("DELETE FROM context WHERE namespace = ? AND key = ?", (namespace, key))
+            self._conn.commit()
+            self._count()
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM context WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time())
+            ).fetchall()
+        return [row[0] for row in rows]
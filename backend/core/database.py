@@ -1,32 +1,444 @@
-from typing import Dict, Any, List
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 import sqlalchemy as sa
 from sqlalchemy.orm import sessionmaker
+from core.metrics import ROWS_WRITTEN, track
 from sqlalchemy.ext.declarative import declarative_base
 
+DEFAULT_DB_URL = 'sqlite:///sales_agent.db'
+
 Base = declarative_base()
 
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+# External-content FTS5 index over meeting_chunks, kept in sync by triggers so bulk inserts index themselves
+MEETING_CHUNKS_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS meeting_chunks_fts USING fts5("
+    "text, content='meeting_chunks', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS meeting_chunks_ai AFTER INSERT ON meeting_chunks BEGIN "
+    "INSERT INTO meeting_chunks_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS meeting_chunks_ad AFTER DELETE ON meeting_chunks BEGIN "
+    "INSERT INTO meeting_chunks_fts(meeting_chunks_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+)
+
+_engines: Dict[str, sa.engine.Engine] = {}
+_engines_lock = threading.Lock()
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+def get_engine(db_url: str = DEFAULT_DB_URL) -> sa.engine.Engine:
+    with _engines_lock:
+        engine = _engines.get(db_url)
+        if engine is None:
+            if db_url.startswith('sqlite'):
+                engine = sa.create_engine(
+                    db_url, pool_size=8, max_overflow=8, pool_pre_ping=True,
+                    connect_args={"check_same_thread": False, "timeout": 30}
+                )
+                sa.event.listen(engine, "connect", _apply_sqlite_pragmas)
+            else:
+                engine = sa.create_engine(db_url, pool_size=8, max_overflow=8, pool_pre_ping=True)
+            _engines[db_url] = engine
+        return engine
+
+def init_db(db_url: str = DEFAULT_DB_URL) -> sa.engine.Engine:
+    engine = get_engine(db_url)
+    Base.metadata.create_all(engine)
+    # create_all never alters existing tables, so add columns introduced after the table was created
+    existing = {column['name'] for column in sa.inspect(engine).get_columns(Lead.__tablename__)}
+    with engine.begin() as connection:
+        for column in Lead.__table__.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(engine.dialect)
+                connection.execute(sa.text(f"ALTER TABLE {Lead.__tablename__} ADD COLUMN {column.name} {column_type}"))
+        for index in Lead.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        if engine.dialect.name == 'sqlite':
+            for statement in MEETING_CHUNKS_FTS:
+                connection.execute(sa.text(statement))
+    return engine
+
 class DatabaseService:
-    def __init__(self, db_url: str = 'sqlite:///sales_agent.db'):
-        self.engine = sa.create_engine(db_url)
-        self.Session = sessionmaker(bind=self.engine)
+    def __init__(self, db_url: str = DEFAULT_DB_URL, engine: Optional[sa.engine.Engine] = None):
+        self.engine = engine or get_engine(db_url)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    @staticmethod
+    def _lead(lead_data: Dict[str, Any], vector: Optional[Sequence[float]]) -> "Lead":
+        lead_entry = Lead(**lead_data)
+        if vector is not None:
+            lead_entry.embedding = np.asarray(vector, dtype=np.float32).tobytes()
+        return lead_entry
 
     def store_lead(self, lead_data: Dict[str, Any], vector: List[float]) -> int:
+        return self.store_leads_bulk([lead_data], [vector])[0]
+
+    def store_leads_bulk(self, leads: List[Dict[str, Any]],
+                         vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> List[int]:
+        if vectors is not None and len(vectors) != len(leads):
+            raise ValueError(f"Got {len(leads)} leads but {len(vectors)} vectors")
+        if not leads:
+            return []
+        return self._insert_all([
+            self._lead(lead_data, vectors[i] if vectors is not None else None)
+            for i, lead_data in enumerate(leads)
+        ])
+
+    def _insert_all(self, entries: List[Any]) -> List[int]:
+        table = entries[0].__tablename__ if entries else 'none'
+        with track(f"db.insert.{table}", rows=len(entries)):
+            with self.Session() as session:
+                try:
+                    session.add_all(entries)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+        ROWS_WRITTEN.inc(len(entries), table=table)
+        return [entry.id for entry in entries]
+
+    @staticmethod
+    def _meetings(meetings: List[Dict[str, Any]],
+                  vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> List["Meeting"]:
+        if vectors is not None and len(vectors) != len(meetings):
+            raise ValueError(f"Got {len(meetings)} meetings but {len(vectors)} vectors")
+        entries = []
+        for i, meeting_data in enumerate(meetings):
+            entry = Meeting(**meeting_data)
+            if vectors is not None and vectors[i] is not None:
+                entry.embedding = np.asarray(vectors[i], dtype=np.float32).tobytes()
+            entries.append(entry)
+        return entries
+
+    def store_meetings_bulk(self, meetings: List[Dict[str, Any]],
+                            vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> List[int]:
+        entries = self._meetings(meetings, vectors)
+        return self._insert_all(entries) if entries else []
+
+    def store_meetings_with_chunks(
+        self, meetings: List[Dict[str, Any]], vectors: Optional[Sequence[Optional[Sequence[float]]]],
+        chunker: Callable[[int, Dict[str, Any]], List[Dict[str, Any]]]
+    ) -> Tuple[List[int], List[Dict[str, Any]], List[int]]:
+        # One transaction, so a meeting is never committed without the chunks that make it searchable
+        entries = self._meetings(meetings, vectors)
+        if not entries:
+            return [], [], []
+        with track("db.insert.meetings", rows=len(entries)):
+            with self.Session() as session:
+                try:
+                    session.add_all(entries)
+                    session.flush()
+                    chunks = [chunk for entry, meeting in zip(entries, meetings) for chunk in chunker(entry.id, meeting)]
+                    chunk_entries = [MeetingChunk(**chunk) for chunk in chunks]
+                    session.add_all(chunk_entries)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+        ROWS_WRITTEN.inc(len(entries), table='meetings')
+        ROWS_WRITTEN.inc(len(chunk_entries), table='meeting_chunks')
+        return [entry.id for entry in entries], chunks, [entry.id for entry in chunk_entries]
+
+    def store_meeting_chunks(self, chunks: List[Dict[str, Any]]) -> List[int]:
+        return self._insert_all([MeetingChunk(**chunk) for chunk in chunks]) if chunks else []
+
+    @staticmethod
+    def _chunk_filters(query: sa.Select, source: Optional[str] = None,
+                       created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                       kinds: Optional[Sequence[str]] = None) -> sa.Select:
+        if source:
+            query = query.where(MeetingChunk.source == source)
+        if created_after:
+            query = query.where(MeetingChunk.created_at >= created_after)
+        if created_before:
+            query = query.where(MeetingChunk.created_at < created_before)
+        if kinds:
+            query = query.where(MeetingChunk.kind.in_(list(kinds)))
+        return query
+
+    def keyword_search_chunks(self, match: str, limit: int = 50, **filters) -> List[int]:
+        fts = sa.table('meeting_chunks_fts', sa.column('rowid'))
+        query = sa.select(fts.c.rowid)
+        if any(filters.values()):
+            # The join costs a primary-key lookup per match, so it is only paid when filtering
+            query = self._chunk_filters(
+                sa.select(MeetingChunk.id).join(fts, fts.c.rowid == MeetingChunk.id), **filters
+            )
+        query = (
+            query.where(sa.text("meeting_chunks_fts MATCH :match").bindparams(match=match))
+            .order_by(sa.text("bm25(meeting_chunks_fts)"))
+            .limit(limit)
+        )
+        with self.engine.connect() as connection:
+            return list(connection.execute(query).scalars())
+
+    def filter_chunk_ids(self, limit: int, **filters) -> List[int]:
+        query = self._chunk_filters(sa.select(MeetingChunk.id), **filters).limit(limit)
+        with self.engine.connect() as connection:
+            return list(connection.execute(query).scalars())
+
+    def get_chunks(self, chunk_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        query = sa.select(
+            MeetingChunk.id, MeetingChunk.meeting_id, MeetingChunk.kind, MeetingChunk.position,
+            MeetingChunk.source, MeetingChunk.created_at, MeetingChunk.text
+        ).where(MeetingChunk.id.in_(list(chunk_ids)))
+        with self.engine.connect() as connection:
+            return {row.id: dict(row._mapping) for row in connection.execute(query)}
+
+    def get_lead_ids(self, with_embedding: bool = False) -> List[int]:
+        query = sa.select(Lead.id)
+        if with_embedding:
+            query = query.where(Lead.embedding.is_not(None))
+        with self.engine.connect() as connection:
+            return list(connection.execute(query).scalars())
+
+    def get_lead_embeddings(self, lead_ids: Optional[Sequence[int]] = None) -> List[Tuple[int, Optional[str], Optional[np.ndarray]]]:
+        query = sa.select(Lead.id, Lead.source, Lead.embedding)
+        if lead_ids is not None:
+            query = query.where(Lead.id.in_(list(lead_ids)))
+        with self.engine.connect() as connection:
+            return [
+                (lead_id, source, np.frombuffer(embedding, dtype=np.float32) if embedding else None)
+                for lead_id, source, embedding in connection.execute(query)
+            ]
+
+    def get_meeting_ids(self, with_embedding: bool = False) -> List[int]:
+        query = sa.select(Meeting.id)
+        if with_embedding:
+            query = query.where(Meeting.embedding.is_not(None))
+        with self.engine.connect() as connection:
+            return list(connection.execute(query).scalars())
+
+    def get_meeting_embeddings(self, meeting_ids: Sequence[int]) -> List[Tuple[int, Optional[str], np.ndarray]]:
+        query = sa.select(Meeting.id, Meeting.source, Meeting.embedding).where(
+            Meeting.id.in_(list(meeting_ids)), Meeting.embedding.is_not(None)
+        )
+        with self.engine.connect() as connection:
+            return [
+                (meeting_id, source, np.frombuffer(embedding, dtype=np.float32))
+                for meeting_id, source, embedding in connection.execute(query)
+            ]
+
+    def get_chunk_ids(self) -> List[int]:
+        with self.engine.connect() as connection:
+            return list(connection.execute(sa.select(MeetingChunk.id)).scalars())
+
+    def find_leads(self, source: Optional[str] = None, industry: Optional[str] = None,
+                   created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                   limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        query = sa.select(
+            Lead.id, Lead.company_name, Lead.industry, Lead.source, Lead.details, Lead.created_at,
+            Lead.status, Lead.score
+        )
+        if source is not None:
+            query = query.where(Lead.source == source)
+        if industry is not None:
+            query = query.where(Lead.industry == industry)
+        if created_after is not None:
+            query = query.where(Lead.created_at >= created_after)
+        if created_before is not None:
+            query = query.where(Lead.created_at < created_before)
+        query = query.order_by(Lead.created_at.desc(), Lead.id.desc()).limit(limit).offset(offset)
         with self.Session() as session:
-            try:
-                lead_entry = Lead(**lead_data)
-                session.add(lead_entry)
-                session.commit()
-                return lead_entry.id
-            except Exception as e:
-                session.rollback()
-                raise
+            return [dict(row._mapping) for row in session.execute(query)]
+
+    def get_leads_by_source(self, source: str, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.find_leads(source=source, limit=limit)
+
+    def get_leads_by_industry(self, industry: str, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.find_leads(industry=industry, limit=limit)
+
+    def get_leads_between(self, start: datetime, end: datetime, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.find_leads(created_after=start, created_before=end, limit=limit)
+
+    def get_top_scored_leads(self, limit: int = 100) -> List[Dict[str, Any]]:
+        query = (
+            sa.select(Lead.id, Lead.company_name, Lead.industry, Lead.source, Lead.status, Lead.score)
+            .where(Lead.score.is_not(None))
+            .order_by(Lead.score.desc())
+            .limit(limit)
+        )
+        with self.Session() as session:
+            return [dict(row._mapping) for row in session.execute(query)]
+
+    def set_lead_status(self, lead_ids: Sequence[int], status: str) -> None:
+        with self.Session() as session:
+            session.execute(
+                sa.update(Lead).where(Lead.id.in_(list(lead_ids)))
+                .values(status=status, updated_at=datetime.utcnow())
+            )
+            session.commit()
+
+    def get_lead_ids_by_status(self, status: str) -> List[int]:
+        with self.Session() as session:
+            return list(session.scalars(sa.select(Lead.id).where(Lead.status == status)))
+
+    def iter_lead_batches(self, batch_size: int = 5000, changed_only: bool = False) -> Iterator[List[sa.Row]]:
+        # Keyset pagination keeps every batch an index range scan regardless of table size
+        query = sa.select(Lead.id, Lead.details, Lead.created_at, Lead.updated_at, Lead.embedding)
+        if changed_only:
+            query = query.where(sa.or_(Lead.scored_at.is_(None), Lead.updated_at > Lead.scored_at))
+        last_id = 0
+        while True:
+            with self.Session() as session:
+                rows = session.execute(
+                    query.where(Lead.id > last_id).order_by(Lead.id).limit(batch_size)
+                ).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
+    def update_lead_scores(self, lead_ids: Sequence[int], scores: Sequence[float],
+                           scored_at: Optional[datetime] = None) -> int:
+        if len(lead_ids) != len(scores):
+            raise ValueError(f"Got {len(lead_ids)} lead ids but {len(scores)} scores")
+        scored_at = scored_at or datetime.utcnow()
+        statement = (
+            sa.update(Lead.__table__)
+            .where(Lead.__table__.c.id == sa.bindparam('lead_id'))
+            .values(score=sa.bindparam('new_score'), scored_at=scored_at)
+        )
+        with track('db.update_lead_scores', rows=len(lead_ids)), self.engine.begin() as connection:
+            connection.execute(statement, [
+                {"lead_id": int(lead_id), "new_score": float(score)} for lead_id, score in zip(lead_ids, scores)
+            ])
+        ROWS_WRITTEN.inc(len(lead_ids), table='leads')
+        return len(lead_ids)
+
+class LeadWriteBuffer:
+    def __init__(self, db_service: DatabaseService, max_batch: int = 64, flush_interval: float = 0.25):
+        self.db_service = db_service
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[Dict[str, Any], Optional[Sequence[float]], Future]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._force = False
+        self._thread = threading.Thread(target=self._run, name="lead-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, lead_data: Dict[str, Any], vector: Optional[Sequence[float]] = None) -> Future:
+        return self.submit_many([lead_data], [vector])[0]
+
+    def submit_many(self, leads: List[Dict[str, Any]],
+                    vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> List[Future]:
+        futures = [Future() for _ in leads]
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Lead write buffer is closed")
+            was_empty = not self._pending
+            self._pending.extend(
+                (lead_data, vectors[i] if vectors is not None else None, futures[i])
+                for i, lead_data in enumerate(leads)
+            )
+            if was_empty or len(self._pending) >= self.max_batch:
+                self._condition.notify()
+        return futures
+
+    def _take(self) -> List[Tuple[Dict[str, Any], Optional[Sequence[float]], Future]]:
+        with self._condition:
+            deadline = None
+            while not (self._closed or self._force) and len(self._pending) < self.max_batch:
+                if self._pending and deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                self._condition.wait(timeout)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            self._force = bool(self._force and self._pending)
+            return batch
+
+    def _write(self, batch: List[Tuple[Dict[str, Any], Optional[Sequence[float]], Future]]) -> None:
+        try:
+            lead_ids = self.db_service.store_leads_bulk(
+                [lead_data for lead_data, _, _ in batch], [vector for _, vector, _ in batch]
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), lead_id in zip(batch, lead_ids):
+            future.set_result(lead_id)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take()
+            if batch:
+                self._write(batch)
+            elif self._closed:
+                return
+
+    def flush(self) -> None:
+        with self._condition:
+            futures = [future for _, _, future in self._pending]
+            self._force = bool(futures)
+            self._condition.notify()
+        for future in futures:
+            future.exception()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
 
 class Lead(Base):
     __tablename__ = 'leads'
     id = sa.Column(sa.Integer, primary_key=True)
     company_name = sa.Column(sa.String)
-    industry = sa.Column(sa.String)
-    source = sa.Column(sa.String)
+    industry = sa.Column(sa.String, index=True)
+    source = sa.Column(sa.String, index=True)
+    details = sa.Column(sa.JSON)
+    embedding = sa.Column(sa.LargeBinary, nullable=True)
+    created_at = sa.Column(sa.DateTime, default=datetime.utcnow, index=True)
+    updated_at = sa.Column(sa.DateTime, default=datetime.utcnow)
+    status = sa.Column(sa.String, default='open', index=True)
+    score = sa.Column(sa.Float, nullable=True, index=True)
+    scored_at = sa.Column(sa.DateTime, nullable=True)
+
+    __table_args__ = (
+        sa.Index('ix_leads_source_created_at', 'source', 'created_at'),
+    )
+
+class Meeting(Base):
+    __tablename__ = 'meetings'
+    id = sa.Column(sa.Integer, primary_key=True)
+    source = sa.Column(sa.String, index=True)
+    file_hash = sa.Column(sa.String, index=True)
+    transcript = sa.Column(sa.Text)
+    summary = sa.Column(sa.Text)
     details = sa.Column(sa.JSON)
+    embedding = sa.Column(sa.LargeBinary, nullable=True)
+    created_at = sa.Column(sa.DateTime, default=datetime.utcnow, index=True)
+
+class MeetingChunk(Base):
+    __tablename__ = 'meeting_chunks'
+    id = sa.Column(sa.Integer, primary_key=True)
+    meeting_id = sa.Column(sa.Integer, sa.ForeignKey('meetings.id'), index=True)
+    kind = sa.Column(sa.String)
+    position = sa.Column(sa.Integer)
+    text = sa.Column(sa.Text)
+    source = sa.Column(sa.String)
+    created_at = sa.Column(sa.DateTime, default=datetime.utcnow)
 
-Base.metadata.create_all(sa.create_engine('sqlite:///sales_agent.db'))
\ No newline at end of file
+    __table_args__ = (
+        sa.Index('ix_meeting_chunks_source_created_at', 'source', 'created_at'),
+        sa.Index('ix_meeting_chunks_created_at', 'created_at'),
+    )
@@ -0,0 +1,218 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Dict, Any, List, Optional
+
+from core.orchestrator import CentralOrchestrator, TaskType
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+FINISHED = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+TRANSCRIBED_TASKS = {TaskType.MEETING_SUMMARY, TaskType.MEETING_TO_LEADS}
+
+class QueueFullError(Exception):
+    pass
+
+def _boot_id() -> str:
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class JobStore:
+    def __init__(self, db_path: str = 'jobs.db'):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Several API workers share jobs.db, so each job records the process (boot id + pid) that runs it
+        self.owner = f"{_boot_id()}:{os.getpid()}"
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, task TEXT NOT NULL, status TEXT NOT NULL, "
+                "input TEXT, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, owner TEXT)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if 'owner' not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            stale = self._stale_jobs()
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                [(JobStatus.FAILED.value, "Interrupted by restart", time.time(), job_id,
+                  JobStatus.QUEUED.value, JobStatus.RUNNING.value) for job_id in stale]
+            )
+            self._conn.commit()
+
+    def _stale_jobs(self) -> List[str]:
+        # Only jobs whose owner is gone: from an earlier boot, a dead pid, or this pid's previous life
+        boot, pid = self.owner.rsplit(':', 1)
+        stale = []
+        rows = self._conn.execute(
+            "SELECT id, owner FROM jobs WHERE status IN (?, ?)", (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+        ).fetchall()
+        for job_id, owner in rows:
+            owner_boot, _, owner_pid = (owner or '').rpartition(':')
+            if not owner_pid.isdigit() or owner_boot != boot or owner_pid == pid or not _alive(int(owner_pid)):
+                stale.append(job_id)
+        return stale
+
+    def create(self, job_id: str, task: TaskType, input_data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, task, status, input, created_at, owner) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, task.name, JobStatus.QUEUED.value, json.dumps(input_data, default=str), time.time(), self.owner)
+            )
+            self._conn.commit()
+
+    def update(self, job_id: str, status: JobStatus, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None) -> bool:
+        # Finished is final: a late worker write can't overwrite a cancel, and vice versa
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, "
+                "result = COALESCE(?, result), error = COALESCE(?, error), "
+                "started_at = CASE WHEN ? THEN ? ELSE started_at END, "
+                "finished_at = CASE WHEN ? THEN ? ELSE finished_at END "
+                "WHERE id = ? AND status NOT IN (?, ?, ?)",
+                (status.value, json.dumps(result, default=str) if result is not None else None, error,
+                 status == JobStatus.RUNNING, now, status in FINISHED, now, job_id, *(s.value for s in FINISHED))
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, task, status, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "task": row[1],
+            "status": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+            "created_at": row[5],
+            "started_at": row[6],
+            "finished_at": row[7]
+        }
+
+class JobQueue:
+    def __init__(self, orchestrator: CentralOrchestrator, store: JobStore,
+                 max_workers: int = 4, max_pending: int = 32, transcriber=None):
+        self.orchestrator = orchestrator
+        self.store = store
+        self.max_pending = max_pending
+        self.transcriber = transcriber
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._futures: Dict[str, Future] = {}
+        self._inputs: Dict[str, Dict[str, Any]] = {}
+        self._cancelled = set()
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def submit(self, task: TaskType, input_data: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending)")
+            self.store.create(job_id, task, input_data)
+            self._inputs[job_id] = dict(input_data)
+            if task in self.orchestrator.pipelines:
+                self._inputs[job_id].setdefault('run_id', job_id)
+            self._futures[job_id] = self._executor.submit(self._run, job_id, task, self._inputs[job_id])
+        return job_id
+
+    def _run(self, job_id: str, task: TaskType, input_data: Dict[str, Any]) -> None:
+        def cancelled() -> bool:
+            return job_id in self._cancelled
+
+        try:
+            if cancelled() or not self.store.update(job_id, JobStatus.RUNNING):
+                return
+
+            if task in TRANSCRIBED_TASKS and self._needs_transcript(task, input_data):
+                input_data['transcript'] = self.transcriber.transcribe(input_data['audio_path'])
+            if cancelled():
+                return
+
+            result = self.orchestrator.execute_task({**input_data, "task": task}, cancelled=cancelled)
+            if cancelled():
+                return
+            if result.get('status') == 'success':
+                self.store.update(job_id, JobStatus.SUCCEEDED, result=result)
+            else:
+                self.store.update(job_id, JobStatus.FAILED, result=result, error=result.get('message'))
+        except Exception as e:
+            self.store.update(job_id, JobStatus.FAILED, error=str(e))
+        finally:
+            self._release(job_id)
+
+    def _needs_transcript(self, task: TaskType, input_data: Dict[str, Any]) -> bool:
+        if self.transcriber is None or 'transcript' in input_data or not input_data.get('audio_path'):
+            return False
+        if task in self.orchestrator.pipelines:
+            cached = self.orchestrator.pipeline_runner.store.load(input_data['run_id'])
+            return 'transcribe' not in cached
+        return True
+
+    def _release(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+            self._cancelled.discard(job_id)
+            input_data = self._inputs.pop(job_id, {})
+        if input_data.get('delete_audio') and input_data.get('audio_path'):
+            try:
+                os.remove(input_data['audio_path'])
+            except OSError:
+                pass
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is None:
+                return False
+            self._cancelled.add(job_id)
+        if not self.store.update(job_id, JobStatus.CANCELLED):
+            return False
+        # A running job stops at its next stage boundary
+        if future.cancel():
+            self._release(job_id)
+        return True
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.transcriber is not None:
+            self.transcriber.close()
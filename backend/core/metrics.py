@@ -0,0 +1,284 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+LabelKey = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + ''.join(line + '\n' for line in self.samples())
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (non-cumulative, last slot is +Inf), sum, count]
+        self._values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][slot] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        lines = []
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return ''.join(metric.render() for metric in metrics)
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram('sales_agent_stage_seconds', 'Latency of each instrumented stage', ('stage',))
+STAGE_TOTAL = REGISTRY.counter('sales_agent_stage_total', 'Completed stage calls by outcome', ('stage', 'status'))
+STAGE_IN_FLIGHT = REGISTRY.gauge('sales_agent_stage_in_flight', 'Stage calls currently running', ('stage',))
+STAGE_ERRORS = REGISTRY.counter('sales_agent_stage_errors_total', 'Stage failures by error type', ('stage', 'error'))
+LLM_TOKENS = REGISTRY.counter('sales_agent_llm_tokens_total', 'LLM tokens processed', ('model', 'kind'))
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    'sales_agent_llm_first_token_seconds', 'Time to first streamed LLM token', ('model',)
+)
+LLM_ROUTED = REGISTRY.counter('sales_agent_llm_routed_total', 'LLM routing decisions', ('task', 'model', 'reason'))
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    'sales_agent_llm_request_seconds', 'LLM call latency by task and answering model', ('task', 'model')
+)
+LLM_HEDGES = REGISTRY.counter('sales_agent_llm_hedges_total', 'Hedged LLM calls by winning model', ('model', 'winner'))
+AUDIO_SECONDS = REGISTRY.counter('sales_agent_audio_seconds_total', 'Seconds of audio transcribed', ('stage',))
+AUDIO_RTF = REGISTRY.histogram(
+    'sales_agent_audio_realtime_factor', 'Transcription time divided by audio duration', ('stage',), RTF_BUCKETS
+)
+ROWS_WRITTEN = REGISTRY.counter('sales_agent_db_rows_written_total', 'Rows inserted or updated', ('table',))
+HTTP_SECONDS = REGISTRY.histogram('sales_agent_http_request_seconds', 'HTTP request latency', ('method', 'route'))
+HTTP_TOTAL = REGISTRY.counter('sales_agent_http_requests_total', 'HTTP requests', ('method', 'route', 'status'))
+
+trace_logger = logging.getLogger('sales_agent.trace')
+_tracing = False
+_current: contextvars.ContextVar[Optional['Stage']] = contextvars.ContextVar('sales_agent_stage', default=None)
+_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('sales_agent_trace_id', default=None)
+
+def enable_tracing(enabled: bool = True) -> None:
+    # Spans are one JSON object per line on the sales_agent.trace logger; stderr unless a handler is configured
+    global _tracing
+    _tracing = enabled
+    if enabled and not trace_logger.handlers:
+        trace_logger.addHandler(logging.StreamHandler())
+        trace_logger.setLevel(logging.INFO)
+        trace_logger.propagate = False
+
+def tracing_enabled() -> bool:
+    return _tracing
+
+def start_trace(trace_id: Optional[str] = None) -> contextvars.Token:
+    return _trace_id.set(trace_id or uuid.uuid4().hex)
+
+def end_trace(token: contextvars.Token) -> None:
+    _trace_id.reset(token)
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+class Stage:
+    __slots__ = ('name', 'attrs', 'status', 'error', 'span_id', 'parent_id', 'started')
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.status = 'ok'
+        self.error: Optional[str] = None
+        self.span_id: Optional[str] = None
+        self.parent_id: Optional[str] = None
+        self.started = 0.0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def fail(self, error: Optional[str] = None) -> None:
+        # For stages that report failure as a result dict instead of raising
+        self.status = 'error'
+        self.error = error
+
+def _log_span(stage: Stage, seconds: float) -> None:
+    trace_logger.info(json.dumps({
+        "trace_id": _trace_id.get(),
+        "span_id": stage.span_id,
+        "parent_id": stage.parent_id,
+        "span": stage.name,
+        "status": stage.status,
+        "error": stage.error,
+        "duration_ms": round(seconds * 1000, 3),
+        "start": round(time.time() - seconds, 6),
+        **stage.attrs
+    }, default=str))
+
+@contextmanager
+def track(name: str, bind: bool = True, **attrs) -> Iterator[Stage]:
+    # bind=False for generators: a span held open across yields must not set context variables,
+    # since the generator may be closed from another context
+    stage = Stage(name, attrs)
+    token, trace_token, traced = None, None, _tracing
+    if traced:
+        if bind and _trace_id.get() is None:
+            trace_token = _trace_id.set(uuid.uuid4().hex)
+        parent = _current.get()
+        stage.parent_id = parent.span_id if parent is not None else None
+        stage.span_id = uuid.uuid4().hex[:16]
+        if bind:
+            token = _current.set(stage)
+    STAGE_IN_FLIGHT.inc(stage=name)
+    stage.started = time.perf_counter()
+    try:
+        yield stage
+    except BaseException as e:
+        stage.status = 'error'
+        stage.error = stage.error or f"{type(e).__name__}: {e}"
+        STAGE_ERRORS.inc(stage=name, error=type(e).__name__)
+        raise
+    finally:
+        seconds = time.perf_counter() - stage.started
+        STAGE_IN_FLIGHT.dec(stage=name)
+        STAGE_SECONDS.observe(seconds, stage=name)
+        STAGE_TOTAL.inc(stage=name, status=stage.status)
+        if token is not None:
+            _current.reset(token)
+        if traced:
+            _log_span(stage, seconds)
+        if trace_token is not None:
+            _trace_id.reset(trace_token)
+
+def timed(name: str):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_tokens(model: str, response: Dict[str, Any]) -> None:
+    # Ollama reports exact counts on the final (or only) response object
+    if response.get('prompt_eval_count'):
+        LLM_TOKENS.inc(response['prompt_eval_count'], model=model, kind='prompt')
+    if response.get('eval_count'):
+        LLM_TOKENS.inc(response['eval_count'], model=model, kind='completion')
+
+def record_audio(stage: str, audio_seconds: float, seconds: float) -> None:
+    if audio_seconds > 0:
+        AUDIO_SECONDS.inc(audio_seconds, stage=stage)
+        AUDIO_RTF.observe(seconds / audio_seconds, stage=stage)
+
+if os.environ.get('SALES_AGENT_TRACE', '').lower() in ('1', 'true', 'yes'):
+    enable_tracing()
@@ -1,17 +1,39 @@
+import uuid
 from enum import Enum, auto
-from typing import Dict, Any, Optional
-from agents.base_agent import BaseAgent
+from typing import TYPE_CHECKING, Callable, Dict, Any, Iterator, Optional
+from core.metrics import track
+from core.pipeline import PipelineRunner, TaskGraph
+
+if TYPE_CHECKING:
+    from agents.base_agent import BaseAgent
 
 class TaskType(Enum):
     MEETING_SUMMARY = auto()
     LEAD_RECOMMENDATION = auto()
+    MEETING_TO_LEADS = auto()
+    LEAD_SCORING = auto()
 
 class CentralOrchestrator:
-    def __init__(self):
-        self.agents: Dict[TaskType, Optional[BaseAgent]] = {}
+    def __init__(self, pipeline_runner: Optional[PipelineRunner] = None):
+        self.agents: Dict[TaskType, Optional['BaseAgent']] = {}
+        self.pipelines: Dict[TaskType, TaskGraph] = {}
+        self.pipeline_runner = pipeline_runner or PipelineRunner()
 
-    def execute_task(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def execute_task(self, input_data: Dict[str, Any],
+                     cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
         task = input_data.get('task')
+        stage_name = f"task.{task.name.lower()}" if isinstance(task, TaskType) else "task.unknown"
+        with track(stage_name) as stage:
+            result = self._execute_task(task, input_data, cancelled)
+            if result.get('status') != 'success':
+                stage.fail(result.get('message'))
+            return result
+
+    def _execute_task(self, task: Optional[TaskType], input_data: Dict[str, Any],
+                      cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        if task in self.pipelines:
+            return self.run_pipeline(self.pipelines[task], input_data, cancelled)
+
         agent = self.agents.get(task)
 
         if not agent:
@@ -20,4 +42,24 @@ class CentralOrchestrator:
         try:
             return agent.execute(input_data)
         except Exception as e:
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            return {"status": "error", "message": str(e)}
+
+    def stream_task(self, input_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        task = input_data.get('task')
+        agent = self.agents.get(task)
+        if task in self.pipelines or not hasattr(agent, 'execute_stream'):
+            result = self.execute_task(input_data)
+            if result.get('status') == 'success':
+                yield {"event": "done", "result": result}
+            else:
+                yield {"event": "error", **result}
+            return
+        yield from agent.execute_stream(input_data)
+
+    def run_pipeline(self, graph: TaskGraph, input_data: Dict[str, Any],
+                     cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        run_id = input_data.get('run_id') or uuid.uuid4().hex
+        try:
+            return self.pipeline_runner.run(graph, input_data, run_id, cancelled)
+        except Exception as e:
+            return {"status": "error", "run_id": run_id, "message": str(e)}
\ No newline at end of file
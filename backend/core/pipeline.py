@@ -0,0 +1,184 @@
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.metrics import track
+from models.lead_extraction import LeadRecord
+
+NodeFn = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+
+class PipelineNode:
+    def __init__(self, name: str, fn: NodeFn, depends_on: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.depends_on = list(depends_on)
+
+class TaskGraph:
+    def __init__(self, nodes: List[PipelineNode]):
+        self.nodes = {node.name: node for node in nodes}
+        if len(self.nodes) != len(nodes):
+            raise ValueError("Pipeline node names must be unique")
+        for node in nodes:
+            missing = [dep for dep in node.depends_on if dep not in self.nodes]
+            if missing:
+                raise ValueError(f"Node {node.name} depends on unknown nodes {missing}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through {name}")
+            visiting.add(name)
+            for dep in self.nodes[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+class PipelineResultStore:
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ':memory:', check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pipeline_results ("
+                "run_id TEXT NOT NULL, node TEXT NOT NULL, result TEXT, seconds REAL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (run_id, node))"
+            )
+            self._conn.commit()
+
+    def load(self, run_id: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node, result FROM pipeline_results WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {node: json.loads(result) for node, result in rows}
+
+    def save(self, run_id: str, node: str, result: Any, seconds: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pipeline_results (run_id, node, result, seconds, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, node, json.dumps(result, default=str), seconds, time.time())
+            )
+            self._conn.commit()
+
+class PipelineRunner:
+    def __init__(self, store: Optional[PipelineResultStore] = None, max_workers: int = 4):
+        self.store = store or PipelineResultStore()
+        self.max_workers = max_workers
+
+    def run(self, graph: TaskGraph, input_data: Dict[str, Any], run_id: str,
+            cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        results = {name: value for name, value in self.store.load(run_id).items() if name in graph.nodes}
+        timings: Dict[str, Dict[str, Any]] = {name: {"seconds": 0.0, "cached": True} for name in results}
+        pending = [name for name in graph.order if name not in results]
+        running: Dict[Future, str] = {}
+        failed: Optional[Dict[str, Any]] = None
+        stopped = False
+
+        def call(name: str) -> Any:
+            node = graph.nodes[name]
+            started = time.perf_counter()
+            with track(f"pipeline.{name}", run_id=run_id):
+                output = node.fn(input_data, {dep: results[dep] for dep in node.depends_on})
+            return output, time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as pool:
+            while pending or running:
+                # Cancellation is checked between stages; running nodes finish and are saved for a resume
+                if failed is None and cancelled is not None and cancelled():
+                    failed = {"node": None, "message": "Cancelled"}
+                    stopped = True
+                if failed is None:
+                    ready = [
+                        name for name in pending
+                        if all(dep in results for dep in graph.nodes[name].depends_on)
+                    ]
+                    for name in ready:
+                        pending.remove(name)
+                        # Copy the caller's context so node spans nest under the request's trace
+                        running[pool.submit(contextvars.copy_context().run, call, name)] = name
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        output, seconds = future.result()
+                    except Exception as e:
+                        failed = failed or {"node": name, "message": str(e)}
+                        continue
+                    results[name] = output
+                    timings[name] = {"seconds": round(seconds, 3), "cached": False}
+                    self.store.save(run_id, name, output, seconds)
+
+        if stopped:
+            status = "cancelled"
+        else:
+            status = "success" if failed is None and len(results) == len(graph.nodes) else "error"
+        response = {
+            "status": status,
+            "run_id": run_id,
+            "results": results,
+            "timings": timings
+        }
+        if failed is not None:
+            response.update({"failed_node": failed["node"], "message": failed["message"]})
+        return response
+
+def meeting_to_leads_graph(meeting_agent, lead_agent) -> TaskGraph:
+    def transcribe(input_data: Dict[str, Any], deps: Dict[str, Any]) -> str:
+        if input_data.get('transcript') is not None:
+            return input_data['transcript']
+        return meeting_agent.transcribe(input_data.get('audio_path', ''))
+
+    def summarize(input_data: Dict[str, Any], deps: Dict[str, Any]) -> Dict[str, Any]:
+        summary, stats = meeting_agent.summarize(deps['transcribe'], use_cache=input_data.get('use_cache', True))
+        return {"summary": summary, "stats": stats}
+
+    def embed(input_data: Dict[str, Any], deps: Dict[str, Any]) -> Dict[str, Any]:
+        source = input_data.get('source', 'unknown')
+        meeting_id = meeting_agent.archive(deps['transcribe'], deps['summarize']['summary'], source)
+        vector_id = meeting_agent.index_summary(deps['summarize']['summary'], source, meeting_id)
+        return {"vector_id": vector_id, "meeting_id": meeting_id}
+
+    def lead_suggest(input_data: Dict[str, Any], deps: Dict[str, Any]) -> Dict[str, Any]:
+        summary = deps['summarize']['summary']
+        leads, stats = lead_agent.generate(
+            summary, input_data.get('requirements', ''),
+            use_cache=input_data.get('use_cache', True),
+            snippets=lead_agent.relevant_snippets(input_data, summary)
+        )
+        return {"leads": [lead.model_dump() for lead in leads], "stats": stats}
+
+    def persist(input_data: Dict[str, Any], deps: Dict[str, Any]) -> Dict[str, Any]:
+        lead_ids, duplicates, _ = lead_agent.persist(
+            [LeadRecord(**lead) for lead in deps['lead_suggest']['leads']], input_data.get('requirements', ''),
+            input_data.get('source', 'unknown')
+        )
+        return {"lead_ids": lead_ids, "duplicates": duplicates}
+
+    return TaskGraph([
+        PipelineNode("transcribe", transcribe),
+        PipelineNode("summarize", summarize, ["transcribe"]),
+        PipelineNode("embed", embed, ["transcribe", "summarize"]),
+        PipelineNode("lead_suggest", lead_suggest, ["summarize"]),
+        PipelineNode("persist", persist, ["lead_suggest"]),
+    ])
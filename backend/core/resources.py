@@ -0,0 +1,290 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get('SALES_AGENT_DATA_DIR', os.path.join(BACKEND_DIR, 'data'))
+OLLAMA_URL = os.environ.get('SALES_AGENT_OLLAMA_URL', 'http://localhost:11434').rstrip('/')
+# auto: the first process to open a vector segment writes it, later ones (extra workers, Streamlit) follow readonly
+VECTOR_MODE = os.environ.get('SALES_AGENT_VECTOR_MODE', 'auto')
+# How often the segment owner indexes vectors that readonly followers could only write to the database
+VECTOR_SYNC_SECONDS = float(os.environ.get('SALES_AGENT_VECTOR_SYNC_SECONDS', '30'))
+LLM_MODEL = os.environ.get('SALES_AGENT_LLM_MODEL', 'llama3.2:latest')
+FAST_LLM_MODEL = os.environ.get('SALES_AGENT_FAST_LLM_MODEL', LLM_MODEL)
+LLM_MODEL_CONCURRENCY = int(os.environ.get('SALES_AGENT_LLM_MODEL_CONCURRENCY', '4'))
+LLM_HEDGE_AFTER = float(os.environ['SALES_AGENT_LLM_HEDGE_AFTER']) if os.environ.get('SALES_AGENT_LLM_HEDGE_AFTER') else None
+VOSK_MODEL_PATH = os.environ.get('SALES_AGENT_VOSK_MODEL', os.path.join(BACKEND_DIR, 'models', 'vosk_model'))
+VECTOR_STORE_PATH = os.path.join(DATA_DIR, 'vectors')
+MEETING_VECTORS_PATH = os.path.join(DATA_DIR, 'meeting_vectors')
+EMBEDDING_CACHE_PATH = os.path.join(DATA_DIR, 'embeddings.db')
+LLM_CACHE_PATH = os.path.join(DATA_DIR, 'llm_cache.db')
+JOBS_DB_PATH = os.path.join(DATA_DIR, 'jobs.db')
+CONTEXT_DB_PATH = os.path.join(DATA_DIR, 'context.db')
+
+Factory = Callable[['ResourceRegistry'], Any]
+
+class ResourceError(Exception):
+    pass
+
+class Resource:
+    def __init__(self, name: str, factory: Factory, warm: bool = False,
+                 close: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.factory = factory
+        self.warm = warm
+        self.close = close
+        self.state = 'pending'
+        self.value: Any = None
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.own_seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+class PeriodicTask:
+    def __init__(self, name: str, fn: Callable[[], Any], interval: float):
+        self.fn = fn
+        self.interval = interval
+        self.runs = 0
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.fn()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self.runs += 1
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+class ResourceRegistry:
+    def __init__(self):
+        self._resources: Dict[str, Resource] = {}
+        self._loaded: List[str] = []
+        self._local = threading.local()
+        self._warm_thread: Optional[threading.Thread] = None
+        self.phases: Dict[str, float] = {}
+        self.created_at = time.perf_counter()
+        self.warmed_in: Optional[float] = None
+
+    def register(self, name: str, factory: Factory, warm: bool = False,
+                 close: Optional[Callable[[Any], None]] = None) -> None:
+        self._resources[name] = Resource(name, factory, warm, close)
+
+    def record_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = round(seconds, 4)
+
+    def _load(self, resource: Resource) -> None:
+        # Nested get() calls add their time to the parent's frame so own_seconds excludes dependencies
+        stack = self._local.__dict__.setdefault('stack', [])
+        resource.state = 'loading'
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            resource.value = resource.factory(self)
+            resource.state = 'ready'
+            resource.error = None
+            self._loaded.append(resource.name)
+        except Exception as e:
+            resource.state = 'failed'
+            resource.error = str(e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            resource.seconds = round(elapsed, 4)
+            resource.own_seconds = round(elapsed - children, 4)
+
+    def get(self, name: str) -> Any:
+        resource = self._resources.get(name)
+        if resource is None:
+            raise ResourceError(f"Unknown resource {name}")
+        if resource.state != 'ready':
+            with resource.lock:
+                if resource.state != 'ready':
+                    self._load(resource)
+        return resource.value
+
+    def peek(self, name: str) -> Any:
+        resource = self._resources.get(name)
+        return resource.value if resource is not None and resource.state == 'ready' else None
+
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        def run() -> None:
+            started = time.perf_counter()
+            for resource in list(self._resources.values()):
+                if resource.warm:
+                    try:
+                        self.get(resource.name)
+                    except Exception:
+                        pass
+            self.warmed_in = round(time.perf_counter() - started, 4)
+
+        if not background:
+            run()
+            return None
+        if self._warm_thread is None:
+            self._warm_thread = threading.Thread(target=run, name="resource-warm-up", daemon=True)
+            self._warm_thread.start()
+        return self._warm_thread
+
+    @property
+    def ready(self) -> bool:
+        return all(resource.state == 'ready' for resource in self._resources.values() if resource.warm)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(time.perf_counter() - self.created_at, 3),
+            "phases": dict(self.phases),
+            "warm_up_seconds": self.warmed_in,
+            "resources": {
+                name: {
+                    "state": resource.state,
+                    "warm": resource.warm,
+                    "seconds": resource.seconds,
+                    "own_seconds": resource.own_seconds,
+                    "error": resource.error
+                }
+                for name, resource in self._resources.items()
+            }
+        }
+
+    def close(self) -> None:
+        for name in reversed(self._loaded):
+            resource = self._resources[name]
+            if resource.close is not None:
+                resource.close(resource.value)
+        self._loaded = []
+
+def default_registry(vector_size: int = 768, vector_mode: str = VECTOR_MODE, llm_concurrency: int = 8) -> ResourceRegistry:
+    # Heavy modules are imported inside the factories so importing the API costs only the web stack
+    registry = ResourceRegistry()
+
+    def database(r: ResourceRegistry):
+        from core.database import DatabaseService, init_db
+        return DatabaseService(engine=init_db())
+
+    def write_buffer(r: ResourceRegistry):
+        from core.database import LeadWriteBuffer
+        return LeadWriteBuffer(r.get('db'))
+
+    def shared_memory(r: ResourceRegistry):
+        from core.context_store import SQLiteContextBackend
+        from core.shared_memory import SharedMemoryService
+        from core.vector_index import IVFIndex
+        from core.vector_segment import open_segment
+        memory = SharedMemoryService(
+            vector_size=vector_size, context_backend=SQLiteContextBackend(CONTEXT_DB_PATH),
+            vector_store=open_segment(VECTOR_STORE_PATH, vector_size, lambda: IVFIndex(nlist=256, nprobe=16), vector_mode)
+        )
+        if not memory.readonly:
+            memory.reconcile_with_database(r.get('db'))
+        return memory
+
+    def model_router(r: ResourceRegistry):
+        # Per-model limits should match the server's OLLAMA_NUM_PARALLEL; hedging is off unless a threshold is set
+        from models.model_router import ModelRouter, default_routes
+        return ModelRouter(
+            LLM_MODEL, default_routes(LLM_MODEL, FAST_LLM_MODEL),
+            limits={LLM_MODEL: LLM_MODEL_CONCURRENCY, FAST_LLM_MODEL: LLM_MODEL_CONCURRENCY},
+            fallbacks={LLM_MODEL: FAST_LLM_MODEL}, hedge_after=LLM_HEDGE_AFTER
+        )
+
+    def ollama(r: ResourceRegistry):
+        from models.ollama_request import OllamaApiClient
+        from models.response_cache import ResponseCache
+        return OllamaApiClient(
+            api_url=f"{OLLAMA_URL}/api/generate", max_concurrency=llm_concurrency,
+            cache=ResponseCache(db_path=LLM_CACHE_PATH), router=r.get('model_router')
+        )
+
+    def embedding(r: ResourceRegistry):
+        from models.embedding import EmbeddingService
+        return EmbeddingService(api_url=f"{OLLAMA_URL}/api/embed", vector_size=vector_size, cache_path=EMBEDDING_CACHE_PATH)
+
+    def transcription(r: ResourceRegistry):
+        from models.transcription import TranscriptionService
+        return TranscriptionService(model_path=VOSK_MODEL_PATH)
+
+    def retriever(r: ResourceRegistry):
+        from core.retrieval import MeetingRetriever
+        from core.vector_index import IVFIndex
+        from core.vector_segment import open_segment
+        return MeetingRetriever(
+            r.get('db'), r.get('embedding'),
+            open_segment(MEETING_VECTORS_PATH, vector_size, lambda: IVFIndex(nlist=256, nprobe=16), vector_mode)
+        )
+
+    def meeting_agent(r: ResourceRegistry):
+        from agents.meeting_summary import MeetingSummaryAgent
+        return MeetingSummaryAgent(
+            r.get('shared_memory'), r.get('ollama'), r.get('transcription'), r.get('embedding'),
+            retriever=r.get('retriever')
+        )
+
+    def lead_agent(r: ResourceRegistry):
+        from agents.lead_suggestions import LeadSuggestionsAgent
+        return LeadSuggestionsAgent(
+            r.get('shared_memory'), r.get('ollama'), r.get('embedding'),
+            db_service=r.get('db'), write_buffer=r.get('lead_write_buffer'), retriever=r.get('retriever')
+        )
+
+    def scoring_agent(r: ResourceRegistry):
+        from agents.lead_scoring import LeadScoringAgent
+        return LeadScoringAgent(r.get('shared_memory'), r.get('ollama'), r.get('db'), r.get('embedding'))
+
+    def orchestrator(r: ResourceRegistry):
+        from core.orchestrator import CentralOrchestrator, TaskType
+        from core.pipeline import PipelineResultStore, PipelineRunner, meeting_to_leads_graph
+        central = CentralOrchestrator(PipelineRunner(PipelineResultStore(JOBS_DB_PATH)))
+        central.agents[TaskType.MEETING_SUMMARY] = r.get('meeting_agent')
+        central.agents[TaskType.LEAD_RECOMMENDATION] = r.get('lead_agent')
+        central.agents[TaskType.LEAD_SCORING] = r.get('scoring_agent')
+        central.pipelines[TaskType.MEETING_TO_LEADS] = meeting_to_leads_graph(r.get('meeting_agent'), r.get('lead_agent'))
+        return central
+
+    def job_queue(r: ResourceRegistry):
+        # Threads run agents, a process pool (started on first use) runs transcription
+        from core.jobs import JobQueue, JobStore
+        from models.parallel_transcription import ParallelTranscriber
+        return JobQueue(
+            r.get('orchestrator'), JobStore(JOBS_DB_PATH), max_workers=4, max_pending=32,
+            transcriber=ParallelTranscriber(VOSK_MODEL_PATH, workers=2)
+        )
+
+    registry.register('db', database, warm=True)
+    registry.register('lead_write_buffer', write_buffer, close=lambda buffer: buffer.close())
+    registry.register('shared_memory', shared_memory, warm=True, close=lambda memory: memory.close())
+    registry.register('model_router', model_router)
+    registry.register('ollama', ollama, close=lambda client: client.close())
+    registry.register('embedding', embedding)
+    registry.register('retriever', retriever, warm=True, close=lambda retriever: retriever.vector_store.close())
+    registry.register('transcription', transcription)
+    registry.register('vosk_model', lambda r: r.get('transcription').load(), warm=True)
+    registry.register('meeting_agent', meeting_agent)
+    registry.register('lead_agent', lead_agent)
+    registry.register('scoring_agent', scoring_agent)
+    registry.register('orchestrator', orchestrator, warm=True)
+    def vector_sync(r: ResourceRegistry):
+        memory, retriever, db = r.get('shared_memory'), r.get('retriever'), r.get('db')
+        if memory.readonly and retriever.readonly:
+            return None
+
+        def sync() -> None:
+            memory.reconcile_with_database(db, settle=True)
+            retriever.sync_from_database(settle=True)
+        return PeriodicTask('vector-sync', sync, VECTOR_SYNC_SECONDS)
+
+    registry.register('job_queue', job_queue, warm=True, close=lambda queue: queue.shutdown())
+    registry.register('vector_sync', vector_sync, warm=True, close=lambda task: task.close() if task else None)
+    return registry
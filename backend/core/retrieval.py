@@ -0,0 +1,239 @@
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+import requests
+
+from core.database import DatabaseService
+from core.metrics import track
+from core.vector_index import top_k
+from core.vector_store import VectorStore
+from models.embedding import EmbeddingService
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def chunk_text(text: str, max_words: int = 120, overlap: int = 20) -> List[str]:
+    words = text.split()
+    if not words:
+        return []
+    step = max(max_words - overlap, 1)
+    return [
+        ' '.join(words[start:start + max_words])
+        for start in range(0, max(len(words) - overlap, 1), step)
+    ]
+
+def fts_query(text: str) -> str:
+    # Quote every token so user input can never be parsed as FTS5 syntax; OR keeps recall high and BM25 ranks
+    tokens = dict.fromkeys(token.lower() for token in TOKEN_PATTERN.findall(text))
+    return ' OR '.join(f'"{token}"' for token in tokens)
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[tuple]:
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+
+class MeetingRetriever:
+    def __init__(self, db_service: DatabaseService, embedding_service: EmbeddingService,
+                 vector_store: Optional[VectorStore] = None, chunk_words: int = 120, chunk_overlap: int = 20,
+                 candidates: int = 50, rrf_k: int = 60, exact_limit: int = 20000):
+        self.db_service = db_service
+        self.embedding_service = embedding_service
+        self.vector_store = vector_store
+        self.chunk_words = chunk_words
+        self.chunk_overlap = chunk_overlap
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.exact_limit = exact_limit
+        self._lock = threading.Lock()
+        self._rows: Dict[int, int] = {}
+        self._indexed = 0
+        # Chunk ids this process is embedding right now, and ids the last sync found missing
+        self._indexing: Set[int] = set()
+        self._suspects: Set[int] = set()
+        if vector_store is not None:
+            self._track_rows()
+
+    @property
+    def readonly(self) -> bool:
+        return getattr(self.vector_store, 'readonly', False)
+
+    def _track_rows(self) -> None:
+        metadata = self.vector_store.metadata
+        for idx in range(self._indexed, len(metadata)):
+            if 'chunk_id' in metadata[idx]:
+                self._rows[metadata[idx]['chunk_id']] = idx
+        self._indexed = len(metadata)
+
+    def refresh(self) -> None:
+        # Readers follow the process that owns the segment
+        if self.readonly:
+            with self._lock:
+                self.vector_store.refresh()
+                self._track_rows()
+
+    def _chunks(self, meeting_id: int, meeting: Dict[str, Any], created_at: datetime) -> List[Dict[str, Any]]:
+        base = {"meeting_id": meeting_id, "source": meeting.get('source'), "created_at": created_at}
+        chunks = []
+        if meeting.get('summary'):
+            chunks.append({**base, "kind": "summary", "position": 0, "text": meeting['summary']})
+        for position, text in enumerate(chunk_text(meeting.get('transcript') or '', self.chunk_words, self.chunk_overlap)):
+            chunks.append({**base, "kind": "transcript", "position": position, "text": text})
+        return chunks
+
+    def store_meetings(self, meetings: List[Dict[str, Any]],
+                       summary_vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> List[int]:
+        now = datetime.utcnow()
+        meetings = [{**meeting, "created_at": meeting.get('created_at') or now} for meeting in meetings]
+        meeting_ids, chunks, chunk_ids = self.db_service.store_meetings_with_chunks(
+            meetings, summary_vectors, lambda meeting_id, meeting: self._chunks(meeting_id, meeting, meeting['created_at'])
+        )
+        self._index_chunks(meeting_ids, chunks, chunk_ids, summary_vectors)
+        return meeting_ids
+
+    def index_meetings(self, meeting_ids: Sequence[int], meetings: Sequence[Dict[str, Any]],
+                       summary_vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> int:
+        chunks = []
+        for meeting_id, meeting in zip(meeting_ids, meetings):
+            chunks.extend(self._chunks(meeting_id, meeting, meeting.get('created_at') or datetime.utcnow()))
+        return self._index_chunks(meeting_ids, chunks, self.db_service.store_meeting_chunks(chunks), summary_vectors)
+
+    def _index_chunks(self, meeting_ids: Sequence[int], chunks: List[Dict[str, Any]], chunk_ids: List[int],
+                      summary_vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> int:
+        # A readonly follower still gets keyword search; chunk vectors are written by the segment's owner only
+        if self.vector_store is None or self.readonly or not chunks:
+            return len(chunks)
+
+        with self._lock:
+            self._indexing.update(chunk_ids)
+        try:
+            return self._embed_chunks(meeting_ids, chunks, chunk_ids, summary_vectors)
+        finally:
+            with self._lock:
+                self._indexing.difference_update(chunk_ids)
+
+    def _embed_chunks(self, meeting_ids: Sequence[int], chunks: List[Dict[str, Any]], chunk_ids: List[int],
+                      summary_vectors: Optional[Sequence[Optional[Sequence[float]]]] = None) -> int:
+        # Summary chunks reuse the caller's summary embedding; only transcript windows are embedded here
+        vectors: List[Optional[np.ndarray]] = [None] * len(chunks)
+        if summary_vectors is not None:
+            by_meeting = {meeting_id: vector for meeting_id, vector in zip(meeting_ids, summary_vectors)}
+            for i, chunk in enumerate(chunks):
+                if chunk['kind'] == 'summary' and by_meeting.get(chunk['meeting_id']) is not None:
+                    vectors[i] = np.asarray(by_meeting[chunk['meeting_id']], dtype=np.float32)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            for i, vector in zip(missing, self.embedding_service.embed_batch([chunks[i]['text'] for i in missing])):
+                vectors[i] = vector
+
+        metadata = [self._chunk_metadata(chunk_id, chunk) for chunk_id, chunk in zip(chunk_ids, chunks)]
+        with self._lock:
+            self.vector_store.add(np.vstack(vectors), metadata)
+            self._track_rows()
+        return len(chunks)
+
+    @staticmethod
+    def _chunk_metadata(chunk_id: int, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "meeting_chunk",
+            "chunk_id": chunk_id,
+            "meeting_id": chunk['meeting_id'],
+            "kind": chunk['kind'],
+            "source": chunk['source'],
+            "created_at": chunk['created_at'].isoformat()
+        }
+
+    def sync_from_database(self, settle: bool = True, batch_size: int = 256) -> int:
+        # The segment owner embeds chunks that readonly followers could only store in the database. With settle,
+        # a chunk must be missing on two consecutive passes, so rows this process is still indexing are left alone
+        if self.vector_store is None or self.readonly:
+            return 0
+        with self._lock:
+            missing = [
+                chunk_id for chunk_id in self.db_service.get_chunk_ids()
+                if chunk_id not in self._rows and chunk_id not in self._indexing
+            ]
+            if settle:
+                missing, self._suspects = [i for i in missing if i in self._suspects], set(missing) - self._suspects
+        restored = 0
+        for start in range(0, len(missing), batch_size):
+            chunks = self.db_service.get_chunks(missing[start:start + batch_size])
+            chunk_ids = list(chunks)
+            if not chunk_ids:
+                continue
+            vectors = self.embedding_service.embed_batch([chunks[i]['text'] for i in chunk_ids])
+            with self._lock:
+                self.vector_store.add(vectors, [self._chunk_metadata(i, chunks[i]) for i in chunk_ids])
+                self._track_rows()
+            restored += len(chunk_ids)
+        return restored
+
+    @staticmethod
+    def _matches(meta: Dict[str, Any], source: Optional[str], created_after: Optional[datetime],
+                 created_before: Optional[datetime], kinds: Optional[Sequence[str]]) -> bool:
+        return (
+            (not source or meta.get('source') == source)
+            and (not created_after or meta.get('created_at', '') >= created_after.isoformat())
+            and (not created_before or meta.get('created_at', '') < created_before.isoformat())
+            and (not kinds or meta.get('kind') in kinds)
+        )
+
+    def _vector_ranking(self, query: str, limit: int, filters: Dict[str, Any]) -> List[int]:
+        if self.vector_store is None:
+            return []
+        self.refresh()
+        if len(self.vector_store) == 0:
+            return []
+        query_vector = VectorStore.normalize(np.asarray(self.embedding_service.embed(query), dtype=np.float32).reshape(1, -1))[0]
+
+        if any(filters.values()):
+            # Selective filters: score the filtered chunks exactly instead of hoping the ANN results survive filtering
+            candidates = self.db_service.filter_chunk_ids(self.exact_limit + 1, **filters)
+            if len(candidates) <= self.exact_limit:
+                pairs = [(chunk_id, self._rows[chunk_id]) for chunk_id in candidates if chunk_id in self._rows]
+                if not pairs:
+                    return []
+                rows = np.fromiter((row for _, row in pairs), dtype=np.int64, count=len(pairs))
+                scores = self.vector_store.vectors[rows] @ query_vector
+                _, order = top_k(scores.reshape(1, -1), min(limit, len(pairs)))
+                return [pairs[int(i)][0] for i in order[0]]
+
+        matches = self.vector_store.search(query_vector, limit * 4 if any(filters.values()) else limit)
+        return [
+            match['metadata']['chunk_id'] for match in matches
+            if match['metadata'].get('type') == 'meeting_chunk' and self._matches(match['metadata'], **filters)
+        ][:limit]
+
+    def search(self, query: str, k: int = 5, source: Optional[str] = None,
+               created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+               kinds: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        filters = {"source": source, "created_after": created_after, "created_before": created_before, "kinds": kinds}
+        limit = max(self.candidates, k)
+        match = fts_query(query)
+        with track('retrieval.keyword'):
+            keyword = self.db_service.keyword_search_chunks(match, limit, **filters) if match else []
+        with track('retrieval.vector') as stage:
+            try:
+                vector = self._vector_ranking(query, limit, filters) if query.strip() else []
+            except requests.RequestException as e:
+                # Embedding model unavailable: degrade to keyword results rather than fail the search
+                stage.fail(str(e))
+                vector = []
+
+        fused = reciprocal_rank_fusion([keyword, vector], self.rrf_k)[:k]
+        chunks = self.db_service.get_chunks([chunk_id for chunk_id, _ in fused])
+        keyword_rank = {chunk_id: rank + 1 for rank, chunk_id in enumerate(keyword)}
+        vector_rank = {chunk_id: rank + 1 for rank, chunk_id in enumerate(vector)}
+        return [
+            {
+                **chunks[chunk_id],
+                "score": round(score, 6),
+                "keyword_rank": keyword_rank.get(chunk_id),
+                "vector_rank": vector_rank.get(chunk_id)
+            }
+            for chunk_id, score in fused
+            if chunk_id in chunks
+        ]
@@ -1,35 +1,143 @@
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Set
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from core.context_store import ContextBackend, MemoryContextBackend, DEFAULT_NAMESPACE
+from core.database import DatabaseService
+from core.metrics import track
+from core.vector_index import VectorIndex
+from core.vector_segment import MmapVectorStore
+from core.vector_store import VectorStore
 
 class SharedMemoryService:
-    def __init__(self, vector_size: int = 768):
-        self._context_store: Dict[str, Any] = {}
-        self._vector_store: List[Dict[str, Any]] = []
+    def __init__(self, vector_size: int = 768, index: Optional[VectorIndex] = None,
+                 vector_path: Optional[str] = None, readonly: bool = False,
+                 context_backend: Optional[ContextBackend] = None, context_ttl: Optional[float] = 24 * 3600,
+                 vector_store: Optional[VectorStore] = None):
+        self._context_store = context_backend or MemoryContextBackend()
+        self._context_ttl = context_ttl
+        if vector_store is not None:
+            self._vector_store = vector_store
+        elif vector_path:
+            self._vector_store = MmapVectorStore(vector_path, vector_size, index=index, readonly=readonly)
+        else:
+            self._vector_store = VectorStore(vector_size, index=index)
         self._vector_size = vector_size
+        self._vector_lock = threading.Lock()
+        self._suspects: Dict[str, Set[int]] = {"leads": set(), "meetings": set()}
 
-    def store_context(self, key: str, context: Dict[str, Any]) -> None:
-        self._context_store[key] = context
+    @property
+    def vector_size(self) -> int:
+        return self._vector_size
 
-    def get_context(self, key: str) -> Optional[Dict[str, Any]]:
-        return self._context_store.get(key)
+    @property
+    def readonly(self) -> bool:
+        return isinstance(self._vector_store, MmapVectorStore) and self._vector_store.readonly
 
-    def add_vectors(self, vectors: List[List[float]], metadata: List[Dict[str, Any]]) -> None:
-        for vec, meta in zip(vectors, metadata):
-            self._vector_store.append({
-                'vector': vec,
-                'metadata': meta
-            })
+    def close(self) -> None:
+        if isinstance(self._vector_store, MmapVectorStore):
+            self._vector_store.close()
+
+    def store_context(self, key: str, context: Dict[str, Any], namespace: str = DEFAULT_NAMESPACE,
+                      ttl: Optional[float] = None) -> None:
+        self._context_store.set(namespace, key, context, self._context_ttl if ttl is None else ttl)
+
+    def get_context(self, key: str, namespace: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        return self._context_store.get(namespace, key)
+
+    def clear_context(self, namespace: str, key: Optional[str] = None) -> None:
+        self._context_store.delete(namespace, key)
+
+    def add_vectors(self, vectors: List[List[float]], metadata: List[Dict[str, Any]]) -> List[int]:
+        with self._vector_lock:
+            return self._vector_store.add(vectors, metadata)
+
+    def _refresh_vectors(self) -> None:
+        if self.readonly:
+            with self._vector_lock:
+                self._vector_store.refresh()
 
     def search_vectors(self, query_vector: List[float], k: int = 5) -> List[Dict[str, Any]]:
-        if not self._vector_store:
-            return []
-
-        store_vectors = [item['vector'] for item in self._vector_store]
-        similarities = cosine_similarity(query_vector, store_vectors)[0]
-        
-        top_k_indices = np.argsort(similarities)[-k:][::-1]
-        return [
-            {**self._vector_store[idx], 'similarity': similarities[idx]} 
-            for idx in top_k_indices
-        ]
\ No newline at end of file
+        with track('vector.search', k=k):
+            self._refresh_vectors()
+            return self._vector_store.search(query_vector, k)
+
+    def search_vectors_batch(self, query_vectors: List[List[float]], k: int = 5) -> List[List[Dict[str, Any]]]:
+        with track('vector.search_batch', k=k, queries=len(query_vectors)):
+            self._refresh_vectors()
+            return self._vector_store.search_batch(query_vectors, k)
+
+    def vectors_for_db_ids(self, db_ids: Iterable[int]) -> np.ndarray:
+        wanted = set(db_ids)
+        rows = [
+            idx for idx, meta in enumerate(self._vector_store.metadata)
+            if meta.get('db_id') in wanted and idx not in self._vector_store.deleted
+        ]
+        return self._vector_store.vectors[rows]
+
+    def _settle(self, kind: str, missing: List[int]) -> List[int]:
+        # Only rows missing on two consecutive passes count, so a row this process is about to index is left alone
+        confirmed = [row_id for row_id in missing if row_id in self._suspects[kind]]
+        self._suspects[kind] = set(missing) - self._suspects[kind]
+        return confirmed
+
+    def reconcile_with_database(self, db_service: DatabaseService, settle: bool = False,
+                                batch_size: int = 500) -> Dict[str, int]:
+        # Also how the segment owner picks up leads and meeting summaries that readonly followers stored in the DB
+        if self.readonly:
+            return {"removed": 0, "restored": 0, "indexed": 0, "meetings_restored": 0}
+        # Compare ids first; embedding blobs are only read for the rows that actually need restoring
+        lead_ids = set(db_service.get_lead_ids())
+
+        indexed = {}
+        orphaned = []
+        meeting_ids = set()
+        for idx, meta in enumerate(self._vector_store.metadata):
+            if idx in self._vector_store.deleted:
+                continue
+            if meta.get('type') == 'meeting_summary' and meta.get('meeting_id') is not None:
+                meeting_ids.add(meta['meeting_id'])
+            db_id = meta.get('db_id')
+            if db_id is None:
+                continue
+            if db_id in lead_ids:
+                indexed[db_id] = idx
+            else:
+                orphaned.append(idx)
+
+        missing_leads = [lead_id for lead_id in db_service.get_lead_ids(with_embedding=True) if lead_id not in indexed]
+        missing_meetings = [
+            meeting_id for meeting_id in db_service.get_meeting_ids(with_embedding=True) if meeting_id not in meeting_ids
+        ]
+        if settle:
+            missing_leads = self._settle("leads", missing_leads)
+            missing_meetings = self._settle("meetings", missing_meetings)
+        leads = self._fetch_embeddings(db_service.get_lead_embeddings, missing_leads, batch_size)
+        meetings = self._fetch_embeddings(db_service.get_meeting_embeddings, missing_meetings, batch_size)
+
+        with self._vector_lock:
+            if orphaned:
+                self._vector_store.delete(orphaned)
+            if leads:
+                self._vector_store.add(
+                    [vector for _, _, vector in leads],
+                    [{"type": "lead_suggestions", "source": source, "db_id": lead_id} for lead_id, source, _ in leads]
+                )
+            if meetings:
+                self._vector_store.add(
+                    [vector for _, _, vector in meetings],
+                    [{"type": "meeting_summary", "source": source, "meeting_id": meeting_id}
+                     for meeting_id, source, _ in meetings]
+                )
+
+        return {"removed": len(orphaned), "restored": len(leads), "indexed": len(indexed),
+                "meetings_restored": len(meetings)}
+
+    def _fetch_embeddings(self, fetch: Callable[[Sequence[int]], List[Any]], ids: List[int],
+                          batch_size: int) -> List[Any]:
+        rows = []
+        for start in range(0, len(ids), batch_size):
+            rows.extend(
+                row for row in fetch(ids[start:start + batch_size])
+                if row[2] is not None and len(row[2]) == self._vector_size
+            )
+        return rows
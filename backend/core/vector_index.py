@@ -0,0 +1,183 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+def top_k(similarities: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = similarities.shape[1]
+    k = min(k, n)
+    if k < n:
+        idx = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.tile(np.arange(n), (similarities.shape[0], 1))
+    scores = np.take_along_axis(similarities, idx, axis=1)
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+def spherical_kmeans(sample: np.ndarray, k: int, iterations: int = 10,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    rng = rng or np.random.default_rng(0)
+    k = min(k, len(sample))
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return centroids
+
+class VectorIndex(ABC):
+    @abstractmethod
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def search(self, queries: np.ndarray, k: int, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError()
+
+    def state(self) -> Optional[Dict[str, np.ndarray]]:
+        # Arrays a segment can checkpoint so reopening does not rebuild the index; None when not worth saving
+        return None
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> bool:
+        return False
+
+class FlatIndex(VectorIndex):
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        pass
+
+    def search(self, queries: np.ndarray, k: int, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return top_k(queries @ vectors.T, k)
+
+class IVFIndex(VectorIndex):
+    def __init__(self, nlist: int = 256, nprobe: int = 8, train_size: Optional[int] = None,
+                 iterations: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or nlist * 39
+        self.iterations = iterations
+        self._rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[np.ndarray]] = []
+        # Concurrent searches may both train lazily or compact the same list
+        self._lock = threading.Lock()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray) -> None:
+        sample = vectors
+        if len(sample) > self.train_size:
+            sample = vectors[self._rng.choice(len(vectors), self.train_size, replace=False)]
+        self.centroids = spherical_kmeans(sample, self.nlist, self.iterations, self._rng)
+        self._lists = [[] for _ in range(len(self.centroids))]
+        self._assign(np.arange(len(vectors)), vectors)
+
+    def _assign(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assign, kind='stable')
+        clusters, starts = np.unique(assign[order], return_index=True)
+        for cluster, chunk in zip(clusters, np.split(ids[order], starts[1:])):
+            self._lists[cluster].append(chunk)
+
+    def _list_ids(self, cluster: int) -> np.ndarray:
+        chunks = self._lists[cluster]
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0] if chunks else np.empty(0, dtype=np.int64)
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        with self._lock:
+            if self.is_trained:
+                self._assign(ids, vectors)
+
+    def state(self) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            if not self.is_trained:
+                return None
+            lists = [self._list_ids(cluster) for cluster in range(len(self._lists))]
+        return {
+            "nlist": np.array(self.nlist),
+            "centroids": self.centroids,
+            "sizes": np.array([len(ids) for ids in lists], dtype=np.int64),
+            "ids": np.concatenate(lists)
+        }
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> bool:
+        if 'centroids' not in state or int(state['nlist']) != self.nlist:
+            return False
+        with self._lock:
+            self.centroids = state['centroids'].astype(np.float32)
+            self._lists = [[ids] for ids in np.split(state['ids'].astype(np.int64), np.cumsum(state['sizes'])[:-1])]
+        return True
+
+    def search(self, queries: np.ndarray, k: int, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.is_trained:
+            if len(vectors) < self.train_size:
+                return top_k(queries @ vectors.T, k)
+            with self._lock:
+                if not self.is_trained:
+                    self.train(vectors)
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        _, probes = top_k(queries @ self.centroids.T, nprobe)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        with self._lock:
+            probed = [np.concatenate([self._list_ids(c) for c in clusters]) for clusters in probes]
+
+        for row, candidates in enumerate(probed):
+            if len(candidates) == 0:
+                continue
+            row_scores, row_idx = top_k((vectors[candidates] @ queries[row])[None, :], k)
+            scores[row, :row_idx.shape[1]] = row_scores[0]
+            ids[row, :row_idx.shape[1]] = candidates[row_idx[0]]
+        return scores, ids
+
+class HNSWIndex(VectorIndex):
+    def __init__(self, vector_size: int, m: int = 32, ef_construction: int = 200, ef_search: int = 64):
+        try:
+            import faiss
+        except ImportError as e:
+            raise ImportError("HNSWIndex requires faiss-cpu to be installed") from e
+
+        self._index = faiss.IndexHNSWFlat(vector_size, m, faiss.METRIC_INNER_PRODUCT)
+        self._index.hnsw.efConstruction = ef_construction
+        self.ef_search = ef_search
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        if len(ids) and ids[0] != self._index.ntotal:
+            raise ValueError("HNSWIndex requires ids to be added in insertion order")
+        self._index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def search(self, queries: np.ndarray, k: int, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        self._index.hnsw.efSearch = max(self.ef_search, k)
+        return self._index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+
+    def state(self) -> Optional[Dict[str, np.ndarray]]:
+        import faiss
+        return {"hnsw": faiss.serialize_index(self._index)} if self._index.ntotal else None
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> bool:
+        import faiss
+        if 'hnsw' not in state:
+            return False
+        self._index = faiss.deserialize_index(state['hnsw'])
+        return True
+
+def create_index(kind: str, vector_size: int, **params) -> VectorIndex:
+    if kind == 'flat':
+        return FlatIndex()
+    if kind == 'ivf':
+        return IVFIndex(**params)
+    if kind == 'hnsw':
+        return HNSWIndex(vector_size, **params)
+    raise ValueError(f"Unknown vector index type: {kind}")
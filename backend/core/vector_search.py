@@ -1,27 +1,25 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from core.vector_index import VectorIndex
+from core.vector_store import VectorStore
 
 class VectorSearchService:
-    def __init__(self, vector_size: int = 768):
-        self._vectors: List[Dict[str, Any]] = []
+    def __init__(self, vector_size: int = 768, index: Optional[VectorIndex] = None):
+        self._vectors = VectorStore(vector_size, index=index)
         self._vector_size = vector_size
 
-    def add_vector(self, vector: List[float], metadata: Dict[str, Any]) -> None:
-        self._vectors.append({
-            'vector': np.array(vector),
-            'metadata': metadata
-        })
+    @property
+    def index(self) -> VectorIndex:
+        return self._vectors.index
+
+    def add_vector(self, vector: List[float], metadata: Dict[str, Any]) -> int:
+        return self._vectors.add(vector, [metadata])[0]
+
+    def add_vectors(self, vectors: List[List[float]], metadata: List[Dict[str, Any]]) -> List[int]:
+        return self._vectors.add(vectors, metadata)
 
     def search(self, query_vector: np.ndarray, k: int = 5) -> List[Dict[str, Any]]:
-        if not self._vectors:
-            return []
+        return self._vectors.search(query_vector, k)
 
-        store_vectors = [item['vector'] for item in self._vectors]
-        similarities = cosine_similarity(query_vector, store_vectors)[0]
-        
-        top_k_indices = np.argsort(similarities)[-k:][::-1]
-        return [
-            {**self._vectors[idx], 'similarity': similarities[idx]} 
-            for idx in top_k_indices
-        ]
\ No newline at end of file
+    def search_batch(self, query_vectors: np.ndarray, k: int = 5) -> List[List[Dict[str, Any]]]:
+        return self._vectors.search_batch(query_vectors, k)
@@ -0,0 +1,265 @@
+import base64
+import fcntl
+import json
+import os
+from typing import Callable, Dict, Any, Iterable, List, Optional
+import numpy as np
+
+from core.vector_index import VectorIndex, FlatIndex
+from core.vector_store import ReadWriteLock, VectorStore
+
+HEADER_FILE = 'header.json'
+VECTORS_FILE = 'vectors.f32'
+METADATA_FILE = 'metadata.jsonl'
+WAL_FILE = 'wal.jsonl'
+TOMBSTONES_FILE = 'tombstones.json'
+INDEX_FILE = 'index.npz'
+LOCK_FILE = 'writer.lock'
+
+class SegmentLockedError(RuntimeError):
+    pass
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _read_json(path: str, default: Any) -> Any:
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+class MmapVectorStore(VectorStore):
+    def __init__(self, path: str, vector_size: int = 768, initial_capacity: int = 1024,
+                 index: Optional[VectorIndex] = None, readonly: bool = False):
+        self._path = path
+        self._readonly = readonly
+        self._vector_size = vector_size
+        self._index = index or FlatIndex()
+        self._metadata: List[Dict[str, Any]] = []
+        self._deleted = set()
+        self._count = 0
+        self._metadata_offset = 0
+        self._lock = ReadWriteLock()
+        self._lock_handle = None
+
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+            self._lock_writer()
+            self._create(max(initial_capacity, 1))
+        self._open()
+
+    @property
+    def readonly(self) -> bool:
+        return self._readonly
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self._path, name)
+
+    def _lock_writer(self) -> None:
+        # Appends rewrite the shared header and metadata sidecar, so only one process may write a segment;
+        # everyone else opens it readonly and picks up new rows with refresh()
+        handle = open(self._file(LOCK_FILE), 'a+')
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.seek(0)
+            owner = handle.read().strip() or 'unknown'
+            handle.close()
+            raise SegmentLockedError(f"Vector segment at {self._path} is already open for writing (pid {owner})")
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self._lock_handle = handle
+
+    def close(self) -> None:
+        if self._lock_handle is not None:
+            self.checkpoint()
+            fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_UN)
+            self._lock_handle.close()
+            self._lock_handle = None
+
+    def _create(self, initial_capacity: int) -> None:
+        os.makedirs(self._path, exist_ok=True)
+        if not os.path.exists(self._file(HEADER_FILE)):
+            with open(self._file(VECTORS_FILE), 'wb') as f:
+                f.truncate(initial_capacity * self._vector_size * 4)
+            open(self._file(METADATA_FILE), 'w').close()
+            _write_json_atomic(self._file(HEADER_FILE), {"vector_size": self._vector_size, "count": 0})
+
+    def _read_header(self) -> Dict[str, Any]:
+        header = _read_json(self._file(HEADER_FILE), None)
+        if header is None:
+            raise FileNotFoundError(f"No vector segment found at {self._path}")
+        if header['vector_size'] != self._vector_size:
+            raise ValueError(
+                f"Segment at {self._path} has vector size {header['vector_size']}, expected {self._vector_size}"
+            )
+        return header
+
+    def _map(self) -> None:
+        row_bytes = self._vector_size * 4
+        capacity = max(os.path.getsize(self._file(VECTORS_FILE)) // row_bytes, 1)
+        self._matrix = np.memmap(
+            self._file(VECTORS_FILE), dtype=np.float32,
+            mode='r' if self._readonly else 'r+',
+            shape=(capacity, self._vector_size)
+        )
+
+    def _read_metadata(self, rows: int) -> List[Dict[str, Any]]:
+        # Continue from the byte offset of the last row read instead of rescanning the sidecar
+        entries = []
+        with open(self._file(METADATA_FILE), 'rb') as f:
+            f.seek(self._metadata_offset)
+            for _ in range(rows):
+                entries.append(json.loads(f.readline())['metadata'])
+            self._metadata_offset = f.tell()
+        return entries
+
+    def _open(self) -> None:
+        count = self._read_header()['count']
+        self._map()
+        self._metadata = self._read_metadata(count)
+        self._count = count
+        self._deleted = set(_read_json(self._file(TOMBSTONES_FILE), []))
+
+        if not self._readonly:
+            self._truncate_metadata()
+            self._replay_wal()
+        indexed = self._load_checkpoint()
+        self._index.add(np.arange(indexed, self._count), self._matrix[indexed:self._count])
+
+    def _truncate_metadata(self) -> None:
+        # Drop sidecar lines written after the last committed header
+        with open(self._file(METADATA_FILE), 'r+') as f:
+            f.truncate(self._metadata_offset)
+
+    def _load_checkpoint(self) -> int:
+        if not os.path.exists(self._file(INDEX_FILE)):
+            return 0
+        with np.load(self._file(INDEX_FILE)) as checkpoint:
+            count = int(checkpoint['count'])
+            if count > self._count or not self._index.load_state(dict(checkpoint)):
+                return 0
+        return count
+
+    def checkpoint(self) -> None:
+        # Persist the index so the next open only indexes rows appended after this point
+        if self._readonly:
+            return
+        with self._lock.read():
+            state = self._index.state()
+            count = self._count
+        if state is None:
+            return
+        tmp_path = self._file(f"{INDEX_FILE}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, count=np.array(count), **state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._file(INDEX_FILE))
+
+    def _replay_wal(self) -> None:
+        if not os.path.exists(self._file(WAL_FILE)):
+            return
+
+        vectors, metadata = [], []
+        with open(self._file(WAL_FILE)) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if entry['id'] < self._count + len(vectors):
+                    continue
+                vectors.append(np.frombuffer(base64.b64decode(entry['vector']), dtype=np.float32))
+                metadata.append(entry['metadata'])
+
+        if vectors:
+            self._apply(np.vstack(vectors), metadata)
+        os.remove(self._file(WAL_FILE))
+
+    def _check_writable(self) -> None:
+        if self._readonly:
+            raise RuntimeError(f"Vector segment at {self._path} is opened read-only")
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._count + extra
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        # Remap in place of the old matrix so readers holding it never see the attribute missing
+        self._matrix.flush()
+        with open(self._file(VECTORS_FILE), 'r+b') as f:
+            f.truncate(capacity * self._vector_size * 4)
+        self._map()
+
+    def _append(self, matrix: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        self._check_writable()
+        with open(self._file(WAL_FILE), 'a') as f:
+            for offset, (vector, meta) in enumerate(zip(matrix, metadata)):
+                f.write(json.dumps({
+                    "id": self._count + offset,
+                    "vector": base64.b64encode(vector.astype(np.float32).tobytes()).decode('ascii'),
+                    "metadata": meta
+                }) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._apply(matrix, metadata)
+        os.remove(self._file(WAL_FILE))
+
+    def _apply(self, matrix: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        start = self._count
+        super()._append(matrix, metadata)
+        self._matrix.flush()
+
+        with open(self._file(METADATA_FILE), 'a') as f:
+            for offset, meta in enumerate(metadata):
+                f.write(json.dumps({"id": start + offset, "metadata": meta}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self._metadata_offset = f.tell()
+
+        _write_json_atomic(self._file(HEADER_FILE), {"vector_size": self._vector_size, "count": self._count})
+
+    def delete(self, ids: Iterable[int]) -> None:
+        self._check_writable()
+        super().delete(ids)
+        with self._lock.read():
+            _write_json_atomic(self._file(TOMBSTONES_FILE), sorted(self._deleted))
+
+    def refresh(self) -> int:
+        count = self._read_header()['count']
+        deleted = set(_read_json(self._file(TOMBSTONES_FILE), []))
+        with self._lock.write():
+            if count > self._count:
+                start = self._count
+                if count > self._matrix.shape[0]:
+                    self._map()
+                self._metadata.extend(self._read_metadata(count - start))
+                self._count = count
+                self._index.add(np.arange(start, count), self._matrix[start:count])
+            self._deleted = deleted
+            return self._count
+
+def open_segment(path: str, vector_size: int, index_factory: Callable[[], VectorIndex],
+                 mode: str = 'auto') -> MmapVectorStore:
+    # 'write' fails fast if another process holds the segment, 'read' never writes,
+    # 'auto' writes when it can and otherwise follows the writer readonly
+    if mode not in ('auto', 'write', 'read'):
+        raise ValueError(f"Unknown vector store mode {mode}")
+    if mode != 'read':
+        try:
+            return MmapVectorStore(path, vector_size, index=index_factory())
+        except SegmentLockedError:
+            if mode == 'write':
+                raise
+    return MmapVectorStore(path, vector_size, index=index_factory(), readonly=True)
@@ -0,0 +1,156 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, List, Optional, Set
+import numpy as np
+from core.vector_index import VectorIndex, FlatIndex
+
+class ReadWriteLock:
+    # Searches share the store, appends and refreshes get it to themselves; waiting writers block new readers
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+class VectorStore:
+    def __init__(self, vector_size: int = 768, initial_capacity: int = 1024,
+                 index: Optional[VectorIndex] = None):
+        self._vector_size = vector_size
+        self._index = index or FlatIndex()
+        self._matrix = np.zeros((max(initial_capacity, 1), vector_size), dtype=np.float32)
+        self._metadata: List[Dict[str, Any]] = []
+        self._deleted: Set[int] = set()
+        self._count = 0
+        self._lock = ReadWriteLock()
+
+    @property
+    def vector_size(self) -> int:
+        return self._vector_size
+
+    @property
+    def index(self) -> VectorIndex:
+        return self._index
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[:self._count]
+
+    @property
+    def metadata(self) -> List[Dict[str, Any]]:
+        return self._metadata
+
+    @property
+    def deleted(self) -> Set[int]:
+        return self._deleted
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._count + extra
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.zeros((capacity, self._vector_size), dtype=np.float32)
+        grown[:self._count] = self._matrix[:self._count]
+        self._matrix = grown
+
+    def _as_matrix(self, vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != self._vector_size:
+            raise ValueError(
+                f"Expected vectors of size {self._vector_size}, got shape {matrix.shape}"
+            )
+        return matrix
+
+    @staticmethod
+    def normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def add(self, vectors: Any, metadata: List[Dict[str, Any]]) -> List[int]:
+        matrix = self._as_matrix(vectors)
+        if len(metadata) != matrix.shape[0]:
+            raise ValueError(
+                f"Got {matrix.shape[0]} vectors but {len(metadata)} metadata entries"
+            )
+
+        with self._lock.write():
+            start = self._count
+            self._append(self.normalize(matrix), metadata)
+            self._index.add(np.arange(start, self._count), self._matrix[start:self._count])
+            return list(range(start, self._count))
+
+    def _append(self, matrix: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        self._reserve(matrix.shape[0])
+        self._matrix[self._count:self._count + matrix.shape[0]] = matrix
+        self._metadata.extend(metadata)
+        self._count += matrix.shape[0]
+
+    def delete(self, ids: Iterable[int]) -> None:
+        with self._lock.write():
+            self._deleted.update(int(idx) for idx in ids if 0 <= idx < self._count)
+
+    def search_batch(self, query_vectors: Any, k: int = 5) -> List[List[Dict[str, Any]]]:
+        queries = self.normalize(self._as_matrix(query_vectors))
+        with self._lock.read():
+            if self._count == 0 or k <= 0:
+                return [[] for _ in range(queries.shape[0])]
+
+            scores, ids = self._index.search(queries, min(k + len(self._deleted), self._count), self.vectors)
+
+            return [
+                [
+                    self.get(int(idx), float(score))
+                    for idx, score in zip(ids[row], scores[row])
+                    if idx >= 0 and idx not in self._deleted
+                ][:k]
+                for row in range(queries.shape[0])
+            ]
+
+    def search(self, query_vector: Any, k: int = 5) -> List[Dict[str, Any]]:
+        return self.search_batch(query_vector, k)[0]
+
+    def get(self, idx: int, similarity: Optional[float] = None) -> Dict[str, Any]:
+        item = {
+            'id': idx,
+            'vector': self._matrix[idx],
+            'metadata': self._metadata[idx]
+        }
+        if similarity is not None:
+            item['similarity'] = similarity
+        return item
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Like main.py this imports core/models as top-level packages: run it from backend/ as `python ingest.py <dir>`,
+# not as `python -m backend.ingest` from the repository root
+from core.database import DEFAULT_DB_URL, DatabaseService, init_db
+from core.resources import MEETING_VECTORS_PATH, VECTOR_STORE_PATH, VOSK_MODEL_PATH, default_registry
+from core.retrieval import MeetingRetriever
+from core.shared_memory import SharedMemoryService
+from core.vector_index import IVFIndex
+from core.vector_segment import open_segment
+from models.embedding import EmbeddingService
+from models.parallel_transcription import ParallelTranscriber
+from models.summarizer import MapReduceSummarizer
+
+def file_hash(path: str, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def find_recordings(directory: str, recursive: bool = False) -> List[str]:
+    if recursive:
+        paths = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+    else:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    return sorted(path for path in paths if path.lower().endswith('.wav') and os.path.isfile(path))
+
+class Manifest:
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get('status') == 'done':
+                        self.done[entry['hash']] = entry
+        self._file = open(path, 'a')
+
+    def record(self, entries: List[Dict[str, Any]]) -> None:
+        for entry in entries:
+            self._file.write(json.dumps(entry) + '\n')
+            if entry.get('status') == 'done':
+                self.done[entry['hash']] = entry
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+class Ingestor:
+    def __init__(self, transcriber: ParallelTranscriber, summarizer: MapReduceSummarizer,
+                 embedding_service: EmbeddingService, db_service: DatabaseService, manifest: Manifest,
+                 output_path: str, shared_memory: Optional[SharedMemoryService] = None,
+                 batch_size: int = 32, max_in_flight: Optional[int] = None,
+                 retriever: Optional[MeetingRetriever] = None):
+        self.transcriber = transcriber
+        self.summarizer = summarizer
+        self.embedding_service = embedding_service
+        self.db_service = db_service
+        self.manifest = manifest
+        self.output_path = output_path
+        self.shared_memory = shared_memory
+        self.retriever = retriever
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight or transcriber.workers * 2
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._stats = {"total": 0, "done": 0, "failed": 0, "skipped": 0, "audio_seconds": 0.0}
+        self._started = time.perf_counter()
+
+    def _report(self, record: Dict[str, Any]) -> None:
+        stats = self._stats
+        finished = stats["done"] + stats["failed"]
+        elapsed = time.perf_counter() - self._started
+        outcome = "ok" if record['status'] == 'done' else f"FAILED ({record['error']})"
+        print(
+            f"[{finished}/{stats['total']}] {os.path.basename(record['path'])} {outcome} | "
+            f"{finished / elapsed * 60:.1f} files/min, "
+            f"{stats['audio_seconds'] / elapsed:.1f}x realtime",
+            file=sys.stderr, flush=True
+        )
+
+    async def _process(self, path: str, digest: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"path": path, "hash": digest}
+        try:
+            transcription = await asyncio.wrap_future(self.transcriber.submit_file(path))
+            if not transcription['text']:
+                raise ValueError("No transcript generated")
+            transcribed = time.perf_counter()
+            summary, summary_stats = await self.summarizer.asummarize(transcription['text'])
+            record.update({
+                "status": "done",
+                "transcript": transcription['text'],
+                "summary": summary,
+                "duration": transcription['duration'],
+                "stats": {
+                    **summary_stats,
+                    "transcribe_seconds": round(transcribed - started, 3),
+                    "seconds": round(time.perf_counter() - started, 3)
+                }
+            })
+            self._stats["done"] += 1
+            self._stats["audio_seconds"] += transcription['duration']
+        except Exception as e:
+            record.update({"status": "failed", "error": str(e)})
+            self._stats["failed"] += 1
+        return record
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            done = [record for record in batch if record['status'] == 'done']
+            if done:
+                vectors = await asyncio.to_thread(
+                    self.embedding_service.embed_batch, [record['summary'] for record in done]
+                )
+                rows = [
+                    {
+                        "source": os.path.basename(record['path']),
+                        "file_hash": record['hash'],
+                        "transcript": record['transcript'],
+                        "summary": record['summary'],
+                        "details": {"path": record['path'], "duration": record['duration'], "stats": record['stats']}
+                    }
+                    for record in done
+                ]
+                if self.retriever is not None:
+                    meeting_ids = await asyncio.to_thread(self.retriever.store_meetings, rows, list(vectors))
+                else:
+                    meeting_ids = await asyncio.to_thread(self.db_service.store_meetings_bulk, rows, list(vectors))
+                if self.shared_memory is not None:
+                    self.shared_memory.add_vectors(vectors, [
+                        {"type": "meeting_summary", "source": row['source'], "meeting_id": meeting_id}
+                        for row, meeting_id in zip(rows, meeting_ids)
+                    ])
+                with open(self.output_path, 'a') as f:
+                    for record, meeting_id in zip(done, meeting_ids):
+                        record['meeting_id'] = meeting_id
+                        f.write(json.dumps({
+                            "meeting_id": meeting_id,
+                            "path": record['path'],
+                            "hash": record['hash'],
+                            "duration": record['duration'],
+                            "transcript": record['transcript'],
+                            "summary": record['summary'],
+                            "stats": record['stats']
+                        }) + '\n')
+
+            # The manifest is written last so a crash mid-batch only repeats uncommitted files
+            self.manifest.record([
+                {
+                    "hash": record['hash'],
+                    "path": record['path'],
+                    "status": record['status'],
+                    "meeting_id": record.get('meeting_id'),
+                    "error": record.get('error'),
+                    "at": datetime.now().isoformat()
+                }
+                for record in batch
+            ])
+
+    async def run(self, paths: List[str]) -> Dict[str, Any]:
+        self._started = time.perf_counter()
+        digests = await asyncio.gather(*[asyncio.to_thread(file_hash, path) for path in paths])
+        todo: List[Tuple[str, str]] = []
+        seen = set()
+        for path, digest in zip(paths, digests):
+            if digest in self.manifest.done or digest in seen:
+                self._stats["skipped"] += 1
+                continue
+            seen.add(digest)
+            todo.append((path, digest))
+        self._stats["total"] = len(todo)
+        print(f"{len(todo)} recordings to ingest, {self._stats['skipped']} already done", file=sys.stderr)
+
+        limiter = asyncio.Semaphore(self.max_in_flight)
+
+        async def ingest(path: str, digest: str) -> None:
+            async with limiter:
+                record = await self._process(path, digest)
+            self._buffer.append(record)
+            self._report(record)
+            if len(self._buffer) >= self.batch_size:
+                await self._flush()
+
+        await asyncio.gather(*[ingest(path, digest) for path, digest in todo])
+        await self._flush()
+
+        elapsed = time.perf_counter() - self._started
+        return {
+            **self._stats,
+            "seconds": round(elapsed, 3),
+            "files_per_minute": round((self._stats["done"] + self._stats["failed"]) / elapsed * 60, 2),
+            "realtime_factor": round(self._stats["audio_seconds"] / elapsed, 2)
+        }
+
+async def ingest_directory(args: argparse.Namespace) -> Dict[str, Any]:
+    paths = find_recordings(args.directory, args.recursive)
+    output_path = args.output or os.path.join(args.directory, 'ingest.jsonl')
+    manifest = Manifest(args.manifest or os.path.join(args.directory, '.ingest_manifest.jsonl'))
+
+    db_service = DatabaseService(engine=init_db(args.db_url))
+    # Same Ollama URL, model routing and caches as the API; only the LLM client and embeddings are loaded
+    registry = default_registry(vector_size=args.vector_size, llm_concurrency=args.llm_concurrency)
+    api_client = registry.get('ollama')
+    embedding_service = registry.get('embedding')
+    shared_memory, meeting_vectors = None, None
+    if not args.no_index:
+        # Ingest appends vectors, so it must own the segments; this fails fast while the API holds them
+        shared_memory = SharedMemoryService(
+            vector_size=args.vector_size,
+            vector_store=open_segment(args.vector_path, args.vector_size, lambda: IVFIndex(nlist=256, nprobe=16), 'write')
+        )
+        meeting_vectors = open_segment(
+            args.meeting_vector_path, args.vector_size, lambda: IVFIndex(nlist=256, nprobe=16), 'write'
+        )
+    transcriber = ParallelTranscriber(args.model_path, workers=args.workers)
+    ingestor = Ingestor(
+        transcriber,
+        MapReduceSummarizer(api_client),
+        embedding_service,
+        db_service,
+        manifest,
+        output_path,
+        shared_memory=shared_memory,
+        batch_size=args.batch_size,
+        # Keyword (FTS5) indexing is plain SQL and always runs; chunk vectors need the vector store
+        retriever=MeetingRetriever(db_service, embedding_service, meeting_vectors)
+    )
+    try:
+        return await ingestor.run(paths)
+    finally:
+        transcriber.close()
+        manifest.close()
+        await api_client.aclose()
+        registry.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe, summarize, embed and store a directory of meeting recordings")
+    parser.add_argument("directory")
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--output", help="JSONL output file (default: <directory>/ingest.jsonl)")
+    parser.add_argument("--manifest", help="Resume manifest (default: <directory>/.ingest_manifest.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Transcription processes")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=32, help="Meetings per DB transaction")
+    parser.add_argument("--model-path", default=VOSK_MODEL_PATH)
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL)
+    parser.add_argument("--vector-path", default=VECTOR_STORE_PATH)
+    parser.add_argument("--meeting-vector-path", default=MEETING_VECTORS_PATH)
+    parser.add_argument("--vector-size", type=int, default=768)
+    parser.add_argument("--no-index", action="store_true", help="Skip the vector store (e.g. while the API is running)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+    stats = asyncio.run(ingest_directory(args))
+    print(json.dumps(stats, indent=2))
+    if stats["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,272 @@
+import time
+
+_import_started = time.perf_counter()
+
 import os
-from fastapi import FastAPI, UploadFile, File
-from core.shared_memory import SharedMemoryService
-from core.orchestrator import CentralOrchestrator, TaskType
-from models.ollama_request import OllamaApiClient
-from models.transcription import TranscriptionService
-from agents.meeting_summary import MeetingSummaryAgent
-from agents.lead_suggestions import LeadSuggestionsAgent
-
-# Determine Vosk model path
-VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'models', 'vosk_model')
-
-# Initialize shared services
-shared_memory = SharedMemoryService(vector_size=768)
-ollama_client = OllamaApiClient()
-transcription_service = TranscriptionService(model_path=VOSK_MODEL_PATH)
-
-# Initialize agents
-meeting_agent = MeetingSummaryAgent(shared_memory, ollama_client, transcription_service)
-lead_agent = LeadSuggestionsAgent(shared_memory, ollama_client)
-
-# Initialize orchestrator
-orchestrator = CentralOrchestrator()
-orchestrator.agents[TaskType.MEETING_SUMMARY] = meeting_agent
-orchestrator.agents[TaskType.LEAD_RECOMMENDATION] = lead_agent
+import shutil
+import tempfile
+from contextlib import aclosing
+from typing import Any, Dict, Iterator, Optional
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from core.jobs import QueueFullError
+from core.metrics import HTTP_SECONDS, HTTP_TOTAL, REGISTRY, current_trace_id, end_trace, start_trace
+from core.orchestrator import TaskType
+from core.resources import DATA_DIR, default_registry
+from models.transcription import TranscriptionError
+from api import lead_suggestions, search, summarize
+from api.sse import sse_response
+
+UPLOAD_DIR = os.path.join(DATA_DIR, 'uploads')
+
+try:
+    from websockets.exceptions import ConnectionClosed
+except ImportError:  # uvicorn without the websockets extra
+    ConnectionClosed = WebSocketDisconnect
+# What a send raises once the client has gone, depending on the server and how far the close got
+CLIENT_GONE = (WebSocketDisconnect, ConnectionClosed, RuntimeError, OSError)
+
+# Shared services and agents are created on first use (or by the warm-up thread started at startup)
+registry = default_registry()
 
 # FastAPI setup
 app = FastAPI()
+app.state.registry = registry
+app.include_router(lead_suggestions.router)
+app.include_router(summarize.router)
+app.include_router(search.router)
+
+@app.on_event("startup")
+async def warm_up():
+    registry.warm_up()
+
+@app.on_event("shutdown")
+async def close_clients():
+    ollama_client = registry.peek('ollama')
+    if ollama_client is not None:
+        await ollama_client.aclose()
+    registry.close()
+
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    # Route templates (not raw paths) as labels keep /jobs/{job_id} to one series
+    token = start_trace(request.headers.get('x-request-id'))
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers['X-Request-ID'] = current_trace_id()
+        return response
+    finally:
+        route = getattr(request.scope.get('route'), 'path', 'unmatched')
+        HTTP_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route)
+        HTTP_TOTAL.inc(method=request.method, route=route, status=status)
+        end_trace(token)
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/llm/routing")
+def llm_routing(limit: int = 50):
+    router = registry.get('model_router')
+    return {**router.summary(), "recent": router.decisions(limit)}
+
+@app.get("/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def readiness():
+    status = registry.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+def execute_task(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    return registry.get('orchestrator').execute_task(input_data)
+
+def stream_task(input_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield from registry.get('orchestrator').stream_task(input_data)
+
+def save_upload(audio_file: UploadFile) -> str:
+    # Only for work that outlives the request (SSE, background jobs), since the upload is closed on return
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav', dir=UPLOAD_DIR) as f:
+        shutil.copyfileobj(audio_file.file, f, 1024 * 1024)
+        return f.name
 
 @app.post("/process-meeting")
-async def process_meeting(audio_file: UploadFile = File(...)):
+async def process_meeting(audio_file: UploadFile = File(...), session_id: Optional[str] = None):
+    # The recognizer reads the upload's spooled file chunk by chunk; no second copy is written
     try:
-        result = orchestrator.execute_task({
-            "audio_path": audio_file.filename,
+        result = await run_in_threadpool(execute_task, {
+            "audio_stream": audio_file.file,
+            "source": audio_file.filename,
+            "session_id": session_id,
             "task": TaskType.MEETING_SUMMARY
         })
         return result
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def remove_after(events: Iterator[Dict[str, Any]], path: str) -> Iterator[Dict[str, Any]]:
+    try:
+        yield from events
+    finally:
+        os.remove(path)
+
+@app.post("/process-meeting/stream")
+async def process_meeting_stream(audio_file: UploadFile = File(...), session_id: Optional[str] = None):
+    audio_path = await run_in_threadpool(save_upload, audio_file)
+    events = stream_task({
+        "audio_path": audio_path,
+        "source": audio_file.filename,
+        "session_id": session_id,
+        "task": TaskType.MEETING_SUMMARY
+    })
+    uploaded = {"event": "uploaded", "source": audio_file.filename, "bytes": os.path.getsize(audio_path)}
+    return sse_response([uploaded], remove_after(events, audio_path))
+
 @app.post("/get-lead-suggestions")
-async def get_lead_suggestions(requirements: str):
+async def get_lead_suggestions(requirements: str, session_id: Optional[str] = None):
     try:
-        result = orchestrator.execute_task({
+        result = await run_in_threadpool(execute_task, {
             "requirements": requirements,
+            "session_id": session_id,
             "task": TaskType.LEAD_RECOMMENDATION
         })
         return result
     except Exception as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+@app.post("/get-lead-suggestions/stream")
+async def get_lead_suggestions_stream(requirements: str, session_id: Optional[str] = None):
+    events = stream_task({
+        "requirements": requirements,
+        "session_id": session_id,
+        "task": TaskType.LEAD_RECOMMENDATION
+    })
+    return sse_response([{"event": "started", "task": "lead_suggestions"}], events)
+
+def submit_job(task: TaskType, input_data: dict) -> dict:
+    try:
+        job_id = registry.get('job_queue').submit(task, input_data)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
+
+def ensure_queue_capacity() -> None:
+    job_queue = registry.get('job_queue')
+    if job_queue.pending >= job_queue.max_pending:
+        raise HTTPException(status_code=429, detail="Job queue is full")
+
+@app.post("/jobs/process-meeting", status_code=202)
+async def submit_meeting_job(audio_file: UploadFile = File(...), session_id: Optional[str] = Form(None)):
+    await run_in_threadpool(ensure_queue_capacity)
+    audio_path = await run_in_threadpool(save_upload, audio_file)
+    try:
+        return await run_in_threadpool(submit_job, TaskType.MEETING_SUMMARY, {
+            "audio_path": audio_path,
+            "source": audio_file.filename,
+            "session_id": session_id,
+            "delete_audio": True
+        })
+    except HTTPException:
+        os.remove(audio_path)
+        raise
+
+@app.post("/jobs/meeting-to-leads", status_code=202)
+async def submit_pipeline_job(requirements: str = Form(""), run_id: Optional[str] = Form(None),
+                              audio_file: Optional[UploadFile] = File(None)):
+    if audio_file is None and run_id is None:
+        raise HTTPException(status_code=400, detail="Upload a recording or pass the run_id of a previous run")
+    await run_in_threadpool(ensure_queue_capacity)
+
+    input_data = {"requirements": requirements}
+    if run_id:
+        input_data["run_id"] = run_id
+    if audio_file is not None:
+        input_data.update({
+            "audio_path": await run_in_threadpool(save_upload, audio_file),
+            "source": audio_file.filename,
+            "delete_audio": True
+        })
+    try:
+        return await run_in_threadpool(submit_job, TaskType.MEETING_TO_LEADS, input_data)
+    except HTTPException:
+        if input_data.get("audio_path"):
+            os.remove(input_data["audio_path"])
+        raise
+
+@app.post("/jobs/lead-suggestions", status_code=202)
+def submit_lead_job(requirements: str, session_id: Optional[str] = None):
+    return submit_job(TaskType.LEAD_RECOMMENDATION, {"requirements": requirements, "session_id": session_id})
+
+@app.post("/jobs/lead-scoring", status_code=202)
+def submit_scoring_job(incremental: bool = False):
+    return submit_job(TaskType.LEAD_SCORING, {"incremental": incremental})
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = registry.get('job_queue').get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job_queue = registry.get('job_queue')
+    if not job_queue.cancel(job_id):
+        job = job_queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return {"job_id": job_id, "status": "cancelled"}
+
+@app.websocket("/ws/transcribe")
+async def transcribe_stream(websocket: WebSocket, sample_rate: int = 16000):
+    await websocket.accept()
+    transcription_service = await run_in_threadpool(registry.get, 'transcription')
+
+    connected = True
+
+    async def audio_chunks():
+        nonlocal connected
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                return
+            if message.get("bytes"):
+                yield message["bytes"]
+            elif message.get("text") == "EOF":
+                return
+
+    async def send(payload: Dict[str, Any]) -> bool:
+        nonlocal connected
+        if connected:
+            try:
+                await websocket.send_json(payload)
+            except CLIENT_GONE:
+                connected = False
+        return connected
+
+    try:
+        async with aclosing(transcription_service.transcribe_stream(audio_chunks(), sample_rate)) as segments:
+            async for segment in segments:
+                if not await send(segment):
+                    return
+        code = 1000
+    except TranscriptionError as e:
+        await send({"type": "error", "message": str(e)})
+        code = 1011
+    except WebSocketDisconnect:
+        return
+    if connected:
+        try:
+            await websocket.close(code=code)
+        except CLIENT_GONE:
+            pass
+
+registry.record_phase("import", time.perf_counter() - _import_started)
@@ -0,0 +1,64 @@
+from typing import Optional, Union
+
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000
+SUPPORTED_SAMPLE_WIDTHS = (1, 2, 3, 4)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def to_mono(data: Buffer, channels: int, sample_width: int) -> np.ndarray:
+    # np.frombuffer only views the input; the single float32 copy is made by the scaling/averaging step
+    if sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32)
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((raw[:, 0] << 8 | raw[:, 1] << 16 | raw[:, 2] << 24) >> 8).astype(np.float32) / 256.0
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 65536.0
+    else:
+        raise ValueError(f"Unsupported sample width {sample_width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+class PcmConverter:
+    def __init__(self, channels: int, sample_width: int, sample_rate: int,
+                 target_rate: Optional[int] = TARGET_SAMPLE_RATE):
+        if sample_width not in SUPPORTED_SAMPLE_WIDTHS:
+            raise ValueError(f"Unsupported sample width {sample_width}")
+        if channels < 1 or sample_rate < 1:
+            raise ValueError(f"Invalid audio format: {channels} channels at {sample_rate} Hz")
+        self.channels = channels
+        self.sample_width = sample_width
+        self.sample_rate = sample_rate
+        self.output_rate = target_rate or sample_rate
+        self.frame_bytes = channels * sample_width
+        self.passthrough = channels == 1 and sample_width == 2 and self.output_rate == sample_rate
+        self._step = sample_rate / self.output_rate
+        self._position = 0.0
+        self._last: Optional[np.float32] = None
+
+    def _resample(self, samples: np.ndarray) -> np.ndarray:
+        # Linear interpolation that carries the last sample and fractional position across chunks
+        if self._last is not None:
+            samples = np.concatenate(([self._last], samples))
+        n = len(samples)
+        if n == 0:
+            return samples
+        count = int((n - 1 - self._position) // self._step) + 1 if n - 1 >= self._position else 0
+        positions = self._position + self._step * np.arange(count)
+        resampled = np.interp(positions, np.arange(n), samples)
+        self._position += self._step * count - (n - 1)
+        self._last = samples[-1]
+        return resampled
+
+    def convert(self, data: Buffer) -> Buffer:
+        if self.passthrough:
+            return data
+        samples = to_mono(data, self.channels, self.sample_width)
+        if self.output_rate != self.sample_rate:
+            samples = self._resample(samples)
+        return np.clip(np.rint(samples), -32768, 32767).astype('<i2').tobytes()
@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Callable, List, Optional
+
+class MicroBatcher:
+    # Coalesces concurrent calls into one batched call: an idle batcher dispatches at once, while a batch is in
+    # flight new items wait up to max_wait for company. Each item contributes size(item) towards max_size
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_size: int = 32, max_wait: float = 0.005,
+                 size: Callable[[Any], int] = lambda item: 1):
+        self.fn = fn
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.size = size
+        self._lock = threading.Lock()
+        self._open: Optional['_Batch'] = None
+        self._running = 0
+
+    def submit(self, item: Any) -> Any:
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            slot = len(batch.items)
+            batch.items.append(item)
+            batch.size += self.size(item)
+            if batch.size >= self.max_size:
+                self._open = None
+                batch.full.set()
+            wait = leader and self._running > 0
+
+        if not leader:
+            batch.done.wait()
+        else:
+            if wait:
+                batch.full.wait(self.max_wait)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+                self._running += 1
+            try:
+                batch.results = self.fn(batch.items)
+            except Exception as e:
+                batch.error = e
+            finally:
+                with self._lock:
+                    self._running -= 1
+                batch.done.set()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[slot]
+
+class _Batch:
+    __slots__ = ('items', 'size', 'full', 'done', 'results', 'error')
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.size = 0
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results: List[Any] = []
+        self.error: Optional[Exception] = None
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import requests
+
+from core.metrics import track
+from models.batching import MicroBatcher
+
+class LocalHashEmbedder:
+    def __init__(self, vector_size: int = 768):
+        self.vector_size = vector_size
+
+    def _features(self, text: str) -> List[str]:
+        tokens = re.findall(r"[a-z0-9]+", text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.vector_size, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.vector_size
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class EmbeddingService:
+    def __init__(self, api_url: str = "http://localhost:11434/api/embed",
+                 model: str = "nomic-embed-text", vector_size: int = 768,
+                 batch_size: int = 32, cache_size: int = 4096,
+                 cache_path: Optional[str] = None, offline: bool = False):
+        self.api_url = api_url
+        self.model = model
+        self.vector_size = vector_size
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.offline = offline
+        self.fallback = LocalHashEmbedder(vector_size)
+        self._session = requests.Session()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        # Concurrent callers (one text per request thread, typically) share a single /api/embed call
+        self._batcher = MicroBatcher(self._request_merged, max_size=batch_size, size=len)
+
+        if cache_path:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            self._disk = sqlite3.connect(cache_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._disk.commit()
+
+    def _key(self, text: str) -> str:
+        # Offline keys live in their own namespace so a cached model embedding is never mixed into a hash-vector store
+        model = 'local-hash' if self.offline else self.model
+        return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if self._disk is None:
+                return None
+            row = self._disk.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        self._cache_put(key, vector, persist=False)
+        return vector
+
+    def _cache_put(self, key: str, vector: np.ndarray, persist: bool = True) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.cache_size:
+                self._memory.popitem(last=False)
+            if persist and self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    (key, vector.astype(np.float32).tobytes())
+                )
+                self._disk.commit()
+
+    def _request_embeddings(self, texts: List[str]) -> np.ndarray:
+        with track('embedding.request', texts=len(texts)):
+            response = self._session.post(
+                self.api_url, json={"model": self.model, "input": texts}, timeout=30
+            )
+        response.raise_for_status()
+        vectors = np.asarray(response.json().get('embeddings', []), dtype=np.float32)
+        if vectors.shape != (len(texts), self.vector_size):
+            raise ValueError(
+                f"Embedding model {self.model} returned shape {vectors.shape}, "
+                f"expected ({len(texts)}, {self.vector_size})"
+            )
+        return vectors
+
+    def _request_merged(self, batches: List[List[str]]) -> List[np.ndarray]:
+        vectors = self._request_embeddings([text for batch in batches for text in batch])
+        offsets = np.cumsum([len(batch) for batch in batches])[:-1]
+        return np.split(vectors, offsets)
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        keys = [self._key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            vector = self._cache_get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                missing.setdefault(key, text)
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            if self.offline:
+                for key, text in batch:
+                    found[key] = self.fallback.embed(text)
+                continue
+
+            # No silent fallback when the model is down: hash vectors stored next to model embeddings
+            # would corrupt search, dedup and scoring, so the request error reaches the caller
+            vectors = self._batcher.submit([text for _, text in batch])
+            for offset, (key, _) in enumerate(batch):
+                found[key] = vectors[offset]
+                self._cache_put(key, vectors[offset])
+
+        if not keys:
+            return np.zeros((0, self.vector_size), dtype=np.float32)
+        return np.vstack([found[key] for key in keys])
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
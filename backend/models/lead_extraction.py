@@ -0,0 +1,147 @@
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+LEADS_FORMAT = "json"
+
+class LeadRecord(BaseModel):
+    company_name: str = Field(min_length=1, max_length=200)
+    industry: str = "Unknown"
+    company_size: Optional[str] = None
+    pain_points: List[str] = Field(default_factory=list)
+    relevance_score: float = 0.0
+
+    @field_validator('company_name', 'industry', mode='before')
+    @classmethod
+    def _strip(cls, value: Any) -> Any:
+        return value.strip() if isinstance(value, str) else value
+
+    @field_validator('company_size', mode='before')
+    @classmethod
+    def _size(cls, value: Any) -> Any:
+        return str(value) if isinstance(value, (int, float)) else value
+
+    @field_validator('pain_points', mode='before')
+    @classmethod
+    def _pain_points(cls, value: Any) -> Any:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [part.strip() for part in re.split(r'[;\n]', value) if part.strip()]
+        return value
+
+    @field_validator('relevance_score', mode='before')
+    @classmethod
+    def _score(cls, value: Any) -> Any:
+        # Models answer on 0-1, 0-10 or 0-100 scales; store everything on 0-1
+        if isinstance(value, str):
+            value = value.strip().rstrip('%')
+        score = float(value)
+        if score > 10:
+            score /= 100
+        elif score > 1:
+            score /= 10
+        return min(max(score, 0.0), 1.0)
+
+    def embedding_text(self) -> str:
+        parts = [self.company_name, self.industry, self.company_size or '', '; '.join(self.pain_points)]
+        return ' | '.join(part for part in parts if part)
+
+ALIASES = {
+    "company": "company_name",
+    "name": "company_name",
+    "size": "company_size",
+    "employees": "company_size",
+    "painpoints": "pain_points",
+    "pain points": "pain_points",
+    "relevance": "relevance_score",
+    "score": "relevance_score",
+}
+
+def to_lead(raw: Dict[str, Any]) -> Optional[LeadRecord]:
+    normalized = {}
+    for key, value in raw.items():
+        name = str(key).strip().lower()
+        name = ALIASES.get(name, ALIASES.get(name.replace('_', ' '), name.replace(' ', '_')))
+        normalized.setdefault(name, value)
+    try:
+        return LeadRecord(**normalized)
+    except (ValidationError, TypeError, ValueError):
+        return None
+
+class LeadStreamParser:
+    # Emits each JSON object that sits directly inside an array as soon as it closes
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._start: Optional[int] = None
+        self.rejected = 0
+
+    def feed(self, chunk: str) -> List[LeadRecord]:
+        leads = []
+        for char in chunk:
+            if self._start is not None:
+                self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if char == '{' and self._start is None and self._stack and self._stack[-1] == '[':
+                    self._start = len(self._stack)
+                    self._buffer = ['{']
+                self._stack.append(char)
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                if char == '}' and self._start is not None and len(self._stack) == self._start:
+                    lead = self._parse(''.join(self._buffer))
+                    if lead is not None:
+                        leads.append(lead)
+                    self._start = None
+                    self._buffer = []
+        return leads
+
+    def _parse(self, text: str) -> Optional[LeadRecord]:
+        try:
+            raw = json.loads(text)
+        except json.JSONDecodeError:
+            raw = None
+        lead = to_lead(raw) if isinstance(raw, dict) else None
+        if lead is None:
+            self.rejected += 1
+        return lead
+
+def iter_leads(chunks: Iterable[str], parser: Optional[LeadStreamParser] = None) -> Iterator[LeadRecord]:
+    parser = parser or LeadStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+def parse_leads(text: str) -> List[LeadRecord]:
+    leads = list(iter_leads([text]))
+    if leads:
+        return leads
+    try:
+        raw = json.loads(text)
+    except json.JSONDecodeError:
+        return []
+    lead = to_lead(raw) if isinstance(raw, dict) else None
+    return [lead] if lead is not None else []
+
+def format_leads(leads: List[LeadRecord]) -> str:
+    lines = []
+    for i, lead in enumerate(leads, 1):
+        lines.append(f"{i}. **{lead.company_name}** ({lead.industry}"
+                     f"{', ' + lead.company_size if lead.company_size else ''}) "
+                     f"- relevance {lead.relevance_score:.2f}")
+        lines.extend(f"   - {point}" for point in lead.pain_points)
+    return '\n'.join(lines)
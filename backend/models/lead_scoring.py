@@ -0,0 +1,131 @@
+import math
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.vector_index import spherical_kmeans
+
+# Only features the pipeline actually records; engagement/activity need a CRM feed this repo doesn't have
+DEFAULT_WEIGHTS = {
+    "relevance": 0.40,
+    "won_similarity": 0.40,
+    "company_size": 0.13,
+    "pain_points": 0.07,
+}
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _employees(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    numbers = re.findall(r'\d[\d,]*', str(value or ''))
+    return float(numbers[0].replace(',', '')) if numbers else 0.0
+
+def _timestamp(value: Any) -> Optional[float]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        # The database stores naive UTC; .timestamp() alone would read it as local time
+        return (value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value).timestamp()
+    return None
+
+class LeadFeatures:
+    def __init__(self, ids: np.ndarray, columns: Dict[str, np.ndarray], last_activity: np.ndarray,
+                 embeddings: np.ndarray, has_embedding: np.ndarray):
+        self.ids = ids
+        self.columns = columns
+        self.last_activity = last_activity
+        self.embeddings = embeddings
+        self.has_embedding = has_embedding
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any], vector_size: int,
+                  size_cap: float = 100_000.0) -> "LeadFeatures":
+        n = len(rows)
+        ids = np.empty(n, dtype=np.int64)
+        relevance = np.zeros(n, dtype=np.float32)
+        employees = np.zeros(n, dtype=np.float32)
+        pain_points = np.zeros(n, dtype=np.float32)
+        last_activity = np.zeros(n, dtype=np.float64)
+        embeddings = np.zeros((n, vector_size), dtype=np.float32)
+        has_embedding = np.zeros(n, dtype=bool)
+
+        for i, (lead_id, details, created_at, updated_at, embedding) in enumerate(rows):
+            details = details if isinstance(details, dict) else {}
+            ids[i] = lead_id
+            relevance[i] = _number(details.get('relevance_score'))
+            employees[i] = _employees(details.get('company_size'))
+            points = details.get('pain_points')
+            pain_points[i] = len(points) if isinstance(points, list) else 0
+            last_activity[i] = (
+                _timestamp(details.get('last_activity_at')) or _timestamp(updated_at)
+                or _timestamp(created_at) or 0.0
+            )
+            if embedding and len(embedding) == vector_size * 4:
+                embeddings[i] = np.frombuffer(embedding, dtype=np.float32)
+                has_embedding[i] = True
+
+        columns = {
+            "relevance": np.clip(relevance, 0, 1),
+            "company_size": np.clip(np.log1p(employees) / math.log1p(size_cap), 0, 1),
+            "pain_points": np.clip(pain_points / 5.0, 0, 1),
+        }
+        return cls(ids, columns, last_activity, embeddings, has_embedding)
+
+class LeadScorer:
+    def __init__(self, weights: Optional[Dict[str, float]] = None, half_life_days: float = 30.0,
+                 n_centroids: int = 8):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        if not any(self.weights.values()):
+            raise ValueError("At least one scoring weight must be non-zero")
+        self.half_life_days = half_life_days
+        self.n_centroids = n_centroids
+
+    def won_centroids(self, won_vectors: np.ndarray) -> Optional[np.ndarray]:
+        if won_vectors is None or len(won_vectors) == 0:
+            return None
+        won_vectors = np.asarray(won_vectors, dtype=np.float32)
+        norms = np.linalg.norm(won_vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return spherical_kmeans(won_vectors / norms, self.n_centroids)
+
+    def won_similarity(self, features: LeadFeatures, centroids: Optional[np.ndarray]) -> np.ndarray:
+        similarity = np.zeros(len(features), dtype=np.float32)
+        if centroids is None or not features.has_embedding.any():
+            return similarity
+        vectors = features.embeddings[features.has_embedding]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        similarity[features.has_embedding] = np.clip((vectors / norms) @ centroids.T, 0, 1).max(axis=1)
+        return similarity
+
+    def recency(self, features: LeadFeatures, now: float) -> np.ndarray:
+        age_days = np.maximum(now - features.last_activity, 0) / 86400.0
+        return np.power(0.5, age_days / self.half_life_days).astype(np.float32)
+
+    def score(self, features: LeadFeatures, centroids: Optional[np.ndarray] = None,
+              now: Optional[float] = None) -> np.ndarray:
+        if len(features) == 0:
+            return np.zeros(0, dtype=np.float32)
+        columns = {**features.columns, "won_similarity": self.won_similarity(features, centroids)}
+        unknown = set(self.weights) - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown scoring features {sorted(unknown)}")
+        names: List[str] = [name for name, weight in self.weights.items() if weight]
+        weights = np.array([self.weights[name] for name in names], dtype=np.float32)
+        matrix = np.stack([columns[name] for name in names], axis=1)
+        weighted = matrix @ weights / max(float(np.abs(weights).sum()), 1e-12)
+        return weighted * self.recency(features, now if now is not None else time.time())
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from core.metrics import LLM_HEDGES, LLM_REQUEST_SECONDS, LLM_ROUTED
+
+DEFAULT_MODEL = "llama3.2:latest"
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class RouteRule:
+    def __init__(self, model: str, max_prompt_tokens: Optional[int] = None):
+        self.model = model
+        self.max_prompt_tokens = max_prompt_tokens
+
+    def matches(self, prompt_tokens: int) -> bool:
+        return self.max_prompt_tokens is None or prompt_tokens <= self.max_prompt_tokens
+
+class ModelRouter:
+    def __init__(self, default_model: str = DEFAULT_MODEL, routes: Optional[Dict[str, Sequence[RouteRule]]] = None,
+                 limits: Optional[Dict[str, int]] = None, fallbacks: Optional[Dict[str, str]] = None,
+                 hedge_after: Optional[float] = None, history: int = 500):
+        self.default_model = default_model
+        self.routes = {task: list(rules) for task, rules in (routes or {}).items()}
+        self.limits = dict(limits or {})
+        self.fallbacks = dict(fallbacks or {})
+        self.hedge_after = hedge_after
+        self._decisions: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_limiters: Dict[str, asyncio.Semaphore] = {}
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def route(self, task: Optional[str], prompt: str, model: Optional[str] = None) -> Tuple[str, str]:
+        # Rules are checked in order, so list size-limited (small model) rules before the catch-all
+        if model:
+            return model, 'explicit'
+        prompt_tokens = estimate_tokens(prompt)
+        for rule in self.routes.get(task or '', ()):
+            if rule.matches(prompt_tokens):
+                reason = f'<= {rule.max_prompt_tokens} tokens' if rule.max_prompt_tokens is not None else 'task'
+                return rule.model, reason
+        return self.default_model, 'default'
+
+    def fallback(self, model: str) -> Optional[str]:
+        if self.hedge_after is None:
+            return None
+        fallback = self.fallbacks.get(model)
+        return fallback if fallback and fallback != model else None
+
+    def limiter(self, model: str):
+        limit = self.limits.get(model)
+        if not limit:
+            return nullcontext()
+        with self._lock:
+            if model not in self._limiters:
+                self._limiters[model] = threading.BoundedSemaphore(limit)
+            return self._limiters[model]
+
+    def alimiter(self, model: str):
+        limit = self.limits.get(model)
+        if not limit:
+            return nullcontext()
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_limiters = {}
+            self._async_loop = loop
+        if model not in self._async_limiters:
+            self._async_limiters[model] = asyncio.Semaphore(limit)
+        return self._async_limiters[model]
+
+    def record(self, task: Optional[str], model: str, reason: str, prompt: str, seconds: float,
+               answered_by: Optional[str] = None, hedged: bool = False, status: str = 'ok') -> None:
+        task = task or 'unspecified'
+        answered_by = answered_by or model
+        LLM_ROUTED.inc(task=task, model=model, reason=reason)
+        LLM_REQUEST_SECONDS.observe(seconds, task=task, model=answered_by)
+        if hedged:
+            LLM_HEDGES.inc(model=model, winner=answered_by)
+        with self._lock:
+            self._decisions.append({
+                "at": time.time(),
+                "task": task,
+                "model": model,
+                "reason": reason,
+                "answered_by": answered_by,
+                "hedged": hedged,
+                "prompt_tokens": estimate_tokens(prompt),
+                "seconds": round(seconds, 4),
+                "status": status
+            })
+
+    def decisions(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._decisions)[-limit:]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            decisions = list(self._decisions)
+        totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for decision in decisions:
+            entry = totals.setdefault((decision['task'], decision['answered_by']), {
+                "task": decision['task'], "model": decision['answered_by'], "calls": 0, "hedged": 0,
+                "errors": 0, "seconds": []
+            })
+            entry["calls"] += 1
+            entry["hedged"] += decision['hedged']
+            entry["errors"] += decision['status'] != 'ok'
+            entry["seconds"].append(decision['seconds'])
+        for entry in totals.values():
+            seconds = sorted(entry.pop("seconds"))
+            entry["avg_seconds"] = round(sum(seconds) / len(seconds), 4)
+            entry["p95_seconds"] = seconds[min(int(len(seconds) * 0.95), len(seconds) - 1)]
+        return {
+            "default_model": self.default_model,
+            "routes": {
+                task: [{"model": rule.model, "max_prompt_tokens": rule.max_prompt_tokens} for rule in rules]
+                for task, rules in self.routes.items()
+            },
+            "limits": self.limits,
+            "fallbacks": self.fallbacks,
+            "hedge_after": self.hedge_after,
+            "stats": list(totals.values())
+        }
+
+def default_routes(model: str, fast_model: str, fast_prompt_tokens: int = 600) -> Dict[str, List[RouteRule]]:
+    # Chunk and intermediate summaries go to the fast model; the final summary only when the input is short,
+    # and lead proposals always use the main model
+    return {
+        "chunk_summary": [RouteRule(fast_model)],
+        "reduce_summary": [RouteRule(fast_model)],
+        "final_summary": [RouteRule(fast_model, fast_prompt_tokens), RouteRule(model)],
+        "lead_suggestions": [RouteRule(model)]
+    }
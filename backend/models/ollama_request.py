@@ -1,28 +1,389 @@
-import requests
+import asyncio
+import contextvars
+import json
+import queue
+import random
+import threading
 import time
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.metrics import LLM_FIRST_TOKEN_SECONDS, record_tokens, track
+from models.model_router import DEFAULT_MODEL, ModelRouter
+from models.response_cache import ResponseCache
 
 class OllamaApiClient:
-    def __init__(self, api_url: str = "http://localhost:11434/api/generate"):
+    def __init__(self, api_url: str = "http://localhost:11434/api/generate",
+                 max_concurrency: int = 8, timeout: float = 120.0, pool_size: int = 16,
+                 cache: Optional[ResponseCache] = None, router: Optional[ModelRouter] = None):
         self.api_url = api_url
+        self.cache = cache
+        self.router = router
         self.max_retries = 3
         self.base_delay = 2
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self._sync_limiter = threading.BoundedSemaphore(max_concurrency)
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
 
-    def query_model(self, prompt: str, model: str = "llama3.2:latest") -> str:
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_limiter: Optional[asyncio.Semaphore] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stale_close: Optional[asyncio.Future] = None
+
+    def _payload(self, prompt: str, model: str, stream: bool,
+                 options: Optional[Dict[str, Any]] = None, format: Any = None) -> dict:
         payload = {
             "model": model,
             "prompt": prompt,
-            "stream": False
+            "stream": stream
         }
+        if options:
+            payload["options"] = options
+        if format is not None:
+            payload["format"] = format
+        return payload
+
+    def _backoff(self, attempt: int) -> float:
+        return self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.0)
 
-        for attempt in range(self.max_retries):
+    def _close_stale_client(self) -> None:
+        client, loop = self._async_client, self._async_loop
+        if client is None:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        # Its loop is closed, so the sockets can't be shut down cleanly there; closing here still
+        # empties the pool, and the transports are released with the client
+        async def close() -> None:
             try:
-                response = requests.post(self.api_url, json=payload, timeout=30)
-                response.raise_for_status()
-                return response.json().get('response', '').strip()
-            except requests.RequestException as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                time.sleep(self.base_delay * (attempt + 1))
-
-        return ''
\ No newline at end of file
+                await client.aclose()
+            except RuntimeError:
+                pass
+        self._stale_close = asyncio.ensure_future(close())
+
+    def _async_resources(self):
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._close_stale_client()
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+            self._async_limiter = asyncio.Semaphore(self.max_concurrency)
+            self._async_loop = loop
+        return self._async_client, self._async_limiter
+
+    def _route(self, task: Optional[str], prompt: str, model: Optional[str]) -> Tuple[str, str]:
+        if self.router is None:
+            return model or DEFAULT_MODEL, 'explicit' if model else 'default'
+        return self.router.route(task, prompt, model)
+
+    def _limiter(self, model: str):
+        return self.router.limiter(model) if self.router is not None else nullcontext()
+
+    def _alimiter(self, model: str):
+        return self.router.alimiter(model) if self.router is not None else nullcontext()
+
+    def _fallback(self, model: str) -> Optional[str]:
+        return self.router.fallback(model) if self.router is not None else None
+
+    def _record(self, task: Optional[str], model: str, reason: str, prompt: str, started: float,
+                answered_by: Optional[str] = None, hedged: bool = False, status: str = 'ok') -> None:
+        if self.router is not None:
+            self.router.record(task, model, reason, prompt, time.perf_counter() - started, answered_by, hedged, status)
+
+    def query_model(self, prompt: str, model: Optional[str] = None,
+                    options: Optional[Dict[str, Any]] = None, use_cache: bool = True, format: Any = None,
+                    task: Optional[str] = None) -> str:
+        # A hedged answer from the fallback model is cached under the routed model's key like any other answer
+        model, reason = self._route(task, prompt, model)
+        compute = lambda: self._routed_query(prompt, model, reason, task, options, format)
+        if self.cache is None or not use_cache:
+            return compute()
+        key = ResponseCache.make_key(model, prompt, options, format)
+        return self.cache.get_or_compute(key, compute)
+
+    def _routed_query(self, prompt: str, model: str, reason: str, task: Optional[str],
+                      options: Optional[Dict[str, Any]], format: Any) -> str:
+        started = time.perf_counter()
+        fallback = self._fallback(model)
+        try:
+            if fallback is None:
+                result, answered_by, hedged = self._query_model(prompt, model, options, format), model, False
+            else:
+                result, answered_by, hedged = self._hedged_query(prompt, model, fallback, options, format)
+        except Exception:
+            self._record(task, model, reason, prompt, started, status='error')
+            raise
+        self._record(task, model, reason, prompt, started, answered_by, hedged)
+        return result
+
+    def _hedged_query(self, prompt: str, model: str, fallback: str, options: Optional[Dict[str, Any]],
+                      format: Any) -> Tuple[str, str, bool]:
+        # The fallback fires once the primary is slower than hedge_after (or fails); the first answer wins.
+        # A losing blocking request cannot be aborted, so it finishes on the pool and is dropped
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self.pool_size * 2, thread_name_prefix="llm-hedge")
+        submit = lambda name: self._hedge_pool.submit(
+            contextvars.copy_context().run, self._query_model, prompt, name, options, format
+        )
+        calls = {submit(model): model}
+        pending, hedged, error = set(calls), False, None
+        while pending:
+            done, pending = wait(pending, timeout=None if hedged else self.router.hedge_after, return_when=FIRST_COMPLETED)
+            for call in done:
+                if call.exception() is None:
+                    return call.result(), calls[call], hedged
+                error = call.exception()
+            if not hedged:
+                backup = submit(fallback)
+                calls[backup] = fallback
+                pending.add(backup)
+                hedged = True
+        raise error
+
+    def _query_model(self, prompt: str, model: str, options: Optional[Dict[str, Any]], format: Any = None) -> str:
+        payload = self._payload(prompt, model, stream=False, options=options, format=format)
+
+        with track('llm.generate', model=model) as stage:
+            for attempt in range(self.max_retries):
+                stage.set(attempts=attempt + 1)
+                try:
+                    with self._limiter(model), self._sync_limiter:
+                        response = self._session.post(self.api_url, json=payload, timeout=self.timeout)
+                    response.raise_for_status()
+                    data = response.json()
+                    record_tokens(model, data)
+                    return data.get('response', '').strip()
+                except requests.RequestException as e:
+                    if attempt == self.max_retries - 1:
+                        raise
+                    time.sleep(self._backoff(attempt))
+
+        return ''
+
+    def stream_model(self, prompt: str, model: Optional[str] = None,
+                     options: Optional[Dict[str, Any]] = None, use_cache: bool = False,
+                     format: Any = None, task: Optional[str] = None) -> Iterator[str]:
+        model, reason = self._route(task, prompt, model)
+        key = ResponseCache.make_key(model, prompt, options, format) if self.cache is not None and use_cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        tokens = []
+        started, status = time.perf_counter(), 'error'
+        try:
+            for token in self._stream_model(prompt, model, options, format):
+                tokens.append(token)
+                yield token
+            status = 'ok'
+        except GeneratorExit:
+            status = 'cancelled'
+            raise
+        finally:
+            self._record(task, model, reason, prompt, started, status=status)
+        if key is not None:
+            self.cache.set(key, ''.join(tokens).strip())
+
+    def _stream_model(self, prompt: str, model: str, options: Optional[Dict[str, Any]],
+                      format: Any = None) -> Iterator[str]:
+        payload = self._payload(prompt, model, stream=True, options=options, format=format)
+
+        with track('llm.stream', bind=False, model=model) as stage:
+            for attempt in range(self.max_retries):
+                stage.set(attempts=attempt + 1)
+                started = False
+                try:
+                    for token in self._stream_response(payload, model):
+                        if not started:
+                            LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - stage.started, model=model)
+                        started = True
+                        yield token
+                    return
+                except requests.RequestException as e:
+                    if started or attempt == self.max_retries - 1:
+                        raise
+                    time.sleep(self._backoff(attempt))
+
+    def _stream_response(self, payload: dict, model: str) -> Iterator[str]:
+        # A reader thread drains the response and frees the concurrency slots as soon as Ollama is done,
+        # so a slow consumer (e.g. an SSE client) never holds a slot the model is no longer using
+        tokens: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        def read() -> None:
+            try:
+                with self._limiter(model), self._sync_limiter:
+                    with self._session.post(self.api_url, json=payload, timeout=self.timeout, stream=True) as response:
+                        response.raise_for_status()
+                        for line in response.iter_lines():
+                            if stop.is_set():
+                                break
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            if chunk.get('response'):
+                                tokens.put(chunk['response'])
+                            if chunk.get('done'):
+                                record_tokens(model, chunk)
+                                break
+                tokens.put(None)
+            except BaseException as e:
+                tokens.put(e)
+
+        threading.Thread(target=contextvars.copy_context().run, args=(read,), name="llm-stream", daemon=True).start()
+        try:
+            while True:
+                item = tokens.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # An abandoned stream stops reading, which closes the response and releases the slots
+            stop.set()
+
+    async def aquery_model(self, prompt: str, model: Optional[str] = None,
+                           options: Optional[Dict[str, Any]] = None, use_cache: bool = True,
+                           format: Any = None, task: Optional[str] = None) -> str:
+        model, reason = self._route(task, prompt, model)
+        compute = lambda: self._arouted_query(prompt, model, reason, task, options, format)
+        if self.cache is None or not use_cache:
+            return await compute()
+        key = ResponseCache.make_key(model, prompt, options, format)
+        return await self.cache.aget_or_compute(key, compute)
+
+    async def _arouted_query(self, prompt: str, model: str, reason: str, task: Optional[str],
+                             options: Optional[Dict[str, Any]], format: Any) -> str:
+        started = time.perf_counter()
+        fallback = self._fallback(model)
+        try:
+            if fallback is None:
+                result, answered_by, hedged = await self._aquery_model(prompt, model, options, format), model, False
+            else:
+                result, answered_by, hedged = await self._ahedged_query(prompt, model, fallback, options, format)
+        except Exception:
+            self._record(task, model, reason, prompt, started, status='error')
+            raise
+        self._record(task, model, reason, prompt, started, answered_by, hedged)
+        return result
+
+    async def _ahedged_query(self, prompt: str, model: str, fallback: str, options: Optional[Dict[str, Any]],
+                             format: Any) -> Tuple[str, str, bool]:
+        calls = {asyncio.ensure_future(self._aquery_model(prompt, model, options, format)): model}
+        pending, hedged, error = set(calls), False, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=None if hedged else self.router.hedge_after, return_when=asyncio.FIRST_COMPLETED
+                )
+                for call in done:
+                    if call.exception() is None:
+                        return call.result(), calls[call], hedged
+                    error = call.exception()
+                if not hedged:
+                    backup = asyncio.ensure_future(self._aquery_model(prompt, fallback, options, format))
+                    calls[backup] = fallback
+                    pending.add(backup)
+                    hedged = True
+            raise error
+        finally:
+            for call in pending:
+                call.cancel()
+
+    async def _aquery_model(self, prompt: str, model: str, options: Optional[Dict[str, Any]],
+                            format: Any = None) -> str:
+        client, limiter = self._async_resources()
+        payload = self._payload(prompt, model, stream=False, options=options, format=format)
+
+        with track('llm.generate', model=model) as stage:
+            for attempt in range(self.max_retries):
+                stage.set(attempts=attempt + 1)
+                try:
+                    async with self._alimiter(model), limiter:
+                        response = await client.post(self.api_url, json=payload)
+                    response.raise_for_status()
+                    data = response.json()
+                    record_tokens(model, data)
+                    return data.get('response', '').strip()
+                except httpx.HTTPError as e:
+                    if attempt == self.max_retries - 1:
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+
+        return ''
+
+    async def astream_model(self, prompt: str, model: Optional[str] = None,
+                            options: Optional[Dict[str, Any]] = None, format: Any = None,
+                            task: Optional[str] = None) -> AsyncIterator[str]:
+        model, reason = self._route(task, prompt, model)
+        started, status = time.perf_counter(), 'error'
+        try:
+            async for token in self._astream_model(prompt, model, options, format):
+                yield token
+            status = 'ok'
+        except GeneratorExit:
+            status = 'cancelled'
+            raise
+        finally:
+            self._record(task, model, reason, prompt, started, status=status)
+
+    async def _astream_model(self, prompt: str, model: str, options: Optional[Dict[str, Any]],
+                             format: Any = None) -> AsyncIterator[str]:
+        client, limiter = self._async_resources()
+        payload = self._payload(prompt, model, stream=True, options=options, format=format)
+
+        with track('llm.stream', bind=False, model=model) as stage:
+            for attempt in range(self.max_retries):
+                stage.set(attempts=attempt + 1)
+                started = False
+                try:
+                    async with self._alimiter(model), limiter:
+                        async with client.stream("POST", self.api_url, json=payload) as response:
+                            response.raise_for_status()
+                            async for line in response.aiter_lines():
+                                if not line:
+                                    continue
+                                chunk = json.loads(line)
+                                token = chunk.get('response', '')
+                                if token:
+                                    if not started:
+                                        LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - stage.started, model=model)
+                                    started = True
+                                    yield token
+                                if chunk.get('done'):
+                                    record_tokens(model, chunk)
+                                    return
+                    return
+                except httpx.HTTPError as e:
+                    if started or attempt == self.max_retries - 1:
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+
+    def close(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self._session.close()
@@ -0,0 +1,181 @@
+import os
+import time
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.metrics import record_audio, track
+from models.audio import PcmConverter, to_mono
+from models.transcription import TranscriptionError, TranscriptionStream
+
+_worker_model = None
+
+def _init_worker(model_path: str) -> None:
+    global _worker_model
+    from vosk import Model, SetLogLevel
+
+    SetLogLevel(-1)
+    _worker_model = Model(model_path)
+
+def _transcribe_segment(audio_file: str, start: int, end: int, chunk_frames: int) -> List[Dict[str, Any]]:
+    with wave.open(audio_file, "rb") as wf:
+        sample_rate = wf.getframerate()
+        converter = PcmConverter(wf.getnchannels(), wf.getsampwidth(), sample_rate)
+        stream = TranscriptionStream(_worker_model, converter.output_rate, partials=False)
+        wf.setpos(start)
+        remaining = end - start
+        segments = []
+        while remaining > 0:
+            data = wf.readframes(min(chunk_frames, remaining))
+            if not data:
+                break
+            remaining -= len(data) // converter.frame_bytes
+            segment = stream.accept(converter.convert(data))
+            if segment:
+                segments.append(segment)
+        segment = stream.finish()
+        if segment:
+            segments.append(segment)
+
+    offset = start / sample_rate
+    return [
+        {**word, "start": word['start'] + offset, "end": word['end'] + offset}
+        for segment in segments
+        for word in segment['words']
+    ]
+
+def _transcribe_file(audio_file: str, chunk_frames: int) -> Dict[str, Any]:
+    try:
+        with wave.open(audio_file, "rb") as wf:
+            PcmConverter(wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+            total = wf.getnframes()
+            duration = total / wf.getframerate()
+    except (wave.Error, EOFError, OSError, ValueError) as e:
+        raise TranscriptionError(f"Could not read audio file {audio_file}: {e}") from e
+    words = _transcribe_segment(audio_file, 0, total, chunk_frames)
+    return {"text": ' '.join(word['word'] for word in words), "duration": duration}
+
+def frame_energies(wf: wave.Wave_read, frame_samples: int, block_frames: int = 16) -> np.ndarray:
+    energies = []
+    wf.rewind()
+    while True:
+        data = wf.readframes(frame_samples * block_frames)
+        if not data:
+            break
+        samples = to_mono(data, wf.getnchannels(), wf.getsampwidth())
+        usable = len(samples) // frame_samples * frame_samples
+        if usable:
+            frames = samples[:usable].reshape(-1, frame_samples)
+            energies.append(np.sqrt(np.mean(frames * frames, axis=1)))
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+def find_silence_splits(energies: np.ndarray, frame_samples: int, total_samples: int,
+                        segment_samples: int, search_samples: int) -> List[int]:
+    splits = []
+    target = segment_samples
+    while target < total_samples - segment_samples // 4:
+        lo = max((target - search_samples) // frame_samples, 0)
+        hi = min((target + search_samples) // frame_samples, len(energies))
+        if hi <= lo:
+            break
+        split = (lo + int(np.argmin(energies[lo:hi]))) * frame_samples + frame_samples // 2
+        if splits and split <= splits[-1]:
+            split = target
+        splits.append(split)
+        target = split + segment_samples
+    return splits
+
+def plan_segments(total_samples: int, splits: List[int], overlap_samples: int) -> List[Tuple[int, int, int, int]]:
+    bounds = [0] + splits + [total_samples]
+    return [
+        (max(start - overlap_samples, 0), min(end + overlap_samples, total_samples), start, end)
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+def stitch(segments: List[List[Dict[str, Any]]], seams: List[Tuple[float, float]],
+           max_duplicate_words: int = 8) -> List[Dict[str, Any]]:
+    words: List[Dict[str, Any]] = []
+    for segment_words, (keep_from, keep_to) in zip(segments, seams):
+        kept = [
+            word for word in segment_words
+            if keep_from <= (word['start'] + word['end']) / 2 < keep_to
+        ]
+        overlap = 0
+        for size in range(min(max_duplicate_words, len(words), len(kept)), 0, -1):
+            if [w['word'] for w in words[-size:]] == [w['word'] for w in kept[:size]]:
+                overlap = size
+                break
+        words.extend(kept[overlap:])
+    return words
+
+class ParallelTranscriber:
+    def __init__(self, model_path: str, workers: Optional[int] = None, segment_seconds: float = 60.0,
+                 overlap_seconds: float = 1.0, search_seconds: float = 5.0, frame_ms: int = 30,
+                 chunk_frames: int = 4000):
+        self.model_path = model_path
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_seconds = segment_seconds
+        self.overlap_seconds = overlap_seconds
+        self.search_seconds = search_seconds
+        self.frame_ms = frame_ms
+        self.chunk_frames = chunk_frames
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.model_path,)
+            )
+        return self._pool
+
+    def warm_up(self) -> None:
+        pool = self._executor()
+        for future in [pool.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+    def plan(self, audio_file: str) -> Tuple[int, List[Tuple[int, int, int, int]]]:
+        try:
+            with wave.open(audio_file, "rb") as wf:
+                PcmConverter(wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+                sample_rate = wf.getframerate()
+                total = wf.getnframes()
+                frame_samples = max(sample_rate * self.frame_ms // 1000, 1)
+                energies = frame_energies(wf, frame_samples)
+        except (wave.Error, EOFError, OSError, ValueError) as e:
+            raise TranscriptionError(f"Could not read audio file {audio_file}: {e}") from e
+
+        splits = find_silence_splits(
+            energies, frame_samples, total,
+            int(self.segment_seconds * sample_rate), int(self.search_seconds * sample_rate)
+        )
+        return sample_rate, plan_segments(total, splits, int(self.overlap_seconds * sample_rate))
+
+    def transcribe_words(self, audio_file: str) -> List[Dict[str, Any]]:
+        with track('transcription.parallel', workers=self.workers) as stage:
+            sample_rate, segments = self.plan(audio_file)
+            stage.set(segments=len(segments))
+            pool = self._executor()
+            futures = [
+                pool.submit(_transcribe_segment, audio_file, start, end, self.chunk_frames)
+                for start, end, _, _ in segments
+            ]
+            results = [future.result() for future in futures]
+            seams = [(keep_from / sample_rate, keep_to / sample_rate) for _, _, keep_from, keep_to in segments]
+            seams[-1] = (seams[-1][0], float('inf'))
+            words = stitch(results, seams)
+        record_audio('transcription.parallel', segments[-1][1] / sample_rate if segments else 0.0, time.perf_counter() - stage.started)
+        return words
+
+    def transcribe(self, audio_file: str) -> str:
+        return ' '.join(word['word'] for word in self.transcribe_words(audio_file))
+
+    def submit_file(self, audio_file: str) -> Future:
+        # Whole-file jobs: for many recordings, one file per worker beats splitting each file
+        return self._executor().submit(_transcribe_file, audio_file, self.chunk_frames)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: Optional[float] = 3600.0, db_path: Optional[str] = None,
+                 disk_max_bytes: int = 512 * 1024 * 1024, sweep_every: int = 256):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_max_bytes = disk_max_bytes
+        self.sweep_every = sweep_every
+        self._memory: "OrderedDict[str, Tuple[Optional[float], str, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "shared": 0}
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self._disk_writes = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._disk = sqlite3.connect(db_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL, created_at REAL NOT NULL)"
+            )
+            self._disk.commit()
+            self._disk_bytes = self._disk_size()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, options: Optional[Dict[str, Any]] = None, format: Any = None) -> str:
+        normalized = " ".join(prompt.split())
+        payload = {"model": model, "prompt": normalized, "options": options or {}}
+        if format is not None:
+            payload["format"] = format
+        payload = json.dumps(payload, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._memory), "bytes": self._memory_bytes}
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl if self.ttl else None
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[2]
+        self._memory[key] = (expires_at, value, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            _, (_, _, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted
+            self._stats["evictions"] += 1
+
+    def _lookup(self, key: str) -> Tuple[Optional[str], str]:
+        # Caller holds self._lock; returns the value and the stat it counts towards
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value, size = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                return value, "hits"
+            del self._memory[key]
+            self._memory_bytes -= size
+
+        if self._disk is not None:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row[0], row[1])
+                return row[0], "disk_hits"
+        return None, "misses"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value, outcome = self._lookup(key)
+            self._stats[outcome] += 1
+            return value
+
+    def _recheck(self, key: str) -> Optional[str]:
+        # Caller holds self._lock: an owner may have stored the value and left between get() and taking the lock
+        value, _ = self._lookup(key)
+        if value is not None:
+            self._stats["shared"] += 1
+        return value
+
+    def _disk_size(self) -> int:
+        return self._disk.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _sweep(self) -> None:
+        # Caller holds self._lock. Expired rows go every sweep_every writes; oldest rows only once over the cap,
+        # trimmed to 90% of it so the next few writes don't pay for another eviction
+        self._disk.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        self._disk_bytes = self._disk_size()
+        if self._disk_bytes > self.disk_max_bytes:
+            self._disk.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY created_at DESC) AS running "
+                "FROM responses) WHERE running > ?)",
+                (int(self.disk_max_bytes * 0.9),)
+            )
+            self._disk_bytes = self._disk_size()
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = self._expires_at()
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._disk is None:
+                return
+            replaced = self._disk.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._disk.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, expires_at, time.time())
+            )
+            self._disk_bytes += size - (replaced[0] if replaced else 0)
+            self._disk_writes += 1
+            if self._disk_bytes > self.disk_max_bytes or self._disk_writes % self.sweep_every == 0:
+                self._sweep()
+            self._disk.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM responses")
+                self._disk.commit()
+                self._disk_bytes = 0
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                value = self._recheck(key)
+                if value is not None:
+                    return value
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats["shared"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        while True:
+            future = self._ainflight.get(key)
+            if future is None:
+                with self._lock:
+                    value = self._recheck(key)
+                if value is not None:
+                    return value
+                break
+            with self._lock:
+                self._stats["shared"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The owner was cancelled, not this waiter: take another turn, possibly as the new owner
+                task = asyncio.current_task()
+                if not future.cancelled() or getattr(task, 'cancelling', lambda: 0)():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._ainflight[key] = future
+        try:
+            value = await compute()
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._ainflight.pop(key, None)
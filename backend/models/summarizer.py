@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple
+
+from core.metrics import track
+from models.model_router import estimate_tokens
+from models.ollama_request import OllamaApiClient
+
+CHUNK_PROMPT = (
+    "Summarize this part ({index} of {total}) of a sales meeting transcript. "
+    "Keep names, companies, numbers, requirements, objections and next steps.\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "Combine these partial summaries of one sales meeting into a single concise summary. "
+    "Keep names, companies, numbers, requirements, objections and next steps.\n\n{text}"
+)
+DIRECT_PROMPT = "Summarize this meeting transcript: {text}"
+
+class MapReduceSummarizer:
+    def __init__(self, api_client: OllamaApiClient, chunk_tokens: int = 2000,
+                 reduce_tokens: int = 3000, max_workers: int = 4):
+        self.api_client = api_client
+        self.chunk_tokens = chunk_tokens
+        self.reduce_tokens = reduce_tokens
+        self.max_workers = max_workers
+
+    def chunk(self, text: str, budget: int) -> List[str]:
+        limit = budget * 4
+        chunks, current, size = [], [], 0
+        for word in text.split():
+            if current and size + len(word) + 1 > limit:
+                chunks.append(' '.join(current))
+                current, size = [], 0
+            current.append(word)
+            size += len(word) + 1
+        if current:
+            chunks.append(' '.join(current))
+        return chunks
+
+    def _stage(self, stats: List[Dict[str, Any]], name: str, prompts: List[str],
+               outputs: List[str], started: float) -> None:
+        stats.append({
+            "stage": name,
+            "calls": len(prompts),
+            "seconds": round(time.perf_counter() - started, 3),
+            "prompt_tokens": sum(estimate_tokens(p) for p in prompts),
+            "output_tokens": sum(estimate_tokens(o) for o in outputs)
+        })
+
+    def _map_prompts(self, transcript: str) -> List[str]:
+        chunks = self.chunk(transcript, self.chunk_tokens)
+        return [
+            CHUNK_PROMPT.format(index=i + 1, total=len(chunks), text=chunk)
+            for i, chunk in enumerate(chunks)
+        ]
+
+    def _reduce_prompts(self, partials: List[str]) -> List[str]:
+        # Every group takes at least two partials so each level strictly shrinks
+        groups, current, tokens = [], [], 0
+        for partial in partials:
+            partial_tokens = estimate_tokens(partial)
+            if len(current) >= 2 and tokens + partial_tokens > self.reduce_tokens:
+                groups.append(current)
+                current, tokens = [], 0
+            current.append(partial)
+            tokens += partial_tokens
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        elif current:
+            groups.append(current)
+        return [REDUCE_PROMPT.format(text='\n\n'.join(group)) for group in groups]
+
+    @staticmethod
+    def _task(name: str, prompts: List[str]) -> str:
+        # Router task names: the last (single-prompt) stage is the summary users see
+        if len(prompts) == 1:
+            return "final_summary"
+        return "chunk_summary" if name == "map" else "reduce_summary"
+
+    def _run(self, stats: List[Dict[str, Any]], name: str, prompts: List[str], use_cache: bool) -> List[str]:
+        started = time.perf_counter()
+        task = self._task(name, prompts)
+        # Each call gets its own copy of the caller's context so LLM spans stay in the request's trace
+        with track(f'summarize.{name}', calls=len(prompts)), ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self.api_client.query_model, prompt, use_cache=use_cache, task=task)
+                for prompt in prompts
+            ]
+            outputs = [future.result() for future in futures]
+        self._stage(stats, name, prompts, outputs, started)
+        return outputs
+
+    def summarize(self, transcript: str, use_cache: bool = True) -> Tuple[str, Dict[str, Any]]:
+        started = time.perf_counter()
+        stats: List[Dict[str, Any]] = []
+
+        if estimate_tokens(transcript) <= self.chunk_tokens:
+            summary = self._run(stats, "direct", [DIRECT_PROMPT.format(text=transcript)], use_cache)[0]
+        else:
+            partials = self._run(stats, "map", self._map_prompts(transcript), use_cache)
+            level = 1
+            while len(partials) > 1:
+                partials = self._run(stats, f"reduce_{level}", self._reduce_prompts(partials), use_cache)
+                level += 1
+            summary = partials[0]
+
+        return summary, {
+            "transcript_tokens": estimate_tokens(transcript),
+            "stages": stats,
+            "total_seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def summarize_stream(self, transcript: str, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        # Intermediate stages run as in summarize(); only the final call streams its tokens
+        started = time.perf_counter()
+        stats: List[Dict[str, Any]] = []
+
+        if estimate_tokens(transcript) <= self.chunk_tokens:
+            name, prompt = "direct", DIRECT_PROMPT.format(text=transcript)
+        else:
+            partials = self._run(stats, "map", self._map_prompts(transcript), use_cache)
+            yield {"type": "stage", **stats[-1]}
+            prompts = self._reduce_prompts(partials)
+            level = 1
+            while len(prompts) > 1:
+                partials = self._run(stats, f"reduce_{level}", prompts, use_cache)
+                yield {"type": "stage", **stats[-1]}
+                prompts = self._reduce_prompts(partials)
+                level += 1
+            name, prompt = f"reduce_{level}", prompts[0]
+
+        stage_started = time.perf_counter()
+        tokens = []
+        for token in self.api_client.stream_model(prompt, use_cache=use_cache, task="final_summary"):
+            tokens.append(token)
+            yield {"type": "token", "text": token}
+        summary = ''.join(tokens).strip()
+        self._stage(stats, name, [prompt], [summary], stage_started)
+        yield {"type": "stage", **stats[-1]}
+
+        yield {"type": "summary", "summary": summary, "stats": {
+            "transcript_tokens": estimate_tokens(transcript),
+            "stages": stats,
+            "total_seconds": round(time.perf_counter() - started, 3)
+        }}
+
+    async def asummarize(self, transcript: str, use_cache: bool = True) -> Tuple[str, Dict[str, Any]]:
+        started = time.perf_counter()
+        stats: List[Dict[str, Any]] = []
+
+        async def run(name: str, prompts: List[str]) -> List[str]:
+            stage_started = time.perf_counter()
+            task = self._task(name, prompts)
+            outputs = await asyncio.gather(
+                *[self.api_client.aquery_model(p, use_cache=use_cache, task=task) for p in prompts]
+            )
+            self._stage(stats, name, prompts, outputs, stage_started)
+            return list(outputs)
+
+        if estimate_tokens(transcript) <= self.chunk_tokens:
+            summary = (await run("direct", [DIRECT_PROMPT.format(text=transcript)]))[0]
+        else:
+            partials = await run("map", self._map_prompts(transcript))
+            level = 1
+            while len(partials) > 1:
+                partials = await run(f"reduce_{level}", self._reduce_prompts(partials))
+                level += 1
+            summary = partials[0]
+
+        return summary, {
+            "transcript_tokens": estimate_tokens(transcript),
+            "stages": stats,
+            "total_seconds": round(time.perf_counter() - started, 3)
+        }
@@ -1,39 +1,189 @@
+import asyncio
 import json
+import threading
+import time
 import wave
-from typing import Optional
-from vosk import Model, KaldiRecognizer
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+from core.metrics import record_audio, track
+from models.audio import PcmConverter
+
+if TYPE_CHECKING:
+    from vosk import Model
+
+AudioSource = Union[str, BinaryIO]
+
+class TranscriptionError(Exception):
+    pass
+
+class TranscriptionStream:
+    def __init__(self, model: 'Model', sample_rate: int, partials: bool = True):
+        from vosk import KaldiRecognizer
+
+        self.sample_rate = sample_rate
+        self.partials = partials
+        self.recognizer = KaldiRecognizer(model, sample_rate)
+        self.recognizer.SetWords(True)
+        self._bytes_seen = 0
+        self._segment_start = 0.0
+        self._last_partial = ''
+
+    @property
+    def position(self) -> float:
+        return self._bytes_seen / (2 * self.sample_rate)
+
+    def _final_segment(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        text = result.get('text', '').strip()
+        self._last_partial = ''
+        if not text:
+            self._segment_start = self.position
+            return None
+
+        words = result.get('result') or []
+        start = words[0]['start'] if words else self._segment_start
+        end = words[-1]['end'] if words else self.position
+        self._segment_start = end
+        return {"type": "final", "text": text, "start": start, "end": end, "words": words}
+
+    def accept(self, data: bytes) -> Optional[Dict[str, Any]]:
+        self._bytes_seen += len(data)
+        try:
+            if self.recognizer.AcceptWaveform(data):
+                return self._final_segment(json.loads(self.recognizer.Result()))
+            if not self.partials:
+                return None
+            partial = json.loads(self.recognizer.PartialResult()).get('partial', '').strip()
+        except Exception as e:
+            raise TranscriptionError(f"Recognizer failed at {self.position:.2f}s: {e}") from e
+
+        if not partial or partial == self._last_partial:
+            return None
+        self._last_partial = partial
+        return {"type": "partial", "text": partial, "start": self._segment_start, "end": self.position}
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        try:
+            return self._final_segment(json.loads(self.recognizer.FinalResult()))
+        except Exception as e:
+            raise TranscriptionError(f"Recognizer failed at {self.position:.2f}s: {e}") from e
 
 class TranscriptionService:
-    def __init__(self, model_path: str):
-        self.model = Model(model_path)
+    def __init__(self, model_path: str, chunk_frames: int = 4000, workers: int = 1):
+        self.model_path = model_path
+        self.chunk_frames = chunk_frames
+        self.workers = workers
+        self._model: Optional['Model'] = None
+        self._model_lock = threading.Lock()
+        self._parallel = None
 
-    def transcribe(self, audio_file: str) -> str:
+    @property
+    def model(self) -> 'Model':
+        # Loaded on first use (or by load() during warm-up) so constructing the service is free
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from vosk import Model
+
+                    self._model = Model(self.model_path)
+        return self._model
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> 'TranscriptionService':
+        self.model
+        return self
+
+    def open_stream(self, sample_rate: int = 16000, partials: bool = True) -> TranscriptionStream:
+        return TranscriptionStream(self.model, sample_rate, partials)
+
+    def iter_segments(self, chunks: Iterable[bytes], sample_rate: int = 16000,
+                      partials: bool = False) -> Iterator[Dict[str, Any]]:
+        stream = self.open_stream(sample_rate, partials)
+        for data in chunks:
+            segment = stream.accept(data)
+            if segment:
+                yield segment
+        segment = stream.finish()
+        if segment:
+            yield segment
+
+    async def transcribe_stream(self, chunks: AsyncIterable[bytes], sample_rate: int = 16000,
+                                partials: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        stream = await asyncio.to_thread(self.open_stream, sample_rate, partials)
+        max_chunk = self.chunk_frames * 2
+        async for data in chunks:
+            for offset in range(0, len(data), max_chunk):
+                segment = await asyncio.to_thread(stream.accept, data[offset:offset + max_chunk])
+                if segment:
+                    yield segment
+        segment = await asyncio.to_thread(stream.finish)
+        if segment:
+            yield segment
+
+    def _converter(self, wf: wave.Wave_read) -> PcmConverter:
+        try:
+            return PcmConverter(wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+        except ValueError as e:
+            raise TranscriptionError(str(e)) from e
+
+    def _wav_chunks(self, wf: wave.Wave_read, converter: PcmConverter) -> Iterator[bytes]:
+        while True:
+            data = wf.readframes(self.chunk_frames)
+            if len(data) == 0:
+                break
+            yield converter.convert(data)
+
+    def _describe(self, audio: AudioSource) -> str:
+        return audio if isinstance(audio, str) else getattr(audio, 'name', None) or 'upload'
+
+    def iter_transcription(self, audio: AudioSource, partials: bool = True) -> Iterator[Dict[str, Any]]:
+        # Accepts a path or any readable binary file object (e.g. an upload's spooled file),
+        # so uploads are decoded chunk by chunk instead of being copied to disk first
         try:
-            with wave.open(audio_file, "rb") as wf:
-                
-                if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
-                    raise ValueError("Audio must be mono PCM WAV format")
-
-                recognizer = KaldiRecognizer(self.model, wf.getframerate())
-                transcription = []
-
-                while True:
-                    data = wf.readframes(4000)
-                    if len(data) == 0:
-                        break
-                    if recognizer.AcceptWaveform(data):
-                        result = json.loads(recognizer.Result())
-                        text = result.get('text', '').strip()
-                        if text:
-                            transcription.append(text)
-
-                
-                final_result = json.loads(recognizer.FinalResult())
-                final_text = final_result.get('text', '').strip()
-                if final_text:
-                    transcription.append(final_text)
+            with track('transcription.stream', bind=False) as stage, wave.open(audio, "rb") as wf:
+                converter = self._converter(wf)
+                total = max(wf.getnframes(), 1)
+                stream = self.open_stream(converter.output_rate, partials)
+                reported = -1
+                for data in self._wav_chunks(wf, converter):
+                    segment = stream.accept(data)
+                    if segment:
+                        yield segment
+                    percent = min(int(wf.tell() * 100 / total), 100)
+                    if percent > reported:
+                        reported = percent
+                        yield {"type": "progress", "percent": percent, "position": stream.position}
+                segment = stream.finish()
+                if segment:
+                    yield segment
+                record_audio('transcription.stream', stream.position, time.perf_counter() - stage.started)
+        except (wave.Error, EOFError, OSError) as e:
+            raise TranscriptionError(f"Could not read audio file {self._describe(audio)}: {e}") from e
+
+    def transcribe(self, audio: AudioSource, workers: Optional[int] = None) -> str:
+        workers = workers or self.workers
+        if workers > 1 and isinstance(audio, str):
+            return self._parallel_transcriber(workers).transcribe(audio)
 
+        try:
+            with track('transcription') as stage, wave.open(audio, "rb") as wf:
+                converter = self._converter(wf)
+                transcription = [
+                    segment['text']
+                    for segment in self.iter_segments(self._wav_chunks(wf, converter), converter.output_rate)
+                ]
+                record_audio('transcription', wf.getnframes() / wf.getframerate(), time.perf_counter() - stage.started)
                 return ' '.join(transcription).strip()
-        
-        except Exception as e:
-            return f"Transcription error: {str(e)}"
\ No newline at end of file
+        except (wave.Error, EOFError, OSError) as e:
+            raise TranscriptionError(f"Could not read audio file {self._describe(audio)}: {e}") from e
+
+    def _parallel_transcriber(self, workers: int):
+        from models.parallel_transcription import ParallelTranscriber
+
+        if self._parallel is None or self._parallel.workers != workers:
+            if self._parallel is not None:
+                self._parallel.close()
+            self._parallel = ParallelTranscriber(self.model_path, workers=workers, chunk_frames=self.chunk_frames)
+        return self._parallel
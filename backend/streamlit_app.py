@@ -1,31 +1,28 @@
+import atexit
 import os
-import tempfile
+import uuid
 import streamlit as st
-from core.orchestrator import CentralOrchestrator, TaskType
-from core.shared_memory import SharedMemoryService
-from models.ollama_request import OllamaApiClient
-from models.transcription import TranscriptionService
-from agents.meeting_summary import MeetingSummaryAgent
-from agents.lead_suggestions import LeadSuggestionsAgent
+from core.orchestrator import TaskType
+from core.resources import ResourceRegistry, default_registry
 
-VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'models', 'vosk_model')
+@st.cache_resource
+def get_registry() -> ResourceRegistry:
+    # One registry per Streamlit server process, shared by every browser session. The API owns the vector
+    # segments, so Streamlit follows them readonly unless SALES_AGENT_VECTOR_MODE says otherwise
+    registry = default_registry(vector_mode=os.environ.get('SALES_AGENT_VECTOR_MODE', 'read'))
+    registry.warm_up()
+    atexit.register(registry.close)
+    return registry
 
 def initialize_system():
-    shared_memory = SharedMemoryService(vector_size=768)
-    ollama_client = OllamaApiClient()
-    transcription_service = TranscriptionService(model_path=VOSK_MODEL_PATH)
-    meeting_agent = MeetingSummaryAgent(shared_memory, ollama_client, transcription_service)
-    lead_agent = LeadSuggestionsAgent(shared_memory, ollama_client)
-    orchestrator = CentralOrchestrator()
-    orchestrator.agents[TaskType.MEETING_SUMMARY] = meeting_agent
-    orchestrator.agents[TaskType.LEAD_RECOMMENDATION] = lead_agent
-    return orchestrator, shared_memory
+    registry = get_registry()
+    return registry.get('orchestrator'), registry.get('shared_memory')
 
 def display_shared_memory(shared_memory):
     st.sidebar.header("Shared Memory Contents", help="This section displays the latest context from previous operations.")
     contexts = ["latest_meeting_summary", "latest_lead_suggestions"]
     for context_key in contexts:
-        context = shared_memory.get_context(context_key)
+        context = shared_memory.get_context(context_key, st.session_state.session_id)
         if context:
             with st.sidebar.expander(f"{context_key.replace('_', ' ').title()}", expanded=False):
                 st.json(context)
@@ -34,58 +31,94 @@ def meeting_summary_ui():
     st.header("📝 Meeting Transcription and Summary")
     audio_file = st.file_uploader("Upload Meeting Recording (WAV format)", type=['wav'], help="Upload a WAV file of your meeting recording.")
     if audio_file:
-        with st.spinner("Processing audio..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-                temp_audio.write(audio_file.getbuffer())
-                temp_path = temp_audio.name
-            try:
-                result = st.session_state.orchestrator.execute_task({
-                    "audio_path": temp_path,
-                    "task": TaskType.MEETING_SUMMARY,
-                    "source": "streamlit_upload"
-                })
-                if result['status'] == 'success':
-                    st.success("Meeting Summarized Successfully!")
-                    with st.expander("Transcript", expanded=False):
-                        st.text(result.get('transcript', 'No transcript available'))
-                    st.subheader("Summary")
-                    st.write(result.get('summary', 'No summary available'))
-                else:
-                    st.error(f"Error: {result.get('message', 'Unknown error')}")
-                os.unlink(temp_path)
-            except Exception as e:
-                st.error(f"Unexpected error: {str(e)}")
+        try:
+            audio_file.seek(0)
+            events = st.session_state.orchestrator.stream_task({
+                "audio_stream": audio_file,
+                "task": TaskType.MEETING_SUMMARY,
+                "source": "streamlit_upload",
+                "session_id": st.session_state.session_id
+            })
+            progress = st.progress(0, text="Transcribing...")
+            live_transcript = st.empty()
+            transcript_slot = st.empty()
+            st.subheader("Summary")
+            outcome = {}
+
+            def summary_tokens():
+                for event in events:
+                    kind = event['event']
+                    if kind == 'transcribing':
+                        progress.progress(event['percent'] / 100, text=f"Transcribing... {event['percent']}%")
+                    elif kind == 'partial_transcript':
+                        live_transcript.caption(event['text'])
+                    elif kind == 'transcript':
+                        live_transcript.empty()
+                        with transcript_slot.container():
+                            with st.expander("Transcript", expanded=False):
+                                st.text(event['text'] or 'No transcript available')
+                        progress.progress(1.0, text="Summarizing...")
+                    elif kind == 'summary_stage':
+                        progress.progress(1.0, text=f"Summarizing... {event['stage']} done in {event['seconds']}s")
+                    elif kind == 'summary_token':
+                        yield event['text']
+                    elif kind in ('done', 'error'):
+                        outcome.update(event)
+
+            st.write_stream(summary_tokens())
+            progress.empty()
+            if outcome.get('event') == 'done':
+                st.success("Meeting Summarized Successfully!")
+            else:
+                st.error(f"Error: {outcome.get('message', 'Unknown error')}")
+        except Exception as e:
+            st.error(f"Unexpected error: {str(e)}")
 
 def lead_suggestions_ui():
     st.header("🎯 Lead Generation")
     col1, col2 = st.columns([3, 2])
     with col1:
-        meeting_context = st.session_state.shared_memory.get_context('latest_meeting_summary')
+        meeting_context = st.session_state.shared_memory.get_context(
+            'latest_meeting_summary', st.session_state.session_id
+        )
         if meeting_context:
             with st.expander("Previous Meeting Context", expanded=False):
                 st.json(meeting_context)
         requirements = st.text_area("Enter requirements for lead generation", 
                                     height=150, 
                                     help="Specify your requirements for potential leads.")
-        if st.button("Generate Lead Suggestions", type="primary"):
-            with st.spinner("Generating leads..."):
-                try:
-                    result = st.session_state.orchestrator.execute_task({
-                        "requirements": requirements,
-                        "task": TaskType.LEAD_RECOMMENDATION,
-                        "source": "lead_generation_step"
-                    })
-                    if result['status'] == 'success':
-                        st.session_state.lead_suggestions = result.get('suggestions', 'No suggestions available')
-                        st.success("Lead Suggestions Generated!")
-                    else:
-                        st.error(f"Error: {result.get('message', 'Unknown error')}")
-                except Exception as e:
-                    st.error(f"Unexpected error: {str(e)}")
+        generate = st.button("Generate Lead Suggestions", type="primary")
     
     with col2:
         st.subheader("Generated Suggestions")
-        if 'lead_suggestions' in st.session_state:
+        if generate:
+            try:
+                events = st.session_state.orchestrator.stream_task({
+                    "requirements": requirements,
+                    "task": TaskType.LEAD_RECOMMENDATION,
+                    "source": "lead_generation_step",
+                    "session_id": st.session_state.session_id
+                })
+                outcome = {}
+
+                def lead_lines():
+                    for event in events:
+                        if event['event'] == 'lead':
+                            lead = event['lead']
+                            yield (f"- **{lead['company_name']}** ({lead['industry']}) "
+                                   f"- relevance {lead['relevance_score']:.2f}\n")
+                        elif event['event'] in ('done', 'error'):
+                            outcome.update(event)
+
+                st.write_stream(lead_lines())
+                if outcome.get('event') == 'done':
+                    st.session_state.lead_suggestions = outcome['result'].get('suggestions', 'No suggestions available')
+                    st.success("Lead Suggestions Generated!")
+                else:
+                    st.error(f"Error: {outcome.get('message', 'Unknown error')}")
+            except Exception as e:
+                st.error(f"Unexpected error: {str(e)}")
+        elif 'lead_suggestions' in st.session_state:
             st.markdown(st.session_state.lead_suggestions)
         else:
             st.info("Generate leads to see suggestions here")
@@ -94,6 +127,9 @@ def main():
     st.set_page_config(page_title="AI Sales Assistant", page_icon="🚀", layout="wide")
     st.title("🚀 AI Sales Assistant")
     
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+
     if 'orchestrator' not in st.session_state:
         with st.spinner("Initializing system..."):
             st.session_state.orchestrator, st.session_state.shared_memory = initialize_system()
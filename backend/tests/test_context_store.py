@@ -0,0 +1,29 @@
+from core.context_store import SQLiteContextBackend
+
+def test_sqlite_backend_evicts_least_recently_read_only_when_full(tmp_path):
+    store = SQLiteContextBackend(str(tmp_path / 'context.db'), max_entries=10)
+    for i in range(10):
+        store.set("ns", f"key-{i}", {"i": i}, None)
+    assert store.get("ns", "key-0") == {"i": 0}
+    assert len(store.keys("ns")) == 10
+
+    store.set("ns", "key-10", {"i": 10}, None)
+
+    keys = set(store.keys("ns"))
+    assert "key-0" in keys and "key-10" in keys
+    assert len(keys) == 9
+    assert store._entries == 9
+
+def test_sqlite_backend_batches_access_time_updates(tmp_path):
+    store = SQLiteContextBackend(str(tmp_path / 'context.db'), touch_batch=2)
+    store.set("ns", "a", {"v": 1}, None)
+    store.set("ns", "b", {"v": 2}, None)
+    changes = store._conn.total_changes
+
+    store.get("ns", "a")
+    store.get("ns", "a")
+    assert store._conn.total_changes == changes
+
+    store.get("ns", "b")
+    assert store._conn.total_changes == changes + 2
+    assert store._touched == {}
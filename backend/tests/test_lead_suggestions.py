@@ -0,0 +1,34 @@
+import pytest
+
+from agents.lead_suggestions import LeadSuggestionsAgent
+from core.database import DatabaseService, LeadWriteBuffer, init_db
+from core.shared_memory import SharedMemoryService
+from fakes import FakeOllama
+from models.embedding import EmbeddingService
+from models.ollama_request import OllamaApiClient
+
+VECTOR_SIZE = 64
+
+@pytest.fixture
+def agent(tmp_path):
+    fake = FakeOllama(latency=0.0, tokens_per_second=10_000, dim=VECTOR_SIZE).start()
+    db = DatabaseService(engine=init_db(f"sqlite:///{tmp_path / 'sales.db'}"))
+    buffer = LeadWriteBuffer(db, flush_interval=0.05)
+    client = OllamaApiClient(api_url=f"{fake.url}/api/generate")
+    yield LeadSuggestionsAgent(
+        SharedMemoryService(vector_size=VECTOR_SIZE), client,
+        EmbeddingService(api_url=f"{fake.url}/api/embed", vector_size=VECTOR_SIZE),
+        db_service=db, write_buffer=buffer
+    ), db
+    buffer.close()
+    client.close()
+    fake.stop()
+
+def test_buffered_execute_returns_committed_lead_ids(agent):
+    agent, db = agent
+    result = agent.execute({"summary": "the customer wants a crm with billing integration", "use_cache": False})
+
+    assert result['status'] == 'success'
+    assert result['lead_ids']
+    assert None not in result['lead_ids']
+    assert sorted(result['lead_ids']) == sorted(lead['id'] for lead in db.find_leads())
@@ -0,0 +1,63 @@
+import pytest
+
+from agents.lead_suggestions import LeadSuggestionsAgent
+from agents.meeting_summary import MeetingSummaryAgent
+from core.database import DatabaseService, init_db
+from core.pipeline import PipelineResultStore, PipelineRunner, meeting_to_leads_graph
+from core.retrieval import MeetingRetriever
+from core.shared_memory import SharedMemoryService
+from core.vector_store import VectorStore
+from fakes import FakeOllama
+from models.embedding import EmbeddingService
+from models.ollama_request import OllamaApiClient
+from models.transcription import TranscriptionService
+
+VECTOR_SIZE = 64
+
+@pytest.fixture
+def ollama():
+    fake = FakeOllama(latency=0.0, tokens_per_second=10_000, dim=VECTOR_SIZE).start()
+    yield fake
+    fake.stop()
+
+@pytest.fixture
+def graph(tmp_path, ollama):
+    db = DatabaseService(engine=init_db(f"sqlite:///{tmp_path / 'sales.db'}"))
+    memory = SharedMemoryService(vector_size=VECTOR_SIZE)
+    embedding = EmbeddingService(api_url=f"{ollama.url}/api/embed", vector_size=VECTOR_SIZE)
+    client = OllamaApiClient(api_url=f"{ollama.url}/api/generate")
+    retriever = MeetingRetriever(db, embedding, VectorStore(VECTOR_SIZE))
+    meeting_agent = MeetingSummaryAgent(
+        memory, client, TranscriptionService('unused'), embedding_service=embedding, retriever=retriever
+    )
+    lead_agent = LeadSuggestionsAgent(memory, client, embedding, db_service=db, retriever=retriever)
+    yield meeting_to_leads_graph(meeting_agent, lead_agent), db, memory
+    client.close()
+
+def test_meeting_to_leads_runs_end_to_end(graph):
+    graph, db, memory = graph
+    runner = PipelineRunner(PipelineResultStore())
+    transcript = "we need a crm that integrates with billing and the pilot starts next quarter " * 20
+
+    result = runner.run(graph, {"transcript": transcript, "requirements": "CRM", "source": "call.wav"}, "run-1")
+
+    assert result["status"] == "success", result
+    assert set(result["results"]) == set(graph.nodes)
+    assert result["results"]["embed"]["meeting_id"] is not None
+    lead_ids = result["results"]["persist"]["lead_ids"]
+    assert lead_ids and all(lead_id is not None for lead_id in lead_ids)
+    assert len(db.find_leads(source="call.wav")) == len(lead_ids)
+    summaries = [meta for meta in memory._vector_store.metadata if meta.get('type') == 'meeting_summary']
+    assert len(summaries) == 1
+
+def test_meeting_to_leads_resumes_without_rerunning_nodes(graph):
+    graph, _, memory = graph
+    runner = PipelineRunner(PipelineResultStore())
+    input_data = {"transcript": "pricing is a concern for the finance team " * 20, "source": "call.wav"}
+
+    first = runner.run(graph, input_data, "run-2")
+    second = runner.run(graph, input_data, "run-2")
+
+    assert first["status"] == second["status"] == "success"
+    assert all(timing["cached"] for timing in second["timings"].values())
+    assert sum(meta.get('type') == 'meeting_summary' for meta in memory._vector_store.metadata) == 1
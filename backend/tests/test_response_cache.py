@@ -0,0 +1,25 @@
+import time
+
+from models.response_cache import ResponseCache
+
+def test_disk_tier_stays_under_cap_with_running_total(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / 'cache.db'), disk_max_bytes=10_000, sweep_every=1000)
+    for i in range(100):
+        cache.set(f"key-{i}", "x" * 500)
+    cache.set("key-99", "y" * 200)
+
+    assert cache._disk_bytes == cache._disk_size() <= 10_000
+    assert cache.get("key-99") == "y" * 200
+
+    reopened = ResponseCache(db_path=str(tmp_path / 'cache.db'), disk_max_bytes=10_000)
+    assert reopened._disk_bytes == cache._disk_bytes
+
+def test_expired_rows_are_swept_periodically(tmp_path):
+    cache = ResponseCache(ttl=0.05, db_path=str(tmp_path / 'cache.db'), sweep_every=5)
+    for i in range(4):
+        cache.set(f"stale-{i}", "value")
+    time.sleep(0.1)
+    cache.set("fresh", "value")
+
+    assert cache._disk.execute("SELECT key FROM responses").fetchall() == [("fresh",)]
+    assert cache._disk_bytes == len("value")
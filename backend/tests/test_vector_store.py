@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+import pytest
+
+from core.vector_index import IVFIndex
+from core.vector_segment import MmapVectorStore
+from core.vector_store import VectorStore
+
+VECTOR_SIZE = 16
+
+@pytest.fixture(params=['memory', 'mmap'])
+def store(request, tmp_path):
+    index = IVFIndex(nlist=8, nprobe=2, train_size=200)
+    if request.param == 'memory':
+        yield VectorStore(VECTOR_SIZE, initial_capacity=4, index=index)
+    else:
+        segment = MmapVectorStore(str(tmp_path / 'segment'), VECTOR_SIZE, initial_capacity=4, index=index)
+        yield segment
+        segment.close()
+
+def test_search_while_adding_sees_consistent_rows(store):
+    errors, done = [], threading.Event()
+    rng = np.random.default_rng(0)
+
+    def add():
+        try:
+            for batch in range(100):
+                store.add(rng.standard_normal((20, VECTOR_SIZE)), [{"batch": batch}] * 20)
+        finally:
+            done.set()
+
+    def search():
+        queries = np.random.default_rng().standard_normal((4, VECTOR_SIZE))
+        while not done.is_set():
+            try:
+                store.search_batch(queries, 10)
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=add)] + [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(store) == 2000
+    store.search_batch(np.ones((1, VECTOR_SIZE)), 10)
+    assert sum(len(chunk) for chunks in store.index._lists for chunk in chunks) == 2000
+
+def test_reopened_segment_resumes_from_index_checkpoint(tmp_path):
+    path = str(tmp_path / 'segment')
+    rng = np.random.default_rng(1)
+    writer = MmapVectorStore(path, VECTOR_SIZE, index=IVFIndex(nlist=8, nprobe=2, train_size=200))
+    writer.add(rng.standard_normal((500, VECTOR_SIZE)), [{"row": i} for i in range(500)])
+    queries = rng.standard_normal((3, VECTOR_SIZE))
+    expected = [[match['id'] for match in row] for row in writer.search_batch(queries, 5)]
+    writer.close()
+
+    index = IVFIndex(nlist=8, nprobe=2, train_size=200)
+    reopened = MmapVectorStore(path, VECTOR_SIZE, index=index)
+    assert index.is_trained
+    assert [[match['id'] for match in row] for row in reopened.search_batch(queries, 5)] == expected
+
+    follower = MmapVectorStore(path, VECTOR_SIZE, index=IVFIndex(nlist=8, nprobe=2, train_size=200), readonly=True)
+    reopened.add(rng.standard_normal((10, VECTOR_SIZE)), [{"row": 500 + i} for i in range(10)])
+    assert follower.refresh() == 510
+    assert [meta['row'] for meta in follower.metadata] == list(range(510))
+    assert sum(len(chunk) for chunks in follower.index._lists for chunk in chunks) == 510
+    reopened.close()